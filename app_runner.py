@@ -0,0 +1,191 @@
+from typing import Callable, Dict, List, Optional
+
+import pygame
+import pygame_gui
+
+
+def merge_overlapping_rects(rects: List[pygame.Rect]) -> List[pygame.Rect]:
+    """
+    Replace every group of overlapping rectangles with the one rectangle that covers them.
+    """
+    merged: List[pygame.Rect] = []
+    for rect in rects:
+        rect = rect.copy()
+        # a merged rectangle can grow into others, so keep going until it stops growing
+        overlap_index = rect.collidelist(merged)
+        while overlap_index != -1:
+            rect.union_ip(merged.pop(overlap_index))
+            overlap_index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRectAppRunner:
+    """
+    A main loop for the simple examples that only redraws the parts of the window that changed.
+
+    Each frame we compare what the UI manager's sprite group is going to draw against what it
+    drew last frame. Elements that swapped their image, moved or appeared/disappeared have their
+    old and new rectangles restored from the background and redrawn, and only those rectangles
+    are passed to pygame.display.update(). Overlapping rectangles are merged, and each of the
+    few that remain costs a whole draw_ui() call clipped to it, so past max_clipped_draws of
+    them the area covering them all is redrawn in one clipped pass instead. When nothing
+    changed the frame is skipped entirely, and once the UI has been idle for a little while the
+    loop sleeps in pygame.event.wait() instead of ticking at full frame rate.
+
+    Some elements redraw their existing image in place (text entry while typing, scrolling
+    text boxes) which we can't detect by comparing images, so for a short 'settle' period after
+    any input the whole window is redrawn as before. Focused elements are always redrawn so
+    text cursors keep blinking while idle.
+
+    :param window_surface: The display surface.
+    :param manager: The UIManager to update and draw.
+    :param background: An opaque surface the size of the window, drawn under the UI.
+    :param event_handler: Optional function called with every event before the UI manager.
+    :param fps: Frame rate cap while the UI is active.
+    :param settle_time: Seconds after the last input during which whole frames are redrawn.
+    :param idle_wake_time: Seconds to sleep waiting for events when idle, so timed effects
+                           like tool tips and blinking cursors still get updated.
+    """
+    max_dirty_rects = 16
+    max_clipped_draws = 3
+
+    def __init__(self,
+                 window_surface: pygame.Surface,
+                 manager: pygame_gui.UIManager,
+                 background: pygame.Surface,
+                 event_handler: Optional[Callable[[pygame.event.Event], None]] = None,
+                 fps: int = 60,
+                 settle_time: float = 0.5,
+                 idle_wake_time: float = 0.1):
+        self.window_surface = window_surface
+        self.manager = manager
+        self.background = background
+        self.event_handler = event_handler
+        self.fps = fps
+        self.settle_time = settle_time
+        self.idle_wake_time = idle_wake_time
+
+        self.clock = pygame.time.Clock()
+        self.is_running = True
+
+        self.time_since_input = 0.0
+        self.needs_full_redraw = True
+        self.last_visible_list = None
+        self.last_drawn: Dict[int, tuple] = {}
+
+        self.idle_frames = 0
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+
+    def run(self):
+        while self.is_running:
+            if self.time_since_input > self.settle_time and self.idle_frames > 1:
+                # Nothing has changed for a couple of frames, so block until there is input
+                # or it's time to update timed UI effects again.
+                self._process_events(pygame.event.wait(int(self.idle_wake_time * 1000)))
+                time_delta = self.clock.tick() / 1000.0
+            else:
+                time_delta = self.clock.tick(self.fps) / 1000.0
+
+            for event in pygame.event.get():
+                self._process_events(event)
+
+            self.time_since_input += time_delta
+            self.manager.update(time_delta)
+
+            self.draw()
+
+    def _process_events(self, event: pygame.event.Event):
+        if event.type == pygame.NOEVENT:
+            return
+        if event.type == pygame.QUIT:
+            self.is_running = False
+        if event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESIZED, pygame.VIDEOEXPOSE):
+            self.needs_full_redraw = True
+        self.time_since_input = 0.0
+        if self.event_handler is not None:
+            self.event_handler(event)
+        self.manager.process_events(event)
+
+    def draw(self):
+        dirty_rects = self.find_dirty_rects()
+        if dirty_rects is None:
+            self.window_surface.blit(self.background, (0, 0))
+            self.manager.draw_ui(self.window_surface)
+            pygame.display.update()
+        elif dirty_rects:
+            clipped_draws = dirty_rects
+            if len(dirty_rects) > self.max_clipped_draws:
+                clipped_draws = [dirty_rects[0].unionall(dirty_rects[1:])]
+            for clip_rect in clipped_draws:
+                self.window_surface.set_clip(clip_rect)
+                self.window_surface.blit(self.background, clip_rect, clip_rect)
+                self.manager.draw_ui(self.window_surface)
+            self.window_surface.set_clip(None)
+            pygame.display.update(dirty_rects)
+        else:
+            self.frames_skipped += 1
+            return
+        self.frames_drawn += 1
+
+    def find_dirty_rects(self) -> Optional[List[pygame.Rect]]:
+        """
+        Work out which parts of the window need redrawing this frame.
+
+        :return: None if the whole window should be redrawn, otherwise a list of rectangles that
+                 don't overlap, which is empty when nothing visible has changed.
+        """
+        sprite_group = self.manager.get_sprite_group()
+        visible_list = sprite_group.visible
+
+        current_drawn = {id(blit_data): (blit_data[0], tuple(blit_data[1]))
+                         for blit_data in visible_list}
+        previous_drawn = self.last_drawn
+        self.last_drawn = current_drawn
+
+        # The group rebuilds its visible list when elements are added, removed, hidden or change
+        # layer. Draw order may have changed too, so don't try to be clever about it.
+        if (self.needs_full_redraw or visible_list is not self.last_visible_list or
+                self.time_since_input <= self.settle_time):
+            self.needs_full_redraw = False
+            self.last_visible_list = visible_list
+            self.idle_frames = 0
+            return None
+
+        window_rect = self.window_surface.get_rect()
+        dirty_rects = []
+        for blit_id, (image, rect) in current_drawn.items():
+            previous = previous_drawn.get(blit_id)
+            if previous is None:
+                dirty_rects.append(pygame.Rect(rect))
+            elif previous[0] is not image or previous[1] != rect:
+                dirty_rects.append(pygame.Rect(rect))
+                dirty_rects.append(pygame.Rect(previous[1]))
+
+        # Redrawing focused elements alone doesn't count as activity, otherwise a focused text
+        # entry would keep us from ever idling.
+        self.idle_frames = 0 if dirty_rects else self.idle_frames + 1
+
+        focused_set = self.manager.get_focus_set()
+        if focused_set is not None:
+            dirty_rects.extend(element.rect.copy() for element in focused_set
+                               if element.visible)
+
+        dirty_rects = [dirty_rect.clip(window_rect) for dirty_rect in dirty_rects]
+        dirty_rects = [dirty_rect for dirty_rect in dirty_rects if dirty_rect.width > 0 and
+                       dirty_rect.height > 0]
+        if len(dirty_rects) > self.max_dirty_rects:
+            return None
+        dirty_rects = merge_overlapping_rects(dirty_rects)
+
+        half_window_area = (window_rect.width * window_rect.height) // 2
+        if (sum(dirty_rect.width * dirty_rect.height for dirty_rect in dirty_rects) >
+                half_window_area):
+            return None
+        if len(dirty_rects) > self.max_clipped_draws:
+            # these will be drawn as one clipped pass over the area covering them all
+            covering_rect = dirty_rects[0].unionall(dirty_rects[1:])
+            if covering_rect.width * covering_rect.height > half_window_area:
+                return None
+        return dirty_rects
@@ -0,0 +1,157 @@
+"""
+A wall of hundreds of AI controlled pong games, all stepped at once by BatchedPongGames.
+
+Run with --benchmark to time a batched step against updating the same number of PongGame
+objects one at a time, without opening a window.
+"""
+import argparse
+import time
+
+import pygame
+import pygame_gui
+
+from pygame_gui.elements import UIImage, UILabel, UIWindow
+
+from benchmarking.results import use_headless_video_driver
+from pong.batched import BatchedPongGames
+from pong.pong import PongGame
+
+
+COURT_SIZE = (192, 144)
+WALL_AREA_SIZE = (980, 640)
+
+
+def fit_tiles(game_count: int):
+    # shrink the games until they all fit in the wall area
+    tile_scale = 1.0
+    while True:
+        tile_size = (int(COURT_SIZE[0] * tile_scale) + 2, int(COURT_SIZE[1] * tile_scale) + 2)
+        columns = max(1, WALL_AREA_SIZE[0] // tile_size[0])
+        rows = max(1, WALL_AREA_SIZE[1] // tile_size[1])
+        if columns * rows >= game_count or tile_scale <= 0.05:
+            return tile_scale, tile_size, min(columns, game_count)
+        tile_scale -= 0.01
+
+
+def run_wall(game_count: int):
+    pygame.init()
+
+    pygame.display.set_caption('Batched Pong Wall')
+    window_surface = pygame.display.set_mode((1024, 768))
+    background = pygame.Surface((1024, 768))
+    background.fill(pygame.Color('#505050'))
+
+    manager = pygame_gui.UIManager((1024, 768), 'data/themes/theme_3.json')
+
+    tile_scale, tile_size, columns = fit_tiles(game_count)
+    rows = (game_count + columns - 1) // columns
+    wall_size = (columns * tile_size[0], rows * tile_size[1])
+
+    wall_window = UIWindow(pygame.Rect((10, 10), (wall_size[0] + 40, wall_size[1] + 100)),
+                           manager, window_display_title=f'{game_count} games of pong')
+    wall_surface = pygame.Surface(wall_size).convert()
+    wall_image = UIImage(pygame.Rect((0, 30), wall_size), wall_surface, manager=manager,
+                         container=wall_window)
+    timing_label = UILabel(pygame.Rect((0, 0), (wall_size[0], 30)), '', manager=manager,
+                           container=wall_window)
+
+    games = BatchedPongGames(game_count, COURT_SIZE)
+
+    clock = pygame.time.Clock()
+    step_time = 0.0
+    draw_time = 0.0
+    label_timer = 0.0
+    is_running = True
+    while is_running:
+        time_delta = clock.tick(60) / 1000.0
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                is_running = False
+            manager.process_events(event)
+
+        start_time = time.perf_counter()
+        games.track_balls()
+        games.step(time_delta)
+        step_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        wall_surface.fill(pygame.Color('#000000'))
+        for index in range(game_count):
+            games.draw(index, wall_surface,
+                       ((index % columns) * tile_size[0], (index // columns) * tile_size[1]),
+                       tile_scale)
+        wall_image.set_image(wall_surface)
+        draw_time = time.perf_counter() - start_time
+
+        label_timer -= time_delta
+        if label_timer <= 0.0:
+            label_timer = 0.5
+            timing_label.set_text(f'Step: {step_time * 1000:.2f}ms  '
+                                  f'Draw: {draw_time * 1000:.2f}ms  '
+                                  f'FPS: {clock.get_fps():.0f}')
+
+        manager.update(time_delta)
+
+        window_surface.blit(background, (0, 0))
+        manager.draw_ui(window_surface)
+
+        pygame.display.update()
+
+
+def run_benchmark(game_counts, steps: int, warmup_steps: int):
+    pygame.init()
+    # PongGame converts its background surface, so it needs a display mode
+    pygame.display.set_mode((64, 64))
+
+    time_delta = 1.0 / 60.0
+    for game_count in game_counts:
+        batched_games = BatchedPongGames(game_count, COURT_SIZE, seed=0)
+        for _ in range(warmup_steps):
+            batched_games.step(time_delta)
+        start_time = time.perf_counter()
+        for _ in range(steps):
+            batched_games.step(time_delta)
+        batched_time = (time.perf_counter() - start_time) / steps
+
+        object_games = [PongGame(COURT_SIZE) for _ in range(game_count)]
+        for _ in range(warmup_steps):
+            for game in object_games:
+                game.update(time_delta)
+        start_time = time.perf_counter()
+        for _ in range(steps):
+            for game in object_games:
+                game.update(time_delta)
+        object_time = (time.perf_counter() - start_time) / steps
+
+        if batched_time <= object_time:
+            comparison = f'{object_time / batched_time:.2f}x faster'
+        else:
+            comparison = f'{batched_time / object_time:.2f}x slower'
+        print(f'{game_count:>6} games - PongGame objects: {object_time * 1000:8.3f}ms per step, '
+              f'batched: {batched_time * 1000:8.3f}ms per step ({comparison})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=400,
+                        help='Number of games to show on the wall.')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time the simulation step instead of showing the wall.')
+    parser.add_argument('--counts', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                        help='Game counts to benchmark.')
+    parser.add_argument('--steps', type=int, default=200,
+                        help='Steps to time at each game count when benchmarking.')
+    parser.add_argument('--warmup-steps', type=int, default=10,
+                        help='Untimed steps run before timing each game count.')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        use_headless_video_driver()
+        run_benchmark(args.counts, args.steps, args.warmup_steps)
+    else:
+        run_wall(args.games)
+
+
+if __name__ == '__main__':
+    main()
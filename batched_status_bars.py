@@ -0,0 +1,205 @@
+"""
+Hundreds of wandering units, each with health, mana and stamina bars like the HappySprite in
+status_bars.py. The units' stats are kept in NumPy arrays and all the bars are set in one
+batched pass, which only touches bars whose filled width in pixels has changed. Each unit's
+bars share a small container, moved in one go and only when the unit has moved, and those
+containers are spread over screen sized buckets of sixteen so a move stays cheap however many
+units there are.
+
+Run with --callbacks to give every bar its own percent_method instead, the way status_bars.py
+does, and --benchmark to time both ways without opening a window. The bars are moved the same
+way either way, so the benchmark compares only how their fills are set.
+"""
+import argparse
+import time
+
+import numpy as np
+import pygame
+import pygame_gui
+
+from pygame_gui.core import ObjectID
+from pygame_gui.elements import UILabel
+
+from benchmarking.results import use_headless_video_driver
+from sprite_status.batched_bars import BatchedStatusBars, ContainerBuckets, make_anchored_bars
+from sprite_status.stats import ArrayStatSprite, StatArrays
+
+
+SCREEN_SIZE = (1024, 768)
+UNIT_SPEED = 40.0
+BAR_STATS = ('health', 'mana', 'stamina')
+
+
+class UnitSwarm:
+    """
+    The units and their bars. Unit movement and stat changes are done on whole arrays; only
+    copying positions into the sprites' rects is done a unit at a time.
+
+    The bars' containers are always moved by the BatchedStatusBars; with use_callbacks only
+    the fills are left to the bars' own percent_methods.
+    """
+    def __init__(self, unit_count: int, manager: pygame_gui.UIManager, use_callbacks: bool,
+                 seed: int = 0):
+        self.random_generator = np.random.default_rng(seed)
+        self.stats = StatArrays(unit_count)
+        self.sprites = pygame.sprite.Group()
+        self.units = []
+        self.use_callbacks = use_callbacks
+        self.batched_bars = BatchedStatusBars(self.stats)
+        self.bar_buckets = ContainerBuckets(manager, pygame.Rect((0, 0), SCREEN_SIZE))
+
+        self.positions = self.random_generator.uniform(
+            (20.0, 40.0), (SCREEN_SIZE[0] - 60.0, SCREEN_SIZE[1] - 40.0), (unit_count, 2))
+        self.velocities = np.zeros((unit_count, 2))
+        self.turn_timers = np.zeros(unit_count)
+
+        image = pygame.image.load('data/images/test_emoji.png').convert_alpha()
+        for unit_index in range(unit_count):
+            unit = ArrayStatSprite(self.stats, image, self.positions[unit_index],
+                                   current=self.random_generator.uniform(20.0, 100.0, 3),
+                                   maximum=(100.0, 100.0, 100.0))
+            self.sprites.add(unit)
+            self.units.append(unit)
+            percent_methods = None
+            if use_callbacks:
+                # the same as HappySprite's get_health_percentage and friends
+                percent_methods = [(lambda unit=unit, stat_name=stat_name:
+                                    unit.get_stat_percentage(stat_name))
+                                   for stat_name in BAR_STATS]
+            bar_container, bars, offset = make_anchored_bars(
+                manager, [ObjectID(f'#{stat_name}_bar', '@player_status_bars')
+                          for stat_name in BAR_STATS],
+                container=self.bar_buckets.next_container(), percent_methods=percent_methods)
+            self.batched_bars.add_bar_container(bar_container, unit.slot, offset)
+            if not use_callbacks:
+                for bar, stat_name in zip(bars, BAR_STATS):
+                    self.batched_bars.add_bar(bar, unit.slot, stat_name)
+
+    def update(self, time_delta: float):
+        unit_count = len(self.units)
+        # every so often each unit picks a new direction, or stops to rest
+        self.turn_timers -= time_delta
+        turning = self.turn_timers <= 0.0
+        turn_count = int(np.count_nonzero(turning))
+        if turn_count:
+            angles = self.random_generator.uniform(0.0, 2.0 * np.pi, turn_count)
+            resting = self.random_generator.random(turn_count) < 0.3
+            speeds = np.where(resting, 0.0, UNIT_SPEED)
+            directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+            self.velocities[turning] = directions * speeds[:, np.newaxis]
+            self.turn_timers[turning] = self.random_generator.uniform(1.0, 4.0, turn_count)
+        self.positions += self.velocities * time_delta
+        np.clip(self.positions, (20.0, 40.0), (SCREEN_SIZE[0] - 60.0, SCREEN_SIZE[1] - 40.0),
+                out=self.positions)
+
+        moving = np.any(self.velocities != 0.0, axis=1)
+        health, mana, stamina = (self.stats.current[index, :unit_count] for index in range(3))
+        # moving tires units out, resting gets their stamina back
+        stamina += np.where(moving, -8.0, 20.0) * time_delta
+        mana += 3.0 * time_delta
+        health += 1.5 * time_delta
+        hit = self.random_generator.random(unit_count) < 0.2 * time_delta
+        health[hit] -= self.random_generator.uniform(10.0, 40.0, int(np.count_nonzero(hit)))
+        casting = self.random_generator.random(unit_count) < 0.1 * time_delta
+        mana[casting] -= 30.0
+        self.stats.clamp()
+
+        unit_positions = self.positions.astype(np.int32)
+        for unit, (x, y) in zip(self.units, unit_positions.tolist()):
+            unit.rect.topleft = (x, y)
+
+        self.batched_bars.update(unit_positions)
+
+
+def run_swarm(unit_count: int, use_callbacks: bool):
+    pygame.init()
+
+    pygame.display.set_caption('Batched Status Bars')
+    window_surface = pygame.display.set_mode(SCREEN_SIZE)
+    manager = pygame_gui.UIManager(SCREEN_SIZE, 'data/themes/status_bar_theme.json')
+
+    background = pygame.Surface(SCREEN_SIZE)
+    background.fill(manager.ui_theme.get_colour('dark_bg'))
+
+    swarm = UnitSwarm(unit_count, manager, use_callbacks)
+    timing_label = UILabel(pygame.Rect((0, 0), (SCREEN_SIZE[0], 30)), '', manager=manager)
+
+    clock = pygame.time.Clock()
+    update_time = 0.0
+    label_timer = 0.0
+    is_running = True
+    while is_running:
+        time_delta = clock.tick(60) / 1000.0
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                is_running = False
+            manager.process_events(event)
+
+        start_time = time.perf_counter()
+        swarm.update(time_delta)
+        manager.update(time_delta)
+        update_time = time.perf_counter() - start_time
+
+        label_timer -= time_delta
+        if label_timer <= 0.0:
+            label_timer = 0.5
+            bar_text = ('each bar polls its unit' if swarm.use_callbacks else
+                        f'redraws: {swarm.batched_bars.redraws}  '
+                        f'avoided: {swarm.batched_bars.redraws_avoided}')
+            timing_label.set_text(f'{unit_count} units, {unit_count * 3} bars  {bar_text}  '
+                                  f'Update: {update_time * 1000:.2f}ms  '
+                                  f'FPS: {clock.get_fps():.0f}')
+
+        window_surface.blit(background, (0, 0))
+        swarm.sprites.draw(window_surface)
+        manager.draw_ui(window_surface)
+
+        pygame.display.update()
+
+
+def run_benchmark(unit_counts, frames: int):
+    pygame.init()
+    pygame.display.set_mode(SCREEN_SIZE)
+
+    time_delta = 1.0 / 60.0
+    for unit_count in unit_counts:
+        frame_times = {}
+        for use_callbacks in (True, False):
+            manager = pygame_gui.UIManager(SCREEN_SIZE, 'data/themes/status_bar_theme.json')
+            swarm = UnitSwarm(unit_count, manager, use_callbacks)
+            start_time = time.perf_counter()
+            for _ in range(frames):
+                swarm.update(time_delta)
+                manager.update(time_delta)
+            frame_times[use_callbacks] = (time.perf_counter() - start_time) / frames
+        print(f'{unit_count:>6} units - percent_method callbacks: '
+              f'{frame_times[True] * 1000:8.3f}ms per frame, '
+              f'batched: {frame_times[False] * 1000:8.3f}ms per frame '
+              f'({frame_times[True] / frame_times[False]:.1f}x), '
+              f'{swarm.batched_bars.redraws_avoided} redraws avoided')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--units', type=int, default=300,
+                        help='Number of units to show.')
+    parser.add_argument('--callbacks', action='store_true',
+                        help='Give every bar its own percent_method instead of batching.')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time both ways of updating the bars instead of showing them.')
+    parser.add_argument('--counts', type=int, nargs='+', default=[100, 300],
+                        help='Unit counts to benchmark.')
+    parser.add_argument('--frames', type=int, default=60,
+                        help='Frames to time at each unit count when benchmarking.')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        use_headless_video_driver()
+        run_benchmark(args.counts, args.frames)
+    else:
+        run_swarm(args.units, args.callbacks)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import math
+
+from typing import Dict, List, Tuple
+
+import pygame
+
+
+SERIES_COLOURS = ['#E0504A', '#4AA8E0', '#6CD65A', '#E0C04A', '#B070E0', '#E08A4A']
+
+
+def save_line_plot(file_path: str,
+                   series: Dict[str, List[Tuple[float, float]]],
+                   title: str,
+                   x_label: str,
+                   y_label: str,
+                   size: Tuple[int, int] = (900, 600),
+                   log_x: bool = True,
+                   log_y: bool = False):
+    """
+    Draw a simple line chart with pygame and save it as an image, so benchmarks don't need
+    any plotting library beyond what the examples already use.
+    """
+    if not pygame.font.get_init():
+        pygame.font.init()
+    font = pygame.font.Font(None, 20)
+    title_font = pygame.font.Font(None, 26)
+
+    surface = pygame.Surface(size)
+    surface.fill(pygame.Color('#202020'))
+    plot_rect = pygame.Rect(80, 50, size[0] - 260, size[1] - 110)
+    pygame.draw.rect(surface, pygame.Color('#808080'), plot_rect, 1)
+
+    all_points = [point for points in series.values() for point in points]
+    if not all_points:
+        pygame.image.save(surface, file_path)
+        return
+
+    def transform_x(value):
+        return math.log10(value) if log_x else value
+
+    def transform_y(value):
+        return math.log10(max(value, 1e-9)) if log_y else value
+
+    min_x = min(transform_x(point[0]) for point in all_points)
+    max_x = max(transform_x(point[0]) for point in all_points)
+    min_y = min(transform_y(point[1]) for point in all_points) if log_y else 0.0
+    max_y = max(transform_y(point[1]) for point in all_points)
+    max_y += (max_y - min_y) * 0.05
+    x_range = max(max_x - min_x, 1e-9)
+    y_range = max(max_y - min_y, 1e-9)
+
+    def to_screen(point):
+        return (plot_rect.left + (transform_x(point[0]) - min_x) / x_range * plot_rect.width,
+                plot_rect.bottom - (transform_y(point[1]) - min_y) / y_range * plot_rect.height)
+
+    text_colour = pygame.Color('#D0D0D0')
+    for tick in range(5):
+        y_value = min_y + y_range * tick / 4
+        if log_y:
+            y_value = 10 ** y_value
+        y_pos = plot_rect.bottom - plot_rect.height * tick / 4
+        pygame.draw.line(surface, pygame.Color('#404040'),
+                         (plot_rect.left, y_pos), (plot_rect.right, y_pos))
+        label = font.render(f'{y_value:.3g}', True, text_colour)
+        surface.blit(label, label.get_rect(midright=(plot_rect.left - 6, y_pos)))
+
+    for x_value in sorted({point[0] for point in all_points}):
+        x_pos = to_screen((x_value, 0.0))[0]
+        label = font.render(f'{x_value:g}', True, text_colour)
+        surface.blit(label, label.get_rect(midtop=(x_pos, plot_rect.bottom + 6)))
+
+    for index, (name, points) in enumerate(series.items()):
+        colour = pygame.Color(SERIES_COLOURS[index % len(SERIES_COLOURS)])
+        screen_points = [to_screen(point) for point in sorted(points)]
+        if len(screen_points) > 1:
+            pygame.draw.lines(surface, colour, False, screen_points, 2)
+        for screen_point in screen_points:
+            pygame.draw.circle(surface, colour, screen_point, 3)
+        legend_pos = (plot_rect.right + 16, plot_rect.top + index * 22)
+        pygame.draw.line(surface, colour, (legend_pos[0], legend_pos[1] + 7),
+                         (legend_pos[0] + 20, legend_pos[1] + 7), 2)
+        surface.blit(font.render(name, True, text_colour), (legend_pos[0] + 26, legend_pos[1]))
+
+    title_text = title_font.render(title, True, text_colour)
+    surface.blit(title_text, title_text.get_rect(midtop=(size[0] // 2, 14)))
+    x_label_text = font.render(x_label + (' (log scale)' if log_x else ''), True, text_colour)
+    surface.blit(x_label_text, x_label_text.get_rect(midtop=(plot_rect.centerx,
+                                                             plot_rect.bottom + 28)))
+    y_label_text = pygame.transform.rotate(font.render(y_label + (' (log scale)' if log_y else ''),
+                                                       True, text_colour), 90)
+    surface.blit(y_label_text, y_label_text.get_rect(midleft=(8, plot_rect.centery)))
+
+    pygame.image.save(surface, file_path)
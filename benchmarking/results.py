@@ -0,0 +1,77 @@
+import json
+import os
+import statistics
+
+from importlib import metadata
+from typing import Dict, List, Optional
+
+import pygame_gui
+
+
+def use_headless_video_driver():
+    # must be called before pygame.init() to have any effect
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+
+def pygame_gui_version() -> str:
+    try:
+        return metadata.version('pygame_gui')
+    except metadata.PackageNotFoundError:
+        return getattr(pygame_gui, '__version__', 'unknown')
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    # linear interpolation between the closest ranks
+    position = fraction * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarise(samples: List[float]) -> Dict[str, float]:
+    return {'min': min(samples),
+            'median': statistics.median(samples),
+            'p95': percentile(samples, 0.95),
+            'runs': len(samples)}
+
+
+def load_results(file_path: str) -> Dict[str, dict]:
+    if not os.path.isfile(file_path):
+        return {}
+    with open(file_path, 'r') as results_file:
+        return json.load(results_file)
+
+
+def save_results(file_path: str, results: Dict[str, dict]):
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, 'w') as results_file:
+        json.dump(results, results_file, indent=4, sort_keys=True)
+        results_file.write('\n')
+
+
+def find_regressions(current: Dict[str, Dict[str, float]],
+                     baseline: Optional[Dict[str, Dict[str, float]]],
+                     threshold: float,
+                     statistic: str = 'median') -> List[str]:
+    """
+    Compare two sets of summarised timings and describe every measurement that got slower
+    by more than the threshold fraction (e.g. 0.1 for 10%).
+    """
+    regressions = []
+    if not baseline:
+        return regressions
+    for measurement, summary in current.items():
+        if measurement not in baseline or statistic not in baseline[measurement]:
+            continue
+        old_value = baseline[measurement][statistic]
+        new_value = summary[statistic]
+        if old_value > 0.0 and (new_value - old_value) / old_value > threshold:
+            regressions.append(f'{measurement} {statistic}: {old_value:.4f}s -> '
+                               f'{new_value:.4f}s (+{100.0 * (new_value - old_value) / old_value:.1f}%)')
+    return regressions
@@ -1,6 +1,8 @@
 import pygame
 import pygame_gui
 
+from app_runner import DirtyRectAppRunner
+
 # Rough current performance measure - Button creation time taken: 0.08 seconds.
 # (54 x rounded rectangles)
 
@@ -34,19 +36,4 @@ for j in range(1, 10):
 load_time_2 = clock.tick()
 print('Button creation time taken:', load_time_2/1000.0, 'seconds.')
 
-is_running = True
-
-while is_running:
-    time_delta = clock.tick(60)/1000.0
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            is_running = False
-
-        manager.process_events(event)
-
-    manager.update(time_delta)
-
-    window_surface.blit(background, (0, 0))
-    manager.draw_ui(window_surface)
-
-    pygame.display.update()
+DirtyRectAppRunner(window_surface, manager, background).run()
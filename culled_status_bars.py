@@ -0,0 +1,208 @@
+"""
+Thousands of wandering units spread over a world much bigger than the screen, each with
+health, mana and stamina bars like the HappySprite in status_bars.py. Move the view around
+with the arrow keys.
+
+The units are kept in a spatial grid, and only the units in view are drawn and given bars,
+from a pool of bars that's only as big as the most units ever in view at once. So the cost of
+the bars depends on how many units can be seen, not how many there are.
+
+Run with --benchmark to time a panning view over worlds with more and more units without
+opening a window.
+"""
+import argparse
+import time
+
+import numpy as np
+import pygame
+import pygame_gui
+
+from pygame_gui.elements import UILabel
+
+from benchmarking.results import use_headless_video_driver
+from sprite_status.culled_bars import CulledStatusBars
+from sprite_status.stats import StatArrays
+
+
+SCREEN_SIZE = (1024, 768)
+UNIT_SIZE = (32, 32)
+UNIT_SPEED = 40.0
+SCROLL_SPEED = 600.0
+UNITS_PER_SCREEN = 100
+
+
+class UnitWorld:
+    """
+    The units, wandering around a world big enough to give each screen's worth of it about
+    UNITS_PER_SCREEN of them. Units are just rows in arrays; there are no sprite objects.
+    """
+    def __init__(self, unit_count: int, manager: pygame_gui.UIManager, seed: int = 0):
+        self.random_generator = np.random.default_rng(seed)
+        self.unit_count = unit_count
+        screens = max(1.0, unit_count / UNITS_PER_SCREEN)
+        self.world_size = (int(SCREEN_SIZE[0] * np.sqrt(screens)),
+                           int(SCREEN_SIZE[1] * np.sqrt(screens)))
+        self.viewport = pygame.Rect((0, 0), SCREEN_SIZE)
+
+        self.stats = StatArrays(unit_count)
+        for _ in range(unit_count):
+            self.stats.add_slot(self.random_generator.uniform(20.0, 100.0, 3),
+                                (100.0, 100.0, 100.0))
+
+        self.lowest_position = (0.0, 40.0)
+        self.highest_position = (self.world_size[0] - UNIT_SIZE[0],
+                                 self.world_size[1] - UNIT_SIZE[1])
+        self.positions = self.random_generator.uniform(self.lowest_position,
+                                                       self.highest_position, (unit_count, 2))
+        self.velocities = np.zeros((unit_count, 2))
+        self.turn_timers = np.zeros(unit_count)
+
+        self.image = pygame.transform.smoothscale(
+            pygame.image.load('data/images/test_emoji.png').convert_alpha(), UNIT_SIZE)
+        self.status_bars = CulledStatusBars(manager, self.stats, UNIT_SIZE, SCREEN_SIZE)
+
+    def scroll(self, distance):
+        self.viewport.move_ip(distance)
+        self.viewport.clamp_ip(pygame.Rect((0, 0), self.world_size))
+
+    def update(self, time_delta: float):
+        # every so often each unit picks a new direction, or stops to rest
+        self.turn_timers -= time_delta
+        turning = self.turn_timers <= 0.0
+        turn_count = int(np.count_nonzero(turning))
+        if turn_count:
+            angles = self.random_generator.uniform(0.0, 2.0 * np.pi, turn_count)
+            resting = self.random_generator.random(turn_count) < 0.3
+            speeds = np.where(resting, 0.0, UNIT_SPEED)
+            directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+            self.velocities[turning] = directions * speeds[:, np.newaxis]
+            self.turn_timers[turning] = self.random_generator.uniform(1.0, 4.0, turn_count)
+        self.positions += self.velocities * time_delta
+        np.clip(self.positions, self.lowest_position, self.highest_position, out=self.positions)
+
+        moving = np.any(self.velocities != 0.0, axis=1)
+        health, mana, stamina = (self.stats.current[index, :self.unit_count]
+                                 for index in range(3))
+        # moving tires units out, resting gets their stamina back
+        stamina += np.where(moving, -8.0, 20.0) * time_delta
+        mana += 3.0 * time_delta
+        health += 1.5 * time_delta
+        hit = self.random_generator.random(self.unit_count) < 0.2 * time_delta
+        health[hit] -= self.random_generator.uniform(10.0, 40.0, int(np.count_nonzero(hit)))
+        casting = self.random_generator.random(self.unit_count) < 0.1 * time_delta
+        mana[casting] -= 30.0
+        self.stats.clamp()
+
+        self.status_bars.update(self.positions.astype(np.int32), self.viewport)
+
+    def draw(self, surface: pygame.Surface):
+        # the bars have already found the units in view
+        screen_positions = (self.positions[self.status_bars.visible_slots].astype(np.int32) -
+                            np.array(self.viewport.topleft, dtype=np.int32))
+        surface.fblits([(self.image, position) for position in screen_positions.tolist()])
+
+
+def run_world(unit_count: int):
+    pygame.init()
+
+    pygame.display.set_caption('Culled Status Bars')
+    window_surface = pygame.display.set_mode(SCREEN_SIZE)
+    manager = pygame_gui.UIManager(SCREEN_SIZE, 'data/themes/status_bar_theme.json')
+
+    background = pygame.Surface(SCREEN_SIZE)
+    background.fill(manager.ui_theme.get_colour('dark_bg'))
+
+    world = UnitWorld(unit_count, manager)
+    timing_label = UILabel(pygame.Rect((0, 0), (SCREEN_SIZE[0], 30)), '', manager=manager)
+
+    clock = pygame.time.Clock()
+    update_time = 0.0
+    label_timer = 0.0
+    is_running = True
+    while is_running:
+        time_delta = clock.tick(60) / 1000.0
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                is_running = False
+            manager.process_events(event)
+
+        keys = pygame.key.get_pressed()
+        world.scroll((int((keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) *
+                          SCROLL_SPEED * time_delta),
+                      int((keys[pygame.K_DOWN] - keys[pygame.K_UP]) *
+                          SCROLL_SPEED * time_delta)))
+
+        start_time = time.perf_counter()
+        world.update(time_delta)
+        manager.update(time_delta)
+        update_time = time.perf_counter() - start_time
+
+        label_timer -= time_delta
+        if label_timer <= 0.0:
+            label_timer = 0.5
+            timing_label.set_text(f'{unit_count} units, '
+                                  f'{len(world.status_bars.visible_slots)} in view, '
+                                  f'{len(world.status_bars.bar_sets) * 3} bars made  '
+                                  f'Update: {update_time * 1000:.2f}ms  '
+                                  f'FPS: {clock.get_fps():.0f}')
+
+        window_surface.blit(background, (0, 0))
+        world.draw(window_surface)
+        manager.draw_ui(window_surface)
+
+        pygame.display.update()
+
+
+def run_benchmark(unit_counts, frames: int, warmup_frames: int):
+    pygame.init()
+    window_surface = pygame.display.set_mode(SCREEN_SIZE)
+
+    time_delta = 1.0 / 60.0
+    for unit_count in unit_counts:
+        manager = pygame_gui.UIManager(SCREEN_SIZE, 'data/themes/status_bar_theme.json')
+        world = UnitWorld(unit_count, manager)
+        visible_counts = []
+        start_time = time.perf_counter()
+        for frame in range(warmup_frames + frames):
+            if frame == warmup_frames:
+                # the first frames make the bars for the units in view; time panning after that
+                visible_counts.clear()
+                start_time = time.perf_counter()
+            # pan diagonally, so units keep coming into and going out of view
+            world.scroll((int(SCROLL_SPEED * time_delta), int(SCROLL_SPEED * time_delta)))
+            world.update(time_delta)
+            manager.update(time_delta)
+            world.draw(window_surface)
+            manager.draw_ui(window_surface)
+            visible_counts.append(len(world.status_bars.visible_slots))
+        frame_time = (time.perf_counter() - start_time) / frames
+        print(f'{unit_count:>7} units - {frame_time * 1000:8.3f}ms per frame, '
+              f'{sum(visible_counts) / frames:6.1f} in view on average, '
+              f'{len(world.status_bars.bar_sets) * 3:>4} bars made, '
+              f'{world.status_bars.redraws} redraws')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--units', type=int, default=5000,
+                        help='Number of units in the world.')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time worlds of different sizes instead of showing one.')
+    parser.add_argument('--counts', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Unit counts to benchmark.')
+    parser.add_argument('--frames', type=int, default=60,
+                        help='Frames to time at each unit count when benchmarking.')
+    parser.add_argument('--warmup-frames', type=int, default=10,
+                        help='Untimed frames run before timing each unit count.')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        use_headless_video_driver()
+        run_benchmark(args.counts, args.frames, args.warmup_frames)
+    else:
+        run_world(args.units)
+
+
+if __name__ == '__main__':
+    main()
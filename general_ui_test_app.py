@@ -1,4 +1,5 @@
 import random
+import time
 import pygame_gui
 from collections import deque
 from typing import Optional
@@ -131,6 +132,110 @@ class EverythingWindow(UIWindow):
             self.slider_label.set_text(str(int(self.test_slider.get_current_value())))
 
 
+class FrameProfiler:
+    """
+    Times each phase of the main loop and keeps running totals over a rolling window of frames,
+    so the averages cost the same to update no matter how large the window is.
+
+    The whole frame time, including waiting on the clock, is kept in the same window, so the
+    FPS and frame time labels don't need a window of their own.
+    """
+    PROCESS_EVENTS = 0
+    UI_MANAGER_UPDATE = 1
+    BACKGROUND_BLIT = 2
+    DRAW_UI = 3
+    DISPLAY_UPDATE = 4
+
+    phase_colours = {'process_events': pygame.Color('#E0504A'),
+                     'ui_manager.update': pygame.Color('#E0C04A'),
+                     'background blit': pygame.Color('#6CD65A'),
+                     'draw_ui': pygame.Color('#4AA8E0'),
+                     'display.update': pygame.Color('#B070E0')}
+
+    def __init__(self, window_size=2000, frame_budget=1.0 / 60.0):
+        self.window_size = window_size
+        self.frame_budget = frame_budget
+        self.phase_names = list(self.phase_colours.keys())
+        self.samples = deque()
+        # one total per phase, then the total of the whole frame times
+        self.totals = [0.0] * (len(self.phase_names) + 1)
+        self.current_frame = [0.0] * len(self.phase_names)
+        self.frames_since_resum = 0
+        self.phase_start = 0.0
+        self.font = None
+
+    def start_phase(self):
+        self.phase_start = time.perf_counter()
+
+    def end_phase(self, phase_index):
+        now = time.perf_counter()
+        self.current_frame[phase_index] = now - self.phase_start
+        self.phase_start = now
+
+    def end_frame(self, time_delta):
+        frame = tuple(self.current_frame) + (time_delta,)
+        self.samples.append(frame)
+        for index, sample_time in enumerate(frame):
+            self.totals[index] += sample_time
+        if len(self.samples) > self.window_size:
+            oldest = self.samples.popleft()
+            for index, sample_time in enumerate(oldest):
+                self.totals[index] -= sample_time
+
+        # Adding and subtracting floats forever slowly drifts, so once per window we
+        # recompute the totals from scratch. That keeps the average cost per frame constant.
+        self.frames_since_resum += 1
+        if self.frames_since_resum >= self.window_size:
+            self.frames_since_resum = 0
+            self.totals = [sum(frame[index] for frame in self.samples)
+                           for index in range(len(self.totals))]
+
+    def is_window_full(self):
+        return len(self.samples) == self.window_size
+
+    def average_phase_times(self):
+        sample_count = max(len(self.samples), 1)
+        return [total / sample_count for total in self.totals[:len(self.phase_names)]]
+
+    def average_frame_time(self):
+        return self.totals[-1] / max(len(self.samples), 1)
+
+    def draw_overlay(self, surface: pygame.Surface, position=(10, 10), bar_width=300):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 18)
+
+        averages = self.average_phase_times()
+        overlay_rect = pygame.Rect(position, (bar_width + 190, 34 + 16 * len(averages)))
+        pygame.draw.rect(surface, pygame.Color('#101010'), overlay_rect)
+
+        # the bar is scaled so that its full width is one frame at the target frame rate
+        bar_rect = pygame.Rect(position[0] + 5, position[1] + 5, bar_width, 20)
+        pygame.draw.rect(surface, pygame.Color('#303030'), bar_rect)
+        segment_left = bar_rect.left
+        for name, average in zip(self.phase_names, averages):
+            segment_width = int(round(bar_width * average / self.frame_budget))
+            segment_width = min(segment_width, bar_rect.right - segment_left)
+            if segment_width > 0:
+                pygame.draw.rect(surface, self.phase_colours[name],
+                                 pygame.Rect(segment_left, bar_rect.top,
+                                             segment_width, bar_rect.height))
+                segment_left += segment_width
+        pygame.draw.rect(surface, pygame.Color('#A0A0A0'), bar_rect, 1)
+
+        text_colour = pygame.Color('#D0D0D0')
+        budget_text = self.font.render(f'{1000.0 * sum(averages):.2f} / '
+                                       f'{1000.0 * self.frame_budget:.1f} ms',
+                                       True, text_colour)
+        surface.blit(budget_text, (bar_rect.right + 8, bar_rect.top + 4))
+        for index, (name, average) in enumerate(zip(self.phase_names, averages)):
+            row_y = bar_rect.bottom + 6 + 16 * index
+            pygame.draw.rect(surface, self.phase_colours[name],
+                             pygame.Rect(bar_rect.left, row_y + 2, 10, 10))
+            surface.blit(self.font.render(f'{name}: {1000.0 * average:.3f} ms',
+                                          True, text_colour),
+                         (bar_rect.left + 16, row_y))
+
+
 class Options:
     def __init__(self):
         self.resolution = (800, 600)
@@ -179,7 +284,9 @@ class OptionsUIApp:
         self.recreate_ui()
 
         self.clock = pygame.time.Clock()
-        self.time_delta_stack = deque([])
+
+        self.profiler = FrameProfiler()
+        self.show_profiler = False
 
         self.button_response_timer = pygame.time.Clock()
         self.running = True
@@ -407,6 +514,9 @@ class OptionsUIApp:
             if event.type == pygame.KEYDOWN and event.key == pygame.K_f:
                 print("self.ui_manager.focused_set:", self.ui_manager.focused_set)
 
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                self.show_profiler = not self.show_profiler
+
             if event.type == pygame.KEYDOWN and event.key == pygame.K_a:
                 self.list.add_items(['New Item'])
 
@@ -467,23 +577,26 @@ class OptionsUIApp:
     def run(self):
         while self.running:
             time_delta = self.clock.tick() / 1000.0
-            self.time_delta_stack.append(time_delta)
-            if len(self.time_delta_stack) > 2000:
-                self.time_delta_stack.popleft()
+
+            self.profiler.start_phase()
 
             # check for input
             self.process_events()
+            self.profiler.end_phase(FrameProfiler.PROCESS_EVENTS)
 
             # respond to input
             self.ui_manager.update(time_delta)
 
-            if len(self.time_delta_stack) == 2000:
+            if self.profiler.is_window_full():
+                average_time_delta = self.profiler.average_frame_time()
                 self.fps_counter.set_text(
-                    f'FPS: {min(999.0, 1.0/max(sum(self.time_delta_stack)/2000.0, 0.0000001)):.2f}')
-                self.frame_timer.set_text(f'frame_time: {sum(self.time_delta_stack)/2000.0:.4f}')
+                    f'FPS: {min(999.0, 1.0/max(average_time_delta, 0.0000001)):.2f}')
+                self.frame_timer.set_text(f'frame_time: {average_time_delta:.4f}')
+            self.profiler.end_phase(FrameProfiler.UI_MANAGER_UPDATE)
 
             # draw graphics
             self.window_surface.blit(self.background_surface, (0, 0))
+            self.profiler.end_phase(FrameProfiler.BACKGROUND_BLIT)
 
             # Debug stuff
             # chunk = self.test_slider.right_button.drawable_shape.text_box_layout.layout_rows[0].items[0]
@@ -494,8 +607,16 @@ class OptionsUIApp:
             #                  1)
 
             self.ui_manager.draw_ui(self.window_surface)
+            self.profiler.end_phase(FrameProfiler.DRAW_UI)
+
+            # drawn outside the timed phases so the overlay doesn't measure itself
+            if self.show_profiler:
+                self.profiler.draw_overlay(self.window_surface)
 
+            self.profiler.start_phase()
             pygame.display.update()
+            self.profiler.end_phase(FrameProfiler.DISPLAY_UPDATE)
+            self.profiler.end_frame(time_delta)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,260 @@
+"""
+Times each of the ways we have of drawing a gradient over a sweep of surface sizes and
+gradient angles, measures the most memory each one uses for temporary surfaces and arrays
+along the way, and compares what each one draws with an exact reference gradient.
+
+Every method draws the same three colour gradient onto a white surface, the way themes use
+gradients. The reference puts the first colour on the starting edge of the surface, the last
+colour on the far edge and blends evenly between them.
+
+At the end, for each size, the cheapest method with a mean error under the quality bar is
+listed.
+"""
+import argparse
+import math
+import time
+import tracemalloc
+import weakref
+
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from pygame_gui.core.colour_gradient import ColourGradient
+
+from benchmarking.results import save_results, summarise, use_headless_video_driver
+from gradients.cached import CachedColourGradient, GradientCache
+from gradients.numpy_gradient import MultiStopGradient
+from gradients.rotozoom_gradient import Gradient
+
+
+GRADIENT_COLOURS = [pygame.Color("#8070A0"), pygame.Color("#80E0CF"), pygame.Color("#F0E0EF")]
+
+
+def parse_size(size_string: str) -> Tuple[int, int]:
+    if size_string.upper() == '4K':
+        return 3840, 2160
+    if 'x' in size_string:
+        width, height = size_string.split('x')
+        return int(width), int(height)
+    return int(size_string), int(size_string)
+
+
+def apply_rotozoom_gradient(gradient_surface: pygame.Surface, surface: pygame.Surface):
+    # make_gradient and make_gradient_2 only make the gradient, this is the rest of the job
+    placement_rect = gradient_surface.get_rect(center=surface.get_rect().center)
+    surface.blit(gradient_surface, placement_rect, special_flags=pygame.BLEND_RGBA_MULT)
+
+
+def make_methods(colours: Sequence[pygame.Color],
+                 angle: int) -> Dict[str, Callable[[pygame.Surface], None]]:
+    """
+    Everything each method needs that doesn't depend on the surface size is made here, up
+    front, so it isn't timed.
+    """
+    colour_gradient = ColourGradient(angle, *colours)
+    cached_colour_gradient = CachedColourGradient(angle, *colours)
+    rotozoom_gradient = Gradient(angle, *colours)
+    multi_stop_gradient = MultiStopGradient(angle, colours)
+
+    def apply_cached_colour_gradient(surface):
+        # a fresh cache each time, so this is the cost of the first use of the gradient
+        cached_colour_gradient.gradient_cache = GradientCache()
+        cached_colour_gradient.apply_gradient_to_surface(surface)
+
+    return {'ColourGradient': colour_gradient.apply_gradient_to_surface,
+            'CachedColourGradient': apply_cached_colour_gradient,
+            'Gradient.make_gradient': lambda surface: apply_rotozoom_gradient(
+                rotozoom_gradient.make_gradient(surface), surface),
+            'Gradient.make_gradient_2': lambda surface: apply_rotozoom_gradient(
+                rotozoom_gradient.make_gradient_2(surface), surface),
+            'MultiStopGradient': multi_stop_gradient.apply_gradient_to_surface}
+
+
+def reference_gradient(colours: Sequence[pygame.Color], angle: int,
+                       size: Tuple[int, int]) -> np.ndarray:
+    """
+    The exact colour of every pixel, as a (width, height, 3) array of floats.
+    """
+    width, height = size
+    direction_x = math.cos(math.radians(angle))
+    direction_y = -math.sin(math.radians(angle))
+    half_extent = (abs(direction_x) * width + abs(direction_y) * height) / 2
+    x_positions = (np.arange(width) + 0.5 - width / 2) * direction_x
+    y_positions = (np.arange(height) + 0.5 - height / 2) * direction_y
+    positions = ((x_positions[:, np.newaxis] + y_positions[np.newaxis, :]) /
+                 (2 * half_extent) + 0.5)
+    stops = np.linspace(0.0, 1.0, len(colours))
+    reference = np.empty((width, height, 3), dtype=np.float64)
+    for channel in range(3):
+        reference[..., channel] = np.interp(positions, stops,
+                                            [colour[channel] for colour in colours])
+    return reference
+
+
+class TemporaryMemoryTracker:
+    """
+    While active, keeps track of the surfaces made by pygame.Surface and pygame.transform, and
+    the NumPy arrays allocated, and records the most bytes of each alive at once.
+
+    Surfaces made before the tracker started, like the one being drawn on, aren't counted.
+    """
+    transform_functions = ('rotate', 'rotozoom', 'scale', 'smoothscale', 'flip')
+
+    def __init__(self):
+        self.live_surface_bytes = 0
+        self.peak_surface_bytes = 0
+        self.peak_array_bytes = 0
+        self.originals = {}
+
+    @property
+    def peak_bytes(self) -> int:
+        # the two peaks may not have happened at the same moment, so this is an upper bound
+        return self.peak_surface_bytes + self.peak_array_bytes
+
+    def surface_made(self, surface: pygame.Surface):
+        surface_bytes = surface.get_pitch() * surface.get_height()
+        self.live_surface_bytes += surface_bytes
+        self.peak_surface_bytes = max(self.peak_surface_bytes, self.live_surface_bytes)
+        weakref.finalize(surface, self.surface_freed, surface_bytes)
+
+    def surface_freed(self, surface_bytes: int):
+        self.live_surface_bytes -= surface_bytes
+
+    def _wrap_transform(self, function):
+        def tracked_transform(surface, *args, **kwargs):
+            result = function(surface, *args, **kwargs)
+            # scale() can draw into a surface we were given rather than making one
+            if all(result is not argument for argument in args + tuple(kwargs.values())):
+                self.surface_made(result)
+            return result
+        return tracked_transform
+
+    def __enter__(self):
+        tracker = self
+
+        class TrackedSurface(pygame.Surface):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                tracker.surface_made(self)
+
+        self.originals = {'Surface': pygame.Surface}
+        pygame.Surface = pygame.surface.Surface = TrackedSurface
+        for function_name in self.transform_functions:
+            self.originals[function_name] = getattr(pygame.transform, function_name)
+            setattr(pygame.transform, function_name,
+                    self._wrap_transform(self.originals[function_name]))
+        tracemalloc.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.peak_array_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        pygame.Surface = pygame.surface.Surface = self.originals['Surface']
+        for function_name in self.transform_functions:
+            setattr(pygame.transform, function_name, self.originals[function_name])
+
+
+def white_surface(size: Tuple[int, int]) -> pygame.Surface:
+    surface = pygame.Surface(size, flags=pygame.SRCALPHA, depth=32)
+    surface.fill(pygame.Color('#FFFFFFFF'))
+    return surface
+
+
+def measure_method(method: Callable[[pygame.Surface], None], size: Tuple[int, int],
+                   reference: np.ndarray, repeats: int) -> Dict[str, float]:
+    times = []
+    for _ in range(repeats):
+        surface = white_surface(size)
+        start_time = time.perf_counter()
+        method(surface)
+        times.append(time.perf_counter() - start_time)
+
+    # memory and output come from a separate run, the tracking slows things down
+    surface = white_surface(size)
+    with TemporaryMemoryTracker() as tracker:
+        method(surface)
+    errors = np.abs(pygame.surfarray.array3d(surface) - reference)
+    return {'seconds': summarise(times)['median'],
+            'peak_temporary_bytes': tracker.peak_bytes,
+            'mean_error': float(errors.mean()),
+            'max_error': float(errors.max())}
+
+
+def summarise_angles(angle_results: List[Dict[str, float]]) -> Dict[str, float]:
+    return {'median_seconds': summarise([result['seconds'] for result in angle_results])['median'],
+            'worst_seconds': max(result['seconds'] for result in angle_results),
+            'peak_temporary_bytes': max(result['peak_temporary_bytes']
+                                        for result in angle_results),
+            'mean_error': sum(result['mean_error'] for result in angle_results) / len(angle_results),
+            'max_error': max(result['max_error'] for result in angle_results)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+',
+                        default=['16', '32', '64', '128', '256', '512', '1024', '2048', '4K'],
+                        help='Surface sizes to try, as N for a square, WxH, or 4K.')
+    parser.add_argument('--angle-step', type=int, default=30,
+                        help='Degrees between the angles tried; 1 tries every angle.')
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='Timed runs of each method at each size and angle.')
+    parser.add_argument('--methods', nargs='+', default=None,
+                        help='Only try these methods.')
+    parser.add_argument('--quality-bar', type=float, default=2.0,
+                        help='Highest acceptable mean error, in colour levels out of 255.')
+    parser.add_argument('--results', default=None,
+                        help='Optional JSON file to save the results to.')
+    args = parser.parse_args()
+
+    use_headless_video_driver()
+    pygame.init()
+    pygame.display.set_mode((64, 64))
+
+    angles = list(range(0, 360, args.angle_step))
+    method_names = args.methods or list(make_methods(GRADIENT_COLOURS, 0))
+    print(f'{len(angles)} angles from 0 to {angles[-1]} degrees\n')
+    print(f'{"size":<11}{"method":<26}{"ms p50":>9}{"worst":>9}{"temp MB":>9}'
+          f'{"mean err":>10}{"max err":>9}')
+
+    results = {}
+    for size_string in args.sizes:
+        size = parse_size(size_string)
+        size_name = f'{size[0]}x{size[1]}'
+        angle_results: Dict[str, Dict[str, Dict[str, float]]] = {name: {}
+                                                                  for name in method_names}
+        for angle in angles:
+            reference = reference_gradient(GRADIENT_COLOURS, angle, size)
+            methods = make_methods(GRADIENT_COLOURS, angle)
+            for method_name in method_names:
+                angle_results[method_name][str(angle)] = measure_method(
+                    methods[method_name], size, reference, args.repeats)
+
+        size_summaries = {}
+        for method_name in method_names:
+            size_summary = summarise_angles(list(angle_results[method_name].values()))
+            size_summaries[method_name] = size_summary
+            results.setdefault(method_name, {})[size_name] = {
+                'summary': size_summary, 'angles': angle_results[method_name]}
+            print(f'{size_name:<11}{method_name:<26}{size_summary["median_seconds"] * 1000:>9.3f}'
+                  f'{size_summary["worst_seconds"] * 1000:>9.3f}'
+                  f'{size_summary["peak_temporary_bytes"] / (1024 * 1024):>9.2f}'
+                  f'{size_summary["mean_error"]:>10.2f}{size_summary["max_error"]:>9.0f}')
+
+        good_enough = [method_name for method_name in method_names
+                       if size_summaries[method_name]['mean_error'] <= args.quality_bar]
+        if good_enough:
+            cheapest = min(good_enough,
+                           key=lambda method_name: size_summaries[method_name]['median_seconds'])
+            print(f'{size_name:<11}cheapest under the quality bar: {cheapest}\n')
+        else:
+            print(f'{size_name:<11}nothing under the quality bar\n')
+
+    if args.results is not None:
+        save_results(args.results, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,93 +1,83 @@
-from typing import Union
+import argparse
+import time
 
 import pygame
 import pygame_gui
 
 from pygame_gui.core.colour_gradient import ColourGradient
 
+from benchmarking.results import summarise
+from gradients.cached import CachedColourGradient, GradientCache
+from gradients.numpy_gradient import MultiStopGradient
+from gradients.rotozoom_gradient import Gradient
+
 """
 Testing the quality of doing cheaper gradients.
-"""
 
+Run with --benchmark to also time the gradients before the window opens; for a fuller
+comparison over many sizes and angles, see gradient_benchmark.py.
+"""
 
-class Gradient:
-    def __init__(self, angle_direction: int, colour_1: pygame.Color,
-                 colour_2: pygame.Color, colour_3: Union[pygame.Color, None] = None):
-        self.angle_direction = angle_direction
-        self.colour_1 = colour_1
-        self.colour_2 = colour_2
-        self.colour_3 = colour_3
-
-    def make_gradient(self, input_surface):
-        inverse_rotated_input = pygame.transform.rotate(input_surface, -self.angle_direction)
-        gradient_size = inverse_rotated_input.get_rect().size
-
-        # create the initial 'pixel coloured' surface with a pixel for each colour
-        if self.colour_3 is None:
-            pixel_width = 2
-            colour_pixels_surf = pygame.Surface((pixel_width, 1), flags=pygame.SRCALPHA)
-            colour_pixels_surf.fill(self.colour_1, pygame.Rect((0, 0), (1, 1)))
-            colour_pixels_surf.fill(self.colour_2, pygame.Rect((1, 0), (1, 1)))
-        else:
-            pixel_width = 3
-            colour_pixels_surf = pygame.Surface((pixel_width, 1), flags=pygame.SRCALPHA)
-            colour_pixels_surf.fill(self.colour_1, pygame.Rect((0, 0), (1, 1)))
-            colour_pixels_surf.fill(self.colour_2, pygame.Rect((1, 0), (1, 1)))
-            colour_pixels_surf.fill(self.colour_3, pygame.Rect((2, 0), (1, 1)))
-
-        # create a surface large enough to overlap the input surface at any rotation angle
-        gradient_surf = pygame.Surface(gradient_size, flags=pygame.SRCALPHA)
-
-        # scale the pixel surface to fill our new large, gradient surface
-        # pygame.transform.smoothscale Occasionally gives a
-        # 'Fatal Python error: PyEval_SaveThread: NULL tstate'
-        # which is apparently a threading issue with the GIL.
-
-        # pygame.transform.smoothscale(colour_pixels_surf, gradient_size, gradient_surf)
-
-        # Try this instead
-        scale = float(max(gradient_size[0] / pixel_width, gradient_size[1]))
-        zoomed_surf = pygame.transform.rotozoom(colour_pixels_surf, 0, scale)
-        pygame.transform.scale(zoomed_surf, gradient_size, gradient_surf)
-
-        # rotate the gradient surface to the correct angle for our gradient
-        gradient_surf = pygame.transform.rotate(gradient_surf, self.angle_direction)
-        return gradient_surf
-
-    def make_gradient_2(self, input_surface):
-        if self.colour_3 is None:
-            pixel_width = 2
-            colour_pixels_surf = pygame.Surface((pixel_width, 1), flags=pygame.SRCALPHA)
-            colour_pixels_surf.fill(self.colour_1, pygame.Rect((0, 0), (1, 1)))
-            colour_pixels_surf.fill(self.colour_2, pygame.Rect((1, 0), (1, 1)))
-        else:
-            pixel_width = 3
-            colour_pixels_surf = pygame.Surface((pixel_width, 1), flags=pygame.SRCALPHA)
-            colour_pixels_surf.fill(self.colour_1, pygame.Rect((0, 0), (1, 1)))
-            colour_pixels_surf.fill(self.colour_2, pygame.Rect((1, 0), (1, 1)))
-            colour_pixels_surf.fill(self.colour_3, pygame.Rect((2, 0), (1, 1)))
-
-        gradient = pygame.transform.rotozoom(colour_pixels_surf, 0, 30)
-
-        # scale the gradient up to the right size
-        inverse_rotated_input = pygame.transform.rotate(input_surface, -self.angle_direction)
-        gradient_size = inverse_rotated_input.get_rect().size
-        gradient_surf = pygame.Surface(gradient_size, flags=pygame.SRCALPHA)
-
-        pygame.transform.scale(gradient, gradient_size, gradient_surf)
-        gradient_surf = pygame.transform.rotate(gradient_surf, self.angle_direction)
-
-        return gradient_surf
 
+def time_button_gradients(gradient, button_count=300):
+    # a theme's worth of buttons comes in a handful of sizes
+    button_sizes = [(100, 30), (150, 30), (200, 40), (60, 60)]
+    start_time = time.perf_counter()
+    for button_index in range(button_count):
+        button_surf = pygame.Surface(button_sizes[button_index % len(button_sizes)],
+                                     flags=pygame.SRCALPHA)
+        button_surf.fill("white")
+        gradient.apply_gradient_to_surface(button_surf)
+    return time.perf_counter() - start_time
+
+
+def benchmark_gradients(gradient, repeats=100):
+    """
+    Time each way of making the gradient on the three test shapes. make_gradient and
+    make_gradient_2 only make a gradient surface, so they're matched with
+    MultiStopGradient.render(); the others apply the gradient to a white surface.
+    """
+    colours = [gradient.colour_1, gradient.colour_2]
+    if gradient.colour_3 is not None:
+        colours.append(gradient.colour_3)
+    colour_gradient = ColourGradient(gradient.angle_direction, *colours)
+    multi_stop_gradient = MultiStopGradient(gradient.angle_direction, colours)
+    methods = {'Gradient.make_gradient': gradient.make_gradient,
+               'Gradient.make_gradient_2': gradient.make_gradient_2,
+               'MultiStopGradient.render':
+                   lambda surf: multi_stop_gradient.render(surf.get_size()),
+               'ColourGradient apply': colour_gradient.apply_gradient_to_surface,
+               'MultiStopGradient apply': multi_stop_gradient.apply_gradient_to_surface}
+    shape_sizes = [(300, 25), (25, 300), (300, 300)]
+
+    print(f'{gradient.angle_direction} degree gradient, median ms of {repeats} runs')
+    print(f'{"":<26}' + ''.join(f'{f"{size[0]}x{size[1]}":>10}' for size in shape_sizes))
+    for method_name, method in methods.items():
+        medians = []
+        for shape_size in shape_sizes:
+            shape_surf = pygame.Surface(shape_size, flags=pygame.SRCALPHA)
+            shape_surf.fill("white")
+            times = []
+            for _ in range(repeats):
+                start_time = time.perf_counter()
+                method(shape_surf)
+                times.append(time.perf_counter() - start_time)
+            medians.append(summarise(times)['median'])
+        print(f'{method_name:<26}' + ''.join(f'{median * 1000:>10.3f}' for median in medians))
+
+
+parser = argparse.ArgumentParser(description='Compare the ways of drawing gradients.')
+parser.add_argument('--benchmark', action='store_true',
+                    help='Time the gradients and print the results before showing them.')
+args = parser.parse_args()
 
 pygame.init()
 
-
 pygame.display.set_caption('Quick Start')
-window_surface = pygame.display.set_mode((800, 600))
-manager = pygame_gui.UIManager((800, 600), 'data/themes/quick_theme.json')
+window_surface = pygame.display.set_mode((1150, 600))
+manager = pygame_gui.UIManager((1150, 600), 'data/themes/quick_theme.json')
 
-background = pygame.Surface((800, 600))
+background = pygame.Surface((1150, 600))
 background.fill(manager.get_theme().get_colour('dark_bg'))
 
 test_gradient_1 = ColourGradient(-90, pygame.Color("#FF0000"), pygame.Color("#FF80FF"))
@@ -104,6 +94,14 @@ big_surf = pygame.Surface((300, 300))
 big_surf.fill("white")
 test_gradient_1.apply_gradient_to_surface(big_surf, pygame.Rect(0, 0, 150, 150))
 
+if args.benchmark:
+    cached_gradient_1 = CachedColourGradient(-90, pygame.Color("#FF0000"),
+                                             pygame.Color("#FF80FF"),
+                                             gradient_cache=GradientCache())
+    for gradient in (test_gradient_1, cached_gradient_1):
+        print(f'{type(gradient).__name__}: 300 button gradients in '
+              f'{time_button_gradients(gradient) * 1000:.1f}ms')
+
 
 # gradient 2
 
@@ -121,6 +119,19 @@ tall_thin_surf_2 = test_gradient_2.make_gradient_2(tall_thin_surf_2)
 big_surf_2 = pygame.Surface((300, 300))
 big_surf_2 = test_gradient_2.make_gradient_2(big_surf_2)
 
+if args.benchmark:
+    benchmark_gradients(test_gradient_2)
+
+# gradient 3, drawn with NumPy, which isn't limited to three colours
+
+test_gradient_3 = MultiStopGradient(45, [pygame.Color("#8070A0"), pygame.Color("#80E0CF"),
+                                         pygame.Color("#F0E0EF"), pygame.Color("#F08040")],
+                                    stops=[0.0, 0.3, 0.6, 1.0])
+
+long_thin_surf_3 = test_gradient_3.render((300, 25))
+tall_thin_surf_3 = test_gradient_3.render((25, 300))
+big_surf_3 = test_gradient_3.render((300, 300))
+
 clock = pygame.time.Clock()
 is_running = True
 
@@ -145,4 +156,8 @@ while is_running:
     window_surface.blit(tall_thin_surf_2, (750, 10))
     window_surface.blit(big_surf_2, (360, 50))
 
+    window_surface.blit(long_thin_surf_3, (800, 10))
+    window_surface.blit(tall_thin_surf_3, (1110, 10))
+    window_surface.blit(big_surf_3, (800, 50))
+
     pygame.display.update()
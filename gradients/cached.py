@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from typing import Tuple, Union
+
+import pygame
+import pygame_gui
+
+from pygame_gui.core.colour_gradient import ColourGradient
+
+
+class GradientCache:
+    """
+    Keeps hold of finished gradient surfaces so that drawing lots of same sized shapes with the
+    same gradient, like a theme full of buttons, only has to scale and rotate the gradient once.
+
+    Surfaces are looked up by the gradient's colours and angle plus the size they were made
+    for. The least recently used ones are dropped when the cache goes over max_bytes.
+
+    :param max_bytes: The most surface data to hold on to, counting 4 bytes per pixel.
+    """
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.surfaces: OrderedDict = OrderedDict()
+        self.cached_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_gradient_surface(self, gradient: ColourGradient,
+                             size: Tuple[int, int]) -> pygame.Surface:
+        """
+        Get a gradient surface for covering an area of the given size. Don't draw on it, it's
+        shared with everything else using the same gradient at this size.
+
+        At angles other than right angles the surface is bigger than the area, to cover it
+        once rotated.
+        """
+        key = (str(gradient), size)
+        if key in self.surfaces:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return self.surfaces[key]
+
+        self.misses += 1
+        gradient_surface = self.make_gradient_surface(gradient, size)
+        self.surfaces[key] = gradient_surface
+        self.cached_bytes += gradient_surface.get_width() * gradient_surface.get_height() * 4
+        while self.cached_bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, dropped_surface = self.surfaces.popitem(last=False)
+            self.cached_bytes -= dropped_surface.get_width() * dropped_surface.get_height() * 4
+        return gradient_surface
+
+    @staticmethod
+    def make_gradient_surface(gradient: ColourGradient,
+                              size: Tuple[int, int]) -> pygame.Surface:
+        angle = gradient.angle_direction % 360
+        if angle % 90 == 0:
+            # At right angles, rotating the little gradient before scaling gives the same result
+            # as scaling it up to the rotated size and then rotating that, without ever making
+            # or rotating a full size surface.
+            return pygame.transform.scale(
+                pygame.transform.rotate(gradient.gradient_surface, angle), size)
+
+        # the same as ColourGradient.apply_gradient_to_surface()
+        gradient_size = pygame.transform.rotate(
+            pygame.Surface(size, flags=pygame.SRCALPHA, depth=32), -angle).get_size()
+        gradient_surface = pygame.transform.scale(gradient.gradient_surface, gradient_size)
+        return pygame.transform.rotate(gradient_surface, angle)
+
+
+default_gradient_cache = GradientCache()
+
+
+class CachedColourGradient(ColourGradient):
+    """
+    A ColourGradient that gets its finished gradient surfaces from a GradientCache rather than
+    making them every time it's applied.
+
+    :param angle_direction: Angle direction of the gradient in degrees.
+    :param colour_1: The first colour of the gradient.
+    :param colour_2: The second colour of the gradient.
+    :param colour_3: An optional third colour for the gradient.
+    :param gradient_cache: The cache to use, the shared default one if None.
+    """
+    def __init__(self, angle_direction: int, colour_1: pygame.Color, colour_2: pygame.Color,
+                 colour_3: Union[pygame.Color, None] = None,
+                 gradient_cache: Union[GradientCache, None] = None):
+        super().__init__(angle_direction, colour_1, colour_2, colour_3)
+        self.gradient_cache = (gradient_cache if gradient_cache is not None
+                               else default_gradient_cache)
+
+    @classmethod
+    def from_gradient(cls, gradient: ColourGradient,
+                      gradient_cache: Union[GradientCache, None] = None):
+        return cls(gradient.angle_direction, gradient.colour_1, gradient.colour_2,
+                   gradient.colour_3, gradient_cache)
+
+    def apply_gradient_to_surface(self, input_surface: pygame.Surface,
+                                  rect: Union[pygame.Rect, None] = None):
+        """
+        Applies this gradient to a specified input surface using blending multiplication, the
+        same as ColourGradient does.
+
+        :param input_surface: The surface to apply the gradient to.
+        :param rect: The rectangle on the surface to apply the gradient to. If None, applies to
+                     the whole surface.
+        """
+        area_size = rect.size if rect is not None else input_surface.get_size()
+        if area_size[0] <= 0 or area_size[1] <= 0:
+            return
+        gradient_surface = self.gradient_cache.get_gradient_surface(self, tuple(area_size))
+
+        if rect is not None:
+            input_surface.set_clip(rect)
+            input_surface.blit(gradient_surface, rect, special_flags=pygame.BLEND_RGBA_MULT)
+            input_surface.set_clip(None)
+        else:
+            gradient_placement_rect = gradient_surface.get_rect()
+            gradient_placement_rect.center = (int(area_size[0] / 2), int(area_size[1] / 2))
+            input_surface.blit(gradient_surface, gradient_placement_rect,
+                               special_flags=pygame.BLEND_RGBA_MULT)
+
+
+def install_gradient_cache(manager: pygame_gui.UIManager,
+                           gradient_cache: Union[GradientCache, None] = None):
+    """
+    Swap every gradient in the manager's theme for a CachedColourGradient. Elements pick up
+    their gradients from the theme when they're built, so do this after loading the theme and
+    before making any elements, and again after loading another theme.
+    """
+    theme = manager.get_theme()
+    colour_dicts = [theme.base_colours] + list(theme.ui_element_colours.values())
+    for colours in colour_dicts:
+        for colour_id, colour in colours.items():
+            if isinstance(colour, ColourGradient) and not isinstance(colour, CachedColourGradient):
+                colours[colour_id] = CachedColourGradient.from_gradient(colour, gradient_cache)
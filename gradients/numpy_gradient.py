@@ -0,0 +1,133 @@
+import math
+
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pygame
+
+from pygame_gui.core.colour_gradient import ColourGradient
+from pygame_gui.core.interfaces.colour_gradient_interface import IColourGradientInterface
+
+
+class MultiStopGradient(IColourGradientInterface):
+    """
+    A linear gradient through any number of colour stops, drawn straight into a surface's
+    pixels with NumPy.
+
+    ColourGradient scales a two or three pixel surface up past the size of the surface and
+    rotates it, which makes several big surfaces along the way. Here each pixel's position
+    along the gradient is worked out from its coordinates in one pass and used to look up its
+    colour, so nothing bigger than the surface is made. At right angles a single row or column
+    of colours is worked out and repeated across the surface.
+
+    Angles go anticlockwise from the first colour on the left, the same as ColourGradient.
+
+    :param angle_direction: Angle direction of the gradient in degrees.
+    :param colours: The colours to pass through, at least two.
+    :param stops: Where each colour sits along the gradient, from 0.0 to 1.0 in increasing
+                  order. If None the colours are spaced out evenly.
+    """
+    lookup_size = 1024
+
+    def __init__(self, angle_direction: float, colours: Sequence[pygame.Color],
+                 stops: Optional[Sequence[float]] = None):
+        if len(colours) < 2:
+            raise ValueError('A gradient needs at least two colours')
+        if stops is None:
+            stops = np.linspace(0.0, 1.0, len(colours))
+        if len(stops) != len(colours):
+            raise ValueError('A gradient needs one stop for each colour')
+        if any(later_stop < stop for stop, later_stop in zip(stops, stops[1:])):
+            raise ValueError('Gradient stops must be in increasing order')
+
+        self.angle_direction = angle_direction
+        self.colours: List[pygame.Color] = [pygame.Color(colour) for colour in colours]
+        self.stops: List[float] = [float(stop) for stop in stops]
+
+        # every colour the gradient passes through, looked up by position along the gradient,
+        # already packed into pixels for a 32 bit surface with per pixel alpha
+        lookup_positions = np.linspace(0.0, 1.0, self.lookup_size)
+        pixel_format = pygame.Surface((1, 1), flags=pygame.SRCALPHA, depth=32)
+        self.colour_lookup = np.zeros(self.lookup_size, dtype=np.uint32)
+        for channel, shift in enumerate(pixel_format.get_shifts()):
+            channel_values = np.rint(np.interp(lookup_positions, self.stops,
+                                               [colour[channel] for colour in self.colours]))
+            self.colour_lookup |= channel_values.astype(np.uint32) << np.uint32(shift)
+
+    @classmethod
+    def from_colour_gradient(cls, gradient: ColourGradient):
+        colours = [gradient.colour_1, gradient.colour_2]
+        if gradient.colour_3 is not None:
+            colours.append(gradient.colour_3)
+        return cls(gradient.angle_direction, colours)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MultiStopGradient):
+            return False
+        return (self.angle_direction == other.angle_direction and
+                self.colours == other.colours and self.stops == other.stops)
+
+    def __str__(self) -> str:
+        return '_'.join([str(self.angle_direction)] +
+                        [f'{stop}_{colour.r}_{colour.g}_{colour.b}_{colour.a}'
+                         for stop, colour in zip(self.stops, self.colours)])
+
+    def lookup_indices(self, size: Tuple[int, int]) -> np.ndarray:
+        """
+        The index into colour_lookup of every pixel in an area of the given size, as a
+        (width, height) array to match pygame's surfarray, or as a (width, 1) or (1, height)
+        array at right angles, where one row or column covers the whole area.
+        """
+        width, height = size
+        angle = math.radians(self.angle_direction)
+        direction_x = math.cos(angle)
+        # y goes down the screen, so anticlockwise is up
+        direction_y = -math.sin(angle)
+        if abs(direction_x) < 1e-9:
+            direction_x = 0.0
+        if abs(direction_y) < 1e-9:
+            direction_y = 0.0
+
+        # the gradient runs across the area's extent along the direction, between the corners
+        half_extent = (abs(direction_x) * width + abs(direction_y) * height) / 2
+        scale = (self.lookup_size - 1) / (2 * half_extent)
+        x_positions = ((np.arange(width, dtype=np.float32) + 0.5 - width / 2) *
+                       (direction_x * scale))
+        y_positions = ((np.arange(height, dtype=np.float32) + 0.5 - height / 2) *
+                       (direction_y * scale))
+        if direction_y == 0.0:
+            positions = x_positions[:, np.newaxis]
+        elif direction_x == 0.0:
+            positions = y_positions[np.newaxis, :]
+        else:
+            positions = x_positions[:, np.newaxis] + y_positions[np.newaxis, :]
+        positions += (self.lookup_size - 1) / 2 + 0.5
+        return np.clip(positions, 0, self.lookup_size - 1).astype(np.int32)
+
+    def render(self, size: Tuple[int, int]) -> pygame.Surface:
+        """
+        Make a new surface of the given size filled with this gradient.
+        """
+        surface = pygame.Surface(size, flags=pygame.SRCALPHA, depth=32)
+        if size[0] <= 0 or size[1] <= 0:
+            return surface
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[...] = self.colour_lookup[self.lookup_indices(size)]
+        del pixels
+        return surface
+
+    def apply_gradient_to_surface(self, input_surface: pygame.Surface,
+                                  rect: Union[pygame.Rect, None] = None):
+        """
+        Applies this gradient to a specified input surface using blending multiplication, the
+        same as ColourGradient does. The gradient surface made for this is only as big as the
+        area it's applied to.
+
+        :param input_surface: The surface to apply the gradient to.
+        :param rect: The rectangle on the surface to apply the gradient to. If None, applies to
+                     the whole surface.
+        """
+        area = rect if rect is not None else input_surface.get_rect()
+        if area.width <= 0 or area.height <= 0:
+            return
+        input_surface.blit(self.render(area.size), area, special_flags=pygame.BLEND_RGBA_MULT)
@@ -0,0 +1,82 @@
+from typing import Union
+
+import pygame
+
+
+class Gradient:
+    """
+    The cheaper ways of making gradients tried out in gradient_test.py; a two or three pixel
+    surface is zoomed and scaled up to cover the surface at its rotated size, then rotated.
+
+    :param angle_direction: Angle direction of the gradient in degrees.
+    :param colour_1: The first colour of the gradient.
+    :param colour_2: The second colour of the gradient.
+    :param colour_3: An optional third colour for the gradient.
+    """
+    def __init__(self, angle_direction: int, colour_1: pygame.Color,
+                 colour_2: pygame.Color, colour_3: Union[pygame.Color, None] = None):
+        self.angle_direction = angle_direction
+        self.colour_1 = colour_1
+        self.colour_2 = colour_2
+        self.colour_3 = colour_3
+
+    def make_gradient(self, input_surface):
+        inverse_rotated_input = pygame.transform.rotate(input_surface, -self.angle_direction)
+        gradient_size = inverse_rotated_input.get_rect().size
+
+        # create the initial 'pixel coloured' surface with a pixel for each colour
+        if self.colour_3 is None:
+            pixel_width = 2
+            colour_pixels_surf = pygame.Surface((pixel_width, 1), flags=pygame.SRCALPHA)
+            colour_pixels_surf.fill(self.colour_1, pygame.Rect((0, 0), (1, 1)))
+            colour_pixels_surf.fill(self.colour_2, pygame.Rect((1, 0), (1, 1)))
+        else:
+            pixel_width = 3
+            colour_pixels_surf = pygame.Surface((pixel_width, 1), flags=pygame.SRCALPHA)
+            colour_pixels_surf.fill(self.colour_1, pygame.Rect((0, 0), (1, 1)))
+            colour_pixels_surf.fill(self.colour_2, pygame.Rect((1, 0), (1, 1)))
+            colour_pixels_surf.fill(self.colour_3, pygame.Rect((2, 0), (1, 1)))
+
+        # create a surface large enough to overlap the input surface at any rotation angle
+        gradient_surf = pygame.Surface(gradient_size, flags=pygame.SRCALPHA)
+
+        # scale the pixel surface to fill our new large, gradient surface
+        # pygame.transform.smoothscale Occasionally gives a
+        # 'Fatal Python error: PyEval_SaveThread: NULL tstate'
+        # which is apparently a threading issue with the GIL.
+
+        # pygame.transform.smoothscale(colour_pixels_surf, gradient_size, gradient_surf)
+
+        # Try this instead
+        scale = float(max(gradient_size[0] / pixel_width, gradient_size[1]))
+        zoomed_surf = pygame.transform.rotozoom(colour_pixels_surf, 0, scale)
+        pygame.transform.scale(zoomed_surf, gradient_size, gradient_surf)
+
+        # rotate the gradient surface to the correct angle for our gradient
+        gradient_surf = pygame.transform.rotate(gradient_surf, self.angle_direction)
+        return gradient_surf
+
+    def make_gradient_2(self, input_surface):
+        if self.colour_3 is None:
+            pixel_width = 2
+            colour_pixels_surf = pygame.Surface((pixel_width, 1), flags=pygame.SRCALPHA)
+            colour_pixels_surf.fill(self.colour_1, pygame.Rect((0, 0), (1, 1)))
+            colour_pixels_surf.fill(self.colour_2, pygame.Rect((1, 0), (1, 1)))
+        else:
+            pixel_width = 3
+            colour_pixels_surf = pygame.Surface((pixel_width, 1), flags=pygame.SRCALPHA)
+            colour_pixels_surf.fill(self.colour_1, pygame.Rect((0, 0), (1, 1)))
+            colour_pixels_surf.fill(self.colour_2, pygame.Rect((1, 0), (1, 1)))
+            colour_pixels_surf.fill(self.colour_3, pygame.Rect((2, 0), (1, 1)))
+
+        gradient = pygame.transform.rotozoom(colour_pixels_surf, 0, 30)
+
+        # scale the gradient up to the right size
+        inverse_rotated_input = pygame.transform.rotate(input_surface, -self.angle_direction)
+        gradient_size = inverse_rotated_input.get_rect().size
+        gradient_surf = pygame.Surface(gradient_size, flags=pygame.SRCALPHA)
+
+        pygame.transform.scale(gradient, gradient_size, gradient_surf)
+        gradient_surf = pygame.transform.rotate(gradient_surf, self.angle_direction)
+
+        return gradient_surf
@@ -1,7 +1,11 @@
+import html
 import re
+import threading
+from bisect import bisect_left
 from collections import OrderedDict
 from os import listdir, linesep
 from os.path import isfile, join, basename, splitext
+from typing import Callable, Dict, List, Optional, Tuple
 
 import pygame
 import pygame_gui
@@ -9,8 +13,212 @@ import pygame_gui
 from pygame_gui.elements import UITextBox
 
 
+class GUIopediaSearchIndex:
+    """
+    An inverted index of the words on each page, built once so searches only look up the
+    query words instead of scanning every page.
+
+    Pages are tokenised into case-folded words with the HTML tags removed, and for each word
+    we store how many times it appears on each page. A search word ending in '*' matches every
+    word starting with it. Results are ranked by how many of the search words a page matches,
+    then by the total number of matches.
+    """
+    tag_pattern = re.compile(r'<[^>]*>')
+    word_pattern = re.compile(r'\w+')
+
+    def __init__(self):
+        self.term_frequencies: Dict[str, Dict[str, int]] = {}
+        self.sorted_terms: Optional[List[str]] = None
+
+    @classmethod
+    def tokenise(cls, text: str) -> List[str]:
+        return [word.casefold() for word in cls.word_pattern.findall(text)]
+
+    def add_page(self, page_id: str, page_text: str):
+        plain_text = html.unescape(self.tag_pattern.sub(' ', page_text))
+        for term in self.tokenise(plain_text):
+            page_frequencies = self.term_frequencies.setdefault(term, {})
+            page_frequencies[page_id] = page_frequencies.get(page_id, 0) + 1
+        self.sorted_terms = None
+
+    def expand_prefix(self, prefix: str) -> List[str]:
+        # terms sharing a prefix sit next to each other in sorted order
+        if self.sorted_terms is None:
+            self.sorted_terms = sorted(self.term_frequencies)
+        terms = []
+        index = bisect_left(self.sorted_terms, prefix)
+        while index < len(self.sorted_terms) and self.sorted_terms[index].startswith(prefix):
+            terms.append(self.sorted_terms[index])
+            index += 1
+        return terms
+
+    def search(self, search_string: str,
+               is_cancelled: Optional[Callable[[], bool]] = None) -> OrderedDict:
+        page_scores: Dict[str, int] = {}
+        page_terms_matched: Dict[str, int] = {}
+        for search_word in search_string.split():
+            if is_cancelled is not None and is_cancelled():
+                return OrderedDict()
+            is_prefix = search_word.endswith('*')
+            for query_term in self.tokenise(search_word):
+                matching_terms = (self.expand_prefix(query_term) if is_prefix
+                                  else [query_term])
+                matched_pages = set()
+                for term in matching_terms:
+                    for page_id, frequency in self.term_frequencies.get(term, {}).items():
+                        page_scores[page_id] = page_scores.get(page_id, 0) + frequency
+                        matched_pages.add(page_id)
+                for page_id in matched_pages:
+                    page_terms_matched[page_id] = page_terms_matched.get(page_id, 0) + 1
+
+        sorted_results = sorted(page_scores.items(),
+                                key=lambda item: (page_terms_matched[item[0]], item[1]),
+                                reverse=True)
+        return OrderedDict(sorted_results)
+
+
+class GUIopediaPages:
+    """
+    The GUIopedia's pages, read from disk the first time they are looked at.
+
+    Only the list of page files is read up front. Page text is kept in a small least recently
+    used cache, so memory use and start up time don't grow with the size of the help corpus.
+    Generated pages, like the search results, are stored separately and never evicted.
+
+    :param page_path: Directory holding the page .html files.
+    :param max_cached_pages: How many page texts to keep in memory at once.
+    """
+    def __init__(self, page_path: str = 'data/guiopedia/', max_cached_pages: int = 32):
+        self.max_cached_pages = max_cached_pages
+        self.page_file_paths: Dict[str, str] = {}
+        for file_name in listdir(page_path):
+            file_path = join(page_path, file_name)
+            if isfile(file_path):
+                self.page_file_paths[splitext(basename(file_path))[0]] = file_path
+
+        self.cached_pages: OrderedDict = OrderedDict()
+        self.generated_pages: Dict[str, str] = {}
+        self.search_index: Optional[GUIopediaSearchIndex] = None
+        self.search_index_lock = threading.Lock()
+
+    def __contains__(self, page_id: str) -> bool:
+        return page_id in self.generated_pages or page_id in self.page_file_paths
+
+    def __getitem__(self, page_id: str) -> str:
+        if page_id in self.generated_pages:
+            return self.generated_pages[page_id]
+        if page_id in self.cached_pages:
+            self.cached_pages.move_to_end(page_id)
+            return self.cached_pages[page_id]
+
+        page_text = self.read_page(self.page_file_paths[page_id])
+        self.cached_pages[page_id] = page_text
+        if len(self.cached_pages) > self.max_cached_pages:
+            self.cached_pages.popitem(last=False)
+        return page_text
+
+    def __setitem__(self, page_id: str, page_text: str):
+        self.generated_pages[page_id] = page_text
+
+    @staticmethod
+    def read_page(file_path: str) -> str:
+        page_lines = []
+        with open(file_path, 'r') as page_file:
+            for line in page_file:
+                line = line.rstrip(linesep).lstrip()
+                # kind of hacky way to add back spaces at the end of new lines that
+                # are removed by the pyCharm HTML
+                # editor. perhaps our HTML parser needs to handle this case
+                # (turning new lines into spaces
+                # but removing spaces at the start of rendered lines?)
+                if len(line) > 0:
+                    if line[-1] != '>':
+                        line += ' '
+                    page_lines.append(line)
+        return ''.join(page_lines)
+
+    def get_search_index(self) -> GUIopediaSearchIndex:
+        # Built on the first search rather than on start up. Pages are read straight from disk
+        # here so indexing doesn't flush the pages people are actually reading from the cache.
+        with self.search_index_lock:
+            if self.search_index is None:
+                search_index = GUIopediaSearchIndex()
+                for page_id, file_path in self.page_file_paths.items():
+                    search_index.add_page(page_id, self.read_page(file_path))
+                self.search_index = search_index
+            return self.search_index
+
+
+class GUIopediaSearchWorker:
+    """
+    Runs searches on a background thread so building the index and searching a large help
+    corpus never holds up drawing the UI.
+
+    Only the newest query matters. Submitting a query replaces any that hasn't started yet,
+    a search that is running when a newer query arrives gives up at the next search word, and
+    results for anything but the newest query are thrown away.
+
+    :param pages: The pages to search.
+    """
+    def __init__(self, pages: GUIopediaPages):
+        self.pages = pages
+        self.condition = threading.Condition()
+        self.generation = 0
+        self.waiting_query: Optional[Tuple[int, str]] = None
+        self.finished_results: Optional[OrderedDict] = None
+        self.is_running = True
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, search_string: str):
+        with self.condition:
+            self.generation += 1
+            self.waiting_query = (self.generation, search_string)
+            self.finished_results = None
+            self.condition.notify()
+
+    def cancel(self):
+        with self.condition:
+            self.generation += 1
+            self.waiting_query = None
+            self.finished_results = None
+
+    def take_results(self) -> Optional[OrderedDict]:
+        with self.condition:
+            results = self.finished_results
+            self.finished_results = None
+        return results
+
+    def stop(self):
+        with self.condition:
+            self.is_running = False
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.is_running and self.waiting_query is None:
+                    self.condition.wait()
+                if not self.is_running:
+                    return
+                generation, search_string = self.waiting_query
+                self.waiting_query = None
+
+            def is_stale():
+                return generation != self.generation
+
+            results = self.pages.get_search_index().search(search_string, is_stale)
+            with self.condition:
+                if not is_stale():
+                    self.finished_results = results
+
+
 class GUIopediaWindow(pygame_gui.elements.UIWindow):
-    def __init__(self, manager):
+    max_page_display_bytes = 16 * 1024 * 1024
+    search_delay = 0.15
+
+    def __init__(self, manager, pages: Optional[GUIopediaPages] = None):
         super().__init__(pygame.Rect((200, 50), (420, 520)),
                          manager,
                          window_display_title='GUIopedia!',
@@ -48,36 +256,24 @@ class GUIopediaWindow(pygame_gui.elements.UIWindow):
                                         search_bar_top_margin +
                                         search_bar_bottom_margin)))
 
-        self.pages = {}
-        page_path = 'data/guiopedia/'
-        file_paths = [join(page_path, f) for f in listdir(page_path) if isfile(join(page_path, f))]
-        for file_path in file_paths:
-            with open(file_path, 'r') as page_file:
-                file_id = splitext(basename(file_path))[0]
-                file_data = ""
-                for line in page_file:
-                    line = line.rstrip(linesep).lstrip()
-                    # kind of hacky way to add back spaces at the end of new lines that
-                    # are removed by the pyCharm HTML
-                    # editor. perhaps our HTML parser needs to handle this case
-                    # (turning new lines into spaces
-                    # but removing spaces at the start of rendered lines?)
-                    if len(line) > 0:
-                        if line[-1] != '>':
-                            line += ' '
-                        file_data += line
-                self.pages[file_id] = file_data
-
-        index_page = self.pages['index']
+        # share one set of pages between windows so reopening the GUIopedia is quick
+        self.pages = pages if pages is not None else GUIopediaPages()
+
         self.page_y_start_pos = (self.search_box.rect.height +
                                  search_bar_top_margin +
                                  search_bar_bottom_margin)
-        self.page_display = UITextBox(index_page,
-                                      pygame.Rect((0, self.page_y_start_pos),
-                                                  self.remaining_window_size),
-                                      manager=manager,
-                                      container=self,
-                                      parent_element=self)
+        # Laid out text boxes for recently visited pages, hidden while another page is showing.
+        # Going back to one of these is just a hide and a show rather than parsing the HTML and
+        # laying out all the text again.
+        self.page_displays: OrderedDict = OrderedDict()
+        self.page_display = None
+        self.open_new_page('index')
+
+        # searches run as you type, once typing pauses for search_delay seconds
+        self.search_worker = GUIopediaSearchWorker(self.pages)
+        self.pending_search: Optional[str] = None
+        self.search_timer = 0.0
+        self.result_lines: Dict[str, str] = {}
 
     def process_event(self, event):
         handled = super().process_event(event)
@@ -86,11 +282,20 @@ class GUIopediaWindow(pygame_gui.elements.UIWindow):
             self.open_new_page(event.link_target)
             handled = True
 
+        if (event.type == pygame_gui.UI_TEXT_ENTRY_CHANGED and
+                event.ui_element == self.search_box):
+            # treat the word still being typed as a prefix, so results show up before it's done
+            self.pending_search = event.text
+            if event.text and not event.text[-1].isspace() and event.text[-1] != '*':
+                self.pending_search += '*'
+            self.search_timer = self.search_delay
+            handled = True
+
         if (event.type == pygame_gui.UI_TEXT_ENTRY_FINISHED and
                 event.ui_element == self.search_box):
-            results = self.search_pages(event.text)
-            self.create_search_results_page(results)
-            self.open_new_page('results')
+            # no need to wait any longer, they've finished typing
+            self.pending_search = event.text
+            self.search_timer = 0.0
             handled = True
 
         if (event.type == pygame_gui.UI_BUTTON_PRESSED and
@@ -100,31 +305,39 @@ class GUIopediaWindow(pygame_gui.elements.UIWindow):
 
         return handled
 
-    def search_pages(self, search_string: str):
-        results = {}
-        words = search_string.split()
-
-        for page in self.pages.keys():
-            total_occurances_of_search_words = 0
-            for word in words:
-                word_occurances = self.search_text_for_occurrences_of_word(word, self.pages[page])
-                total_occurances_of_search_words += word_occurances
-            if total_occurances_of_search_words > 0:
-                results[page] = total_occurances_of_search_words
-
-        sorted_results = sorted(results.items(), key=lambda item: item[1], reverse=True)
-        return OrderedDict(sorted_results)
-
-    @staticmethod
-    def search_text_for_occurrences_of_word(word_to_search_for: str, text_to_search: str) -> int:
-        return sum(1 for _ in re.finditer(r'\b%s\b' % re.escape(word_to_search_for),
-                                          text_to_search,
-                                          flags=re.IGNORECASE))
+    def update(self, time_delta: float):
+        super().update(time_delta)
+
+        if self.pending_search is not None:
+            self.search_timer -= time_delta
+            if self.search_timer <= 0.0:
+                if self.pending_search.strip():
+                    self.search_worker.submit(self.pending_search)
+                else:
+                    # the search box has been cleared, so the old results no longer apply
+                    self.search_worker.cancel()
+                    results_display = self.page_displays.get('results')
+                    if results_display is not None and self.page_display is results_display:
+                        self.open_new_page('index')
+                self.pending_search = None
+
+        results = self.search_worker.take_results()
+        if results is not None:
+            self.show_search_results(results)
+
+    def kill(self):
+        self.search_worker.stop()
+        super().kill()
 
     def open_new_page(self, page_link: str):
-        self.page_display.kill()
-        self.page_display = None
-        if page_link in self.pages:
+        if self.page_display is not None:
+            self.page_display.hide()
+            self.page_display = None
+        if page_link in self.page_displays:
+            self.page_displays.move_to_end(page_link)
+            self.page_display = self.page_displays[page_link]
+            self.page_display.show()
+        elif page_link in self.pages:
             text = self.pages[page_link]
 
             self.page_display = UITextBox(text,
@@ -134,17 +347,67 @@ class GUIopediaWindow(pygame_gui.elements.UIWindow):
                                           manager=self.ui_manager,
                                           container=self,
                                           parent_element=self)
+            self.page_displays[page_link] = self.page_display
+            self.trim_page_displays()
 
-    def create_search_results_page(self, results):
-        results_text = '<font size=5>Search results</font>'
+    @staticmethod
+    def page_display_bytes(page_display: UITextBox) -> int:
+        surfaces = [page_display.image]
+        if page_display.text_box_layout is not None:
+            surfaces.append(page_display.text_box_layout.finalised_surface)
+        return sum(surface.get_width() * surface.get_height() * surface.get_bytesize()
+                   for surface in surfaces if surface is not None)
+
+    def trim_page_displays(self):
+        total_bytes = sum(self.page_display_bytes(page_display)
+                          for page_display in self.page_displays.values())
+        for page_link in list(self.page_displays.keys()):
+            if total_bytes <= self.max_page_display_bytes:
+                break
+            page_display = self.page_displays[page_link]
+            if page_display is self.page_display:
+                continue
+            total_bytes -= self.page_display_bytes(page_display)
+            self.discard_page_display(page_link)
+
+    def discard_page_display(self, page_link: str):
+        page_display = self.page_displays.pop(page_link, None)
+        if page_display is not None:
+            if page_display is self.page_display:
+                self.page_display = None
+            page_display.kill()
+
+    def create_search_results_page(self, results) -> bool:
+        """
+        Build the results page HTML. Returns False when it's the same as the page we already
+        have, which happens a lot when results update as you type.
+        """
+        results_text_parts = ['<font size=5>Search results</font>']
         if len(results) == 0:
-            results_text += '<br><br> No Results Found.'
+            results_text_parts.append('<br><br> No Results Found.')
         else:
-            results_text += '<br><br>' + str(len(results)) + ' results found:'
+            results_text_parts.append('<br><br>' + str(len(results)) + ' results found:')
             for result in results.keys():
-                results_text += '<br><br> - <a href=\"' + result + '\">' + result + '</a>'
-
+                if result not in self.result_lines:
+                    self.result_lines[result] = ('<br><br> - <a href=\"' + result + '\">' +
+                                                 result + '</a>')
+                results_text_parts.append(self.result_lines[result])
+        results_text = ''.join(results_text_parts)
+
+        if 'results' in self.pages and self.pages['results'] == results_text:
+            return False
         self.pages['results'] = results_text
+        return True
+
+    def show_search_results(self, results):
+        if self.create_search_results_page(results):
+            # lay the new results out in the existing text box rather than making another
+            results_display = self.page_displays.get('results')
+            if results_display is not None:
+                results_display.set_text(self.pages['results'])
+                self.trim_page_displays()
+        if self.page_display is not self.page_displays.get('results'):
+            self.open_new_page('results')
 
 
 class GUIopediaApp:
@@ -166,7 +429,8 @@ class GUIopediaApp:
                                     {'name': 'noto_sans', 'point_size': 14, 'style': 'bold'}
                                     ])
 
-        self.guiopedia_window = GUIopediaWindow(manager=self.manager)
+        self.guiopedia_pages = GUIopediaPages()
+        self.guiopedia_window = GUIopediaWindow(manager=self.manager, pages=self.guiopedia_pages)
 
         self.clock = pygame.time.Clock()
         self.is_running = True
@@ -181,7 +445,8 @@ class GUIopediaApp:
                 if (event.type == pygame.KEYDOWN and
                         event.key == pygame.K_F1 and
                         not self.guiopedia_window.alive()):
-                    self.guiopedia_window = GUIopediaWindow(manager=self.manager)
+                    self.guiopedia_window = GUIopediaWindow(manager=self.manager,
+                                                            pages=self.guiopedia_pages)
 
                 self.manager.process_events(event)
 
@@ -0,0 +1,125 @@
+"""
+Plays lots of headless games of pong between computer controlled bats, spread over a pool of
+processes, and prints statistics for each combination of ball speed and bounce angle.
+
+Useful for tuning the ball settings, and as a benchmark of the pong physics with no drawing.
+"""
+import argparse
+import itertools
+import math
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from benchmarking.results import summarise
+from pong.bat import AIControlScheme, ScriptedControlScheme
+from pong.pong import PongGame
+
+
+COURT_SIZE = (320, 240)
+TIME_STEP = 1.0 / 120.0
+
+# a wandering pattern for the scripted bat, it returns some shots by luck
+SCRIPTED_MOVES = [(0.4, -1), (0.3, 0), (0.7, 1), (0.2, 0), (0.3, -1)]
+
+
+def play_game(ball_speed: float, bounce_angle: float, ticks: int, controls: str,
+              seed: int) -> Dict[str, float]:
+    """
+    Runs in a worker process. Plays one game for a number of fixed time steps and counts what
+    happened.
+    """
+    if controls == 'scripted':
+        control_schemes = (AIControlScheme(), ScriptedControlScheme(SCRIPTED_MOVES))
+    else:
+        control_schemes = (AIControlScheme(), AIControlScheme())
+    game = PongGame(COURT_SIZE, control_schemes=control_schemes, headless=True, seed=seed)
+    game.ball.ball_speed = ball_speed
+    game.ball.max_bat_bounce_angle = bounce_angle
+    game.ball.reset()
+
+    points = 0
+    bat_hits = 0
+    rally_hits = 0
+    longest_rally = 0
+    last_x_velocity = game.ball.velocity[0]
+
+    start_time = time.perf_counter()
+    for _ in range(ticks):
+        total_score = game.score.player_1_score + game.score.player_2_score
+        game.update(TIME_STEP)
+        if game.score.player_1_score + game.score.player_2_score != total_score:
+            points += 1
+            longest_rally = max(longest_rally, rally_hits)
+            rally_hits = 0
+        elif (game.ball.velocity[0] < 0) != (last_x_velocity < 0):
+            bat_hits += 1
+            rally_hits += 1
+        last_x_velocity = game.ball.velocity[0]
+    elapsed_time = time.perf_counter() - start_time
+
+    return {'points': points,
+            'bat_hits': bat_hits,
+            'longest_rally': max(longest_rally, rally_hits),
+            'player_1_points': game.score.player_1_score,
+            'elapsed_time': elapsed_time}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=32,
+                        help='Games to play for each combination of settings.')
+    parser.add_argument('--ticks', type=int, default=120 * 60 * 5,
+                        help='Fixed time steps per game, 120 per second of game time.')
+    parser.add_argument('--ball-speeds', type=float, nargs='+', default=[120.0],
+                        help='Ball speeds to try.')
+    parser.add_argument('--bounce-angles', type=float, nargs='+', default=[75.0],
+                        help='Maximum bat bounce angles to try, in degrees.')
+    parser.add_argument('--controls', choices=['ai', 'scripted'], default='ai',
+                        help='Whether the right bat is AI controlled or follows a script.')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes, defaults to the number of CPUs.')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Base random seed, each game gets its own seed from this.')
+    args = parser.parse_args()
+
+    settings = list(itertools.product(args.ball_speeds, args.bounce_angles))
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {(ball_speed, bounce_angle): [
+            pool.submit(play_game, ball_speed, math.radians(bounce_angle), args.ticks,
+                        args.controls, args.seed + game_index)
+            for game_index in range(args.games)]
+            for ball_speed, bounce_angle in settings}
+        results: Dict[tuple, List[Dict[str, float]]] = {
+            setting: [future.result() for future in setting_futures]
+            for setting, setting_futures in futures.items()}
+    wall_time = time.perf_counter() - start_time
+
+    game_minutes = args.ticks * TIME_STEP / 60.0
+    print(f'{args.games} games of {game_minutes:.1f} minutes per setting, '
+          f'{args.controls} controls\n')
+    print(f'{"speed":>7} {"angle":>6} {"points/min":>11} {"hits/point":>11} '
+          f'{"longest rally":>14} {"left wins":>10} {"ticks/s per core":>17}')
+    for (ball_speed, bounce_angle), game_results in results.items():
+        points = sum(result['points'] for result in game_results)
+        bat_hits = sum(result['bat_hits'] for result in game_results)
+        left_points = sum(result['player_1_points'] for result in game_results)
+        ticks_per_second = summarise([args.ticks / result['elapsed_time']
+                                      for result in game_results])['median']
+        print(f'{ball_speed:>7.0f} {bounce_angle:>6.0f} '
+              f'{points / (game_minutes * args.games):>11.2f} '
+              f'{bat_hits / max(points, 1):>11.1f} '
+              f'{max(result["longest_rally"] for result in game_results):>14} '
+              f'{left_points / max(points, 1):>10.0%} '
+              f'{ticks_per_second:>17,.0f}')
+
+    total_ticks = args.ticks * args.games * len(settings)
+    print(f'\n{total_ticks:,} ticks in {wall_time:.1f}s '
+          f'({total_ticks / wall_time * 60:,.0f} ticks per minute)')
+
+
+if __name__ == '__main__':
+    main()
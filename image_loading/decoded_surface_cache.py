@@ -0,0 +1,152 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+
+from importlib import resources
+from typing import Dict, Optional, Tuple, Union
+
+import pygame
+
+from pygame_gui import PackageResource
+
+
+class DecodedSurfaceCache:
+    """
+    A persistent, size limited cache of decoded and already scaled image pixels.
+
+    Entries are keyed by the source file's path, its modification time and the size the image
+    was scaled to, so editing an image or displaying it at a different size makes a new entry
+    rather than showing stale pixels. Each entry is a small header followed by raw RGBA bytes
+    which are read back through a memory map, so a warm start skips image decoding entirely.
+
+    An index file records how big each entry is and when it was last used. When the cache
+    grows past max_bytes the least recently used entries are deleted.
+
+    :param cache_directory: Where to keep the cache files.
+    :param max_bytes: Upper limit on the total size of the cached pixel data.
+    """
+    file_magic = b'PGSC'
+    header_format = '<4sII'
+    index_file_name = 'index.json'
+
+    def __init__(self, cache_directory: str, max_bytes: int = 64 * 1024 * 1024):
+        self.cache_directory = cache_directory
+        self.max_bytes = max_bytes
+        self.header_size = struct.calcsize(self.header_format)
+
+        os.makedirs(self.cache_directory, exist_ok=True)
+        self.index: Dict[str, Dict[str, float]] = {}
+        index_path = os.path.join(self.cache_directory, self.index_file_name)
+        if os.path.isfile(index_path):
+            try:
+                with open(index_path, 'r') as index_file:
+                    self.index = json.load(index_file)
+            except (OSError, ValueError):
+                self.index = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def source_path(location: Union[PackageResource, str]) -> Optional[str]:
+        if isinstance(location, PackageResource):
+            resource_path = resources.files(location.package) / location.resource
+            # resources inside zip files etc. don't have a usable modification time
+            return str(resource_path) if isinstance(resource_path, os.PathLike) else None
+        return str(location)
+
+    def build_key(self, location: Union[PackageResource, str],
+                  target_size: Optional[Tuple[int, int]]) -> Optional[str]:
+        """
+        Make the cache key for an image, or None if the image can't be cached.
+        """
+        source_path = self.source_path(location)
+        if source_path is None:
+            return None
+        try:
+            modified_time = os.stat(source_path).st_mtime_ns
+        except OSError:
+            return None
+        size_string = 'original' if target_size is None else f'{target_size[0]}x{target_size[1]}'
+        key_string = f'{os.path.abspath(source_path)}|{modified_time}|{size_string}'
+        return hashlib.sha1(key_string.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_directory, key + '.rgba')
+
+    def load(self, key: str) -> Optional[pygame.Surface]:
+        """
+        Read an entry back as a surface in the display's format.
+        """
+        if key not in self.index:
+            self.misses += 1
+            return None
+        try:
+            with open(self._entry_path(key), 'rb') as entry_file:
+                with mmap.mmap(entry_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    magic, width, height = struct.unpack_from(self.header_format, mapped, 0)
+                    if magic != self.file_magic or len(mapped) != (self.header_size +
+                                                                   width * height * 4):
+                        raise ValueError('Corrupt cache entry')
+                    with memoryview(mapped) as mapped_view:
+                        pixels = mapped_view[self.header_size:]
+                        # frombuffer doesn't copy; convert_alpha() makes our own copy so the
+                        # mapping can be closed straight afterwards.
+                        mapped_surface = pygame.image.frombuffer(pixels, (width, height), 'RGBA')
+                        surface = mapped_surface.convert_alpha()
+                        del mapped_surface
+                        pixels.release()
+        except (OSError, ValueError, struct.error):
+            self.index.pop(key, None)
+            self.misses += 1
+            return None
+
+        self.index[key]['last_used'] = time.time()
+        self.hits += 1
+        return surface
+
+    def store(self, key: str, size: Tuple[int, int], pixels: bytes):
+        """
+        Write RGBA pixels for a key to the cache.
+        """
+        entry_path = self._entry_path(key)
+        temporary_path = entry_path + '.tmp'
+        try:
+            with open(temporary_path, 'wb') as entry_file:
+                entry_file.write(struct.pack(self.header_format, self.file_magic,
+                                             size[0], size[1]))
+                entry_file.write(pixels)
+            os.replace(temporary_path, entry_path)
+        except OSError:
+            return
+        self.index[key] = {'bytes': self.header_size + len(pixels), 'last_used': time.time()}
+
+    def trim(self):
+        """
+        Delete least recently used entries until the cache fits in max_bytes.
+        """
+        total_bytes = sum(entry['bytes'] for entry in self.index.values())
+        for key in sorted(self.index, key=lambda entry_key: self.index[entry_key]['last_used']):
+            if total_bytes <= self.max_bytes:
+                break
+            total_bytes -= self.index.pop(key)['bytes']
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+
+    def save(self):
+        """
+        Trim the cache to size and write out the index. Call this once loading is done.
+        """
+        self.trim()
+        index_path = os.path.join(self.cache_directory, self.index_file_name)
+        try:
+            with open(index_path + '.tmp', 'w') as index_file:
+                json.dump(self.index, index_file)
+            os.replace(index_path + '.tmp', index_path)
+        except OSError:
+            pass
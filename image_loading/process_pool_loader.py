@@ -0,0 +1,202 @@
+import os
+import warnings
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from importlib import resources
+from typing import Deque, Dict, List, Optional, Tuple, Union
+
+import pygame
+
+from pygame_gui import PackageResource
+from pygame_gui.core.resource_loaders import IResourceLoader
+from pygame_gui.core.utility import FontResource, ImageResource, SurfaceResource
+
+from image_loading.decoded_surface_cache import DecodedSurfaceCache
+
+
+def decode_and_scale_image(location: Tuple[str, str, str],
+                           target_size: Optional[Tuple[int, int]]) -> Tuple[Tuple[int, int], bytes]:
+    """
+    Runs in a worker process. Decodes an image file and, if we have a target size, scales it
+    so that it just covers that size, cropping off whatever overhangs, so only a small RGBA
+    buffer has to be sent back to the main process.
+
+    :param location: ('package', package, resource) or ('path', file_path, '').
+    :param target_size: The size the image will be displayed at, or None to keep it as is.
+    """
+    if location[0] == 'package':
+        with (resources.files(location[1]) / location[2]).open('rb') as open_resource:
+            image = pygame.image.load(open_resource)
+    else:
+        image = pygame.image.load(location[1])
+
+    if target_size is not None:
+        width, height = image.get_size()
+        scale = max(target_size[0] / width, target_size[1] / height)
+        # only ever shrink images, growing them here would just cost transfer time
+        if scale < 1.0:
+            if image.get_bitsize() < 24:
+                # smoothscale only handles 24 and 32 bit surfaces
+                full_colour_image = pygame.Surface(image.get_size(), flags=pygame.SRCALPHA,
+                                                   depth=32)
+                full_colour_image.blit(image, (0, 0))
+                image = full_colour_image
+            scaled_size = (max(target_size[0], round(width * scale)),
+                           max(target_size[1], round(height * scale)))
+            image = pygame.transform.smoothscale(image, scaled_size)
+            crop_rect = pygame.Rect((0, 0), target_size)
+            crop_rect.center = (scaled_size[0] // 2, scaled_size[1] // 2)
+            image = image.subsurface(crop_rect)
+
+    return image.get_size(), pygame.image.tobytes(image, 'RGBA')
+
+
+class ProcessPoolResourceLoader(IResourceLoader):
+    """
+    A resource loader that decodes images in a pool of worker processes, so large JPEGs are
+    decoded on every core at once rather than fighting over the GIL in threads.
+
+    Images with an entry in target_sizes are also scaled down to that size in the worker, which
+    means only the final small surface crosses back to the main process. The scaled image is
+    what gets displayed, so only give target sizes for images used whole, as the background of
+    an element that size; images that are cut up into sub-surfaces by the theme should be left
+    at their original size.
+
+    With a surface cache, images decoded on a previous run are read straight back from disk
+    and only the misses are sent to the worker processes.
+
+    Call update() repeatedly until it reports the load has finished, in the same way as the
+    IncrementalThreadedResourceLoader.
+
+    :param target_sizes: Optional dictionary of image resource IDs ('package/resource' or
+                         the file path, as used in the theme) to the size to pre-scale to.
+    :param max_workers: Number of worker processes. Defaults to the number of CPUs.
+    :param surface_cache: Optional on-disk cache of decoded images.
+    """
+
+    def __init__(self,
+                 target_sizes: Optional[Dict[str, Tuple[int, int]]] = None,
+                 max_workers: Optional[int] = None,
+                 surface_cache: Optional[DecodedSurfaceCache] = None):
+        self.target_sizes = target_sizes if target_sizes is not None else {}
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count()
+        self.surface_cache = surface_cache
+
+        self._image_queue: List[ImageResource] = []
+        self._font_queue: Deque[FontResource] = deque()
+        self._surface_queue: Deque[SurfaceResource] = deque()
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Future, ImageResource] = {}
+        self._cache_keys: Dict[Future, Optional[str]] = {}
+        self._total_work = 0
+        self._work_done = 0
+        self._started = False
+        self._finished = False
+
+    def started(self) -> bool:
+        return self._started
+
+    def add_resource(self, resource: Union[FontResource, ImageResource, SurfaceResource]):
+        if self._started:
+            raise ValueError('Too late to add this resource to the loader')
+        if isinstance(resource, ImageResource):
+            self._image_queue.append(resource)
+        elif isinstance(resource, FontResource):
+            self._font_queue.append(resource)
+        else:
+            self._surface_queue.append(resource)
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        self._total_work = (len(self._image_queue) + len(self._font_queue) +
+                            len(self._surface_queue))
+
+        images_to_decode = []
+        for image_resource in self._image_queue:
+            target_size = self.target_sizes.get(image_resource.image_id)
+            cache_key = None
+            if self.surface_cache is not None:
+                cache_key = self.surface_cache.build_key(image_resource.location, target_size)
+                if cache_key is not None:
+                    cached_surface = self.surface_cache.load(cache_key)
+                    if cached_surface is not None:
+                        self._set_loaded_surface(image_resource, cached_surface)
+                        self._work_done += 1
+                        continue
+            images_to_decode.append((image_resource, target_size, cache_key))
+        self._image_queue = []
+
+        if images_to_decode:
+            self._pool = ProcessPoolExecutor(max_workers=min(self.max_workers,
+                                                             len(images_to_decode)))
+            for image_resource, target_size, cache_key in images_to_decode:
+                future = self._pool.submit(decode_and_scale_image,
+                                           self._describe_location(image_resource.location),
+                                           target_size)
+                self._pending[future] = image_resource
+                self._cache_keys[future] = cache_key
+
+    @staticmethod
+    def _describe_location(location: Union[PackageResource, str]) -> Tuple[str, str, str]:
+        # PackageResource pickles fine, but plain tuples keep the worker side independent
+        # of pygame_gui's classes.
+        if isinstance(location, PackageResource):
+            return 'package', location.package, location.resource
+        return 'path', str(location), ''
+
+    def update(self) -> Tuple[bool, float]:
+        if not self._started:
+            return False, 0.0
+        if self._finished:
+            return True, 1.0
+
+        # Fonts are quick to load and FontResources can't be sent to another process anyway,
+        # so we load one per update while the images are being decoded.
+        if self._font_queue:
+            self._finish_resource(self._font_queue.popleft())
+
+        for future in [future for future in self._pending if future.done()]:
+            image_resource = self._pending.pop(future)
+            cache_key = self._cache_keys.pop(future)
+            try:
+                size, pixels = future.result()
+            except (pygame.error, OSError) as error:
+                warnings.warn(f'Unable to load resource with path: '
+                              f'{str(image_resource.location)} ({error})')
+            else:
+                self._set_loaded_surface(image_resource,
+                                         pygame.image.frombytes(pixels, size,
+                                                                'RGBA').convert_alpha())
+                if cache_key is not None:
+                    self.surface_cache.store(cache_key, size, pixels)
+            self._work_done += 1
+
+        # Surfaces may be sub-surfaces of the images, so they wait for all the images
+        if not self._pending:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+            while self._surface_queue:
+                self._finish_resource(self._surface_queue.popleft())
+
+        self._finished = not self._pending and not self._font_queue and not self._surface_queue
+        if self._finished and self.surface_cache is not None:
+            self.surface_cache.save()
+        progress = self._work_done / self._total_work if self._total_work > 0 else 1.0
+        return self._finished, progress
+
+    @staticmethod
+    def _set_loaded_surface(image_resource: ImageResource, surface: pygame.Surface):
+        if not image_resource.is_file_premultiplied:
+            surface = surface.premul_alpha()
+        image_resource.loaded_surface = surface
+
+    def _finish_resource(self, resource: Union[FontResource, SurfaceResource]):
+        error = resource.load()
+        if error is not None:
+            warnings.warn(str(error))
+        self._work_done += 1
@@ -4,33 +4,44 @@ import random
 
 
 class Ball:
-    def __init__(self, start_position):
+    def __init__(self, start_position, random_generator=None):
         self.rect = pygame.Rect(start_position, (5, 5))
         self.colour = pygame.Color(255, 255, 255)
         self.position = [float(start_position[0]), float(start_position[1])]
         self.start_position = [self.position[0], self.position[1]]
+        self.previous_position = [self.position[0], self.position[1]]
         self.ball_speed = 120.0
         self.max_bat_bounce_angle = 5.0 * math.pi/12.0
         self.collided = False
+        # each ball has its own random numbers so a game can be replayed from its seed
+        self.random_generator = random_generator if random_generator is not None else random.Random()
 
         self.velocity = [0.0, 0.0]
         self.create_random_start_vector()
 
-    def render(self, screen):
-        pygame.draw.rect(screen, self.colour, self.rect)
+    def render(self, screen, interpolation=1.0):
+        # draw part way between the last two positions, for smooth motion at any frame rate
+        render_rect = self.rect.copy()
+        render_rect.x = (self.previous_position[0] +
+                         (self.position[0] - self.previous_position[0]) * interpolation)
+        render_rect.y = (self.previous_position[1] +
+                         (self.position[1] - self.previous_position[1]) * interpolation)
+        pygame.draw.rect(screen, self.colour, render_rect)
 
     def create_random_start_vector(self):
-        y_random = random.uniform(-0.5, 0.5)
+        y_random = self.random_generator.uniform(-0.5, 0.5)
         x_random = 1.0 - abs(y_random)
-        if random.randint(0, 1) == 1:
+        if self.random_generator.randint(0, 1) == 1:
             x_random = x_random * -1.0
         self.velocity = [x_random * self.ball_speed, y_random * self.ball_speed]
 
     def reset(self):
         self.position = [self.start_position[0], self.start_position[1]]
+        self.previous_position = [self.position[0], self.position[1]]
         self.create_random_start_vector()
 
     def update(self, dt, bats, walls):
+        self.previous_position = [self.position[0], self.position[1]]
         self.position[0] += self.velocity[0] * dt
         self.position[1] += self.velocity[1] * dt
         self.rect.x = self.position[0]
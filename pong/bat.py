@@ -7,6 +7,51 @@ class ControlScheme:
         self.up = K_UP
         self.down = K_DOWN
 
+    def control(self, bat, ball, dt):
+        # keyboard controlled bats are moved by process_event() instead
+        pass
+
+
+class AIControlScheme(ControlScheme):
+    """
+    Moves the bat towards the ball's height whenever the ball is heading its way.
+
+    :param dead_zone: How close the bat's centre has to be to the ball before it stops moving.
+    """
+    def __init__(self, dead_zone=4.0):
+        super().__init__()
+        self.dead_zone = dead_zone
+
+    def control(self, bat, ball, dt):
+        bat_centre = bat.position[1] + bat.length / 2
+        ball_centre = ball.position[1] + ball.rect.height / 2
+        heading_towards_bat = (ball.velocity[0] < 0) == (bat.position[0] < ball.position[0])
+        bat.move_up = heading_towards_bat and ball_centre < bat_centre - self.dead_zone
+        bat.move_down = heading_towards_bat and ball_centre > bat_centre + self.dead_zone
+
+
+class ScriptedControlScheme(ControlScheme):
+    """
+    Plays back a fixed list of moves, looping when it gets to the end.
+
+    :param moves: List of (duration in seconds, direction) pairs, where direction is -1 for
+                  up, 1 for down or 0 to stay still.
+    """
+    def __init__(self, moves):
+        super().__init__()
+        self.moves = moves
+        self.move_index = 0
+        self.move_time = 0.0
+
+    def control(self, bat, ball, dt):
+        self.move_time += dt
+        while self.move_time >= self.moves[self.move_index][0]:
+            self.move_time -= self.moves[self.move_index][0]
+            self.move_index = (self.move_index + 1) % len(self.moves)
+        direction = self.moves[self.move_index][1]
+        bat.move_up = direction < 0
+        bat.move_down = direction > 0
+
 
 class Bat:
     def __init__(self, start_pos, control_scheme, court_size):
@@ -21,7 +66,8 @@ class Bat:
         self.width = 5.0
 
         self.position = [float(start_pos[0]), float(start_pos[1])]
-        
+        self.previous_y = self.position[1]
+
         self.rect = pygame.Rect((start_pos[0], start_pos[1]), (self.width, self.length))
         self.colour = pygame.Color("#FFFFFF")
 
@@ -39,6 +85,7 @@ class Bat:
                 self.move_down = False
 
     def update(self, dt):
+        self.previous_y = self.position[1]
         if self.move_up:
             self.position[1] -= dt * self.move_speed
 
@@ -55,5 +102,7 @@ class Bat:
 
             self.rect.y = self.position[1]
 
-    def render(self, screen):
-        pygame.draw.rect(screen, self.colour, self.rect)
+    def render(self, screen, interpolation=1.0):
+        render_rect = self.rect.copy()
+        render_rect.y = self.previous_y + (self.position[1] - self.previous_y) * interpolation
+        pygame.draw.rect(screen, self.colour, render_rect)
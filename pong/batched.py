@@ -0,0 +1,153 @@
+import math
+
+from typing import Optional
+
+import numpy as np
+import pygame
+
+
+class BatchedPongGames:
+    """
+    Many games of pong stepped together, with the state of every game held in NumPy arrays
+    instead of Ball and Bat objects, so one step() advances all of them with a handful of array
+    operations.
+
+    The rules are the same as PongGame's; walls, bats and balls have the same sizes and the
+    same collision rules, and the ball bounces off bats at an angle depending on where it hits.
+    Every game shares one court size.
+
+    Bats are driven by setting bat_moves to -1 (up), 0 or 1 (down) for each game and side, or
+    by calling track_balls() to have every bat follow its ball.
+
+    :param game_count: Number of games to simulate.
+    :param size: Court size of every game.
+    :param seed: Optional seed for the random ball start directions.
+    """
+    ball_size = 5
+    ball_speed = 120.0
+    max_bat_bounce_angle = 5.0 * math.pi / 12.0
+    bat_length = 30.0
+    bat_width = 5.0
+    bat_speed = 450.0
+
+    def __init__(self, game_count: int, size, seed: Optional[int] = None):
+        self.game_count = game_count
+        self.size = (int(size[0]), int(size[1]))
+        self.random_generator = np.random.default_rng(seed)
+
+        width, height = self.size
+        # walls as (left, top, width, height), the same rects as PongGame's Wall objects
+        self.walls = np.array([[5, 5, width - 15, 5],
+                               [5, height - 10, width - 15, 5]], dtype=np.int32)
+        self.bat_x = np.array([5, width - 10], dtype=np.int32)
+        self.bat_limits = (10.0, height - self.bat_length - 10.0)
+
+        self.ball_start = np.array([int(width / 2), int(height / 2)], dtype=np.float64)
+        self.ball_positions = np.tile(self.ball_start, (game_count, 1))
+        self.ball_velocities = np.zeros((game_count, 2), dtype=np.float64)
+        self.ball_collided = np.zeros(game_count, dtype=bool)
+
+        self.bat_positions = np.full((game_count, 2), float(int(height / 2)), dtype=np.float64)
+        self.bat_moves = np.zeros((game_count, 2), dtype=np.int8)
+
+        self.scores = np.zeros((game_count, 2), dtype=np.int64)
+
+        self.reset_balls(np.ones(game_count, dtype=bool))
+
+    def reset_balls(self, games: np.ndarray):
+        """
+        Put the ball back in the middle of each selected game, heading off in a random direction.
+
+        :param games: Boolean mask of the games to reset.
+        """
+        count = int(np.count_nonzero(games))
+        if count == 0:
+            return
+        y_random = self.random_generator.uniform(-0.5, 0.5, count)
+        x_random = 1.0 - np.abs(y_random)
+        x_random[self.random_generator.integers(0, 2, count) == 1] *= -1.0
+        self.ball_positions[games] = self.ball_start
+        self.ball_velocities[games, 0] = x_random * self.ball_speed
+        self.ball_velocities[games, 1] = y_random * self.ball_speed
+
+    def track_balls(self):
+        """
+        Simple AI for every bat; move towards the ball's height.
+        """
+        bat_centres = self.bat_positions + self.bat_length / 2
+        ball_centres = self.ball_positions[:, 1:2] + self.ball_size / 2
+        difference = ball_centres - bat_centres
+        self.bat_moves[:] = np.where(np.abs(difference) < 2.0, 0, np.sign(difference))
+
+    def step(self, dt: float):
+        """
+        Advance every game by dt seconds.
+        """
+        self.bat_positions += self.bat_moves * (self.bat_speed * dt)
+        np.clip(self.bat_positions, self.bat_limits[0], self.bat_limits[1],
+                out=self.bat_positions)
+
+        self.ball_positions += self.ball_velocities * dt
+        # pygame rects truncate their positions, so collide with the truncated values too
+        ball_x = self.ball_positions[:, 0].astype(np.int32)
+        ball_y = self.ball_positions[:, 1].astype(np.int32)
+
+        wall_hit = np.zeros(self.game_count, dtype=bool)
+        for left, top, width, height in self.walls:
+            wall_hit |= self._overlaps(ball_x, ball_y, left, top, width, height)
+
+        bat_y = self.bat_positions.astype(np.int32)
+        bat_hit = np.zeros(self.game_count, dtype=bool)
+        hit_bat_y = np.zeros(self.game_count, dtype=np.float64)
+        for side in range(2):
+            side_hit = self._overlaps(ball_x, ball_y, self.bat_x[side], bat_y[:, side],
+                                      int(self.bat_width), int(self.bat_length)) & ~bat_hit
+            hit_bat_y[side_hit] = self.bat_positions[side_hit, side]
+            bat_hit |= side_hit
+
+        # like Ball.update(), only the first collision counts until the ball is clear again
+        new_wall_bounce = wall_hit & ~self.ball_collided
+        new_bat_bounce = bat_hit & ~wall_hit & ~self.ball_collided
+        self.ball_collided = wall_hit | bat_hit
+
+        self.ball_velocities[new_wall_bounce, 1] *= -1.0
+
+        if np.any(new_bat_bounce):
+            relative_intersect_y = ((hit_bat_y[new_bat_bounce] + self.bat_length / 2) -
+                                    (self.ball_positions[new_bat_bounce, 1] + self.ball_size))
+            bounce_angle = (relative_intersect_y / (self.bat_length / 2) *
+                            self.max_bat_bounce_angle)
+            self.ball_velocities[new_bat_bounce, 0] *= -1.0
+            self.ball_velocities[new_bat_bounce, 1] = self.ball_speed * -np.sin(bounce_angle)
+
+        player_2_scored = self.ball_positions[:, 0] < 0
+        player_1_scored = self.ball_positions[:, 0] > self.size[0]
+        self.scores[:, 0] += player_1_scored
+        self.scores[:, 1] += player_2_scored
+        self.reset_balls(player_1_scored | player_2_scored)
+
+    def _overlaps(self, ball_x, ball_y, left, top, width, height) -> np.ndarray:
+        # the same test as Rect.colliderect() between the ball and a rect
+        return ((ball_x < left + width) & (ball_x + self.ball_size > left) &
+                (ball_y < top + height) & (ball_y + self.ball_size > top))
+
+    def draw(self, index: int, surface: pygame.Surface, position=(0, 0), scale: float = 1.0):
+        """
+        Draw one of the games, without the score, onto a surface. A scale below one is handy for
+        drawing lots of games as small tiles.
+        """
+        def scaled_rect(left, top, width, height):
+            return pygame.Rect(position[0] + int(left * scale), position[1] + int(top * scale),
+                               max(1, int(width * scale)), max(1, int(height * scale)))
+
+        wall_colour = pygame.Color("#C8C8C8")
+        for left, top, width, height in self.walls:
+            pygame.draw.rect(surface, wall_colour, scaled_rect(left, top, width, height))
+        for side in range(2):
+            pygame.draw.rect(surface, pygame.Color("#FFFFFF"),
+                             scaled_rect(self.bat_x[side], int(self.bat_positions[index, side]),
+                                         self.bat_width, self.bat_length))
+        pygame.draw.rect(surface, pygame.Color(255, 255, 255),
+                         scaled_rect(int(self.ball_positions[index, 0]),
+                                     int(self.ball_positions[index, 1]),
+                                     self.ball_size, self.ball_size))
@@ -1,3 +1,5 @@
+import random
+
 import pygame
 from pygame.locals import *
 
@@ -8,13 +10,30 @@ from pong.score import Score
 
 
 class PongGame:
-    def __init__(self, size):
+    """
+    A game of pong.
+
+    Headless games skip creating any surfaces or fonts, so they can be stepped without a display
+    for simulations and benchmarks. They can't be drawn.
+
+    :param size: The size of the court.
+    :param control_schemes: Optional pair of control schemes for the left and right bats,
+                            keyboard controls are used by default.
+    :param headless: Set to True to run the game without any drawing.
+    :param seed: Optional seed for the game's random numbers, so it plays out the same way
+                 every time given the same input.
+    """
+    def __init__(self, size, control_schemes=None, headless=False, seed=None):
         self.size = size
-        self.background = pygame.Surface(size)  # make a background surface
-        self.background = self.background.convert()
-        self.background.fill((0, 0, 0))
+        self.headless = headless
+        self.background = None
+        font = None
+        if not headless:
+            self.background = pygame.Surface(size)  # make a background surface
+            self.background = self.background.convert()
+            self.background.fill((0, 0, 0))
 
-        font = pygame.font.Font(None, 24)
+            font = pygame.font.Font(None, 24)
 
         self.score = Score(font)
 
@@ -23,18 +42,21 @@ class PongGame:
 
         self.bats = []
 
-        control_scheme_1 = ControlScheme()
-        control_scheme_1.up = K_w
-        control_scheme_1.down = K_s
+        if control_schemes is not None:
+            control_scheme_1, control_scheme_2 = control_schemes
+        else:
+            control_scheme_1 = ControlScheme()
+            control_scheme_1.up = K_w
+            control_scheme_1.down = K_s
 
-        control_scheme_2 = ControlScheme()
-        control_scheme_2.up = K_UP
-        control_scheme_2.down = K_DOWN
+            control_scheme_2 = ControlScheme()
+            control_scheme_2.up = K_UP
+            control_scheme_2.down = K_DOWN
 
         self.bats.append(Bat((5, int(size[1]/2)), control_scheme_1, self.size))
         self.bats.append(Bat((size[0] - 10, int(size[1]/2)), control_scheme_2, self.size))
 
-        self.ball = Ball((int(size[0]/2), int(size[1]/2)))
+        self.ball = Ball((int(size[0]/2), int(size[1]/2)), random.Random(seed))
 
     def process_event(self, event):
         for bat in self.bats:
@@ -42,6 +64,7 @@ class PongGame:
 
     def update(self, time_delta):
         for bat in self.bats:
+            bat.control_scheme.control(bat, self.ball, time_delta)
             bat.update(time_delta)
 
         self.ball.update(time_delta, self.bats, self.walls)
@@ -53,14 +76,14 @@ class PongGame:
             self.ball.reset()
             self.score.increase_player_1_score()
 
-    def draw(self, surface):
+    def draw(self, surface, interpolation=1.0):
         surface.blit(self.background, (0, 0))
 
         for wall in self.walls:
             wall.render(surface)
 
         for bat in self.bats:
-            bat.render(surface)
+            bat.render(surface, interpolation)
 
-        self.ball.render(surface)
+        self.ball.render(surface, interpolation)
         self.score.render(surface, self.size)
@@ -0,0 +1,191 @@
+import struct
+
+from typing import List, Optional, Sequence, Tuple
+
+import pygame
+
+
+class ReplayFormatError(Exception):
+    pass
+
+
+FILE_MAGIC = b'PGRP'
+FILE_VERSION = 2
+# version 1 files are the same, but never have a POSTED_CODE placeholder in them
+READABLE_VERSIONS = (1, 2)
+HEADER_FORMAT = '<4sHq'
+FRAME_FORMAT = '<dhhH'
+
+# Event type codes and the struct format of the attributes we keep for each. Anything that
+# isn't listed here, like window focus events, isn't recorded.
+QUIT_CODE = 0
+KEYDOWN_CODE = 1
+KEYUP_CODE = 2
+TEXTINPUT_CODE = 3
+MOUSEBUTTONDOWN_CODE = 4
+MOUSEBUTTONUP_CODE = 5
+MOUSEMOTION_CODE = 6
+MOUSEWHEEL_CODE = 7
+CUSTOM_CODE = 8
+POSTED_CODE = 9
+
+KEY_FORMAT = '<iHi'
+MOUSE_BUTTON_FORMAT = '<hhB'
+MOUSE_MOTION_FORMAT = '<hhhhB'
+MOUSE_WHEEL_FORMAT = '<hh'
+CUSTOM_FORMAT = '<Hh'
+
+
+class ReplayRecorder:
+    """
+    Writes a compact binary record of a session; the random seed, then the time delta, mouse
+    position and input events for every frame. The mouse position is kept as well as the
+    events because the UI manager reads it directly on every update. Played back with a
+    ReplayPlayer, the same seed and input give the same session frame for frame.
+
+    Custom events are only recorded if their type is listed in custom_event_types, and then
+    only with their type and an integer 'index' attribute, so the app must be able to rebuild
+    them from that. Leave out event types that get posted again anyway during playback, like
+    pygame_gui's UI events; for those only a placeholder is kept, marking where they came
+    among the recorded events, so playback can put them back in the same order.
+
+    :param file_path: Where to write the replay.
+    :param seed: The seed the session's random numbers come from.
+    :param custom_event_types: Custom event types to record.
+    """
+    def __init__(self, file_path: str, seed: int, custom_event_types: Sequence[int] = ()):
+        self.custom_event_types = set(custom_event_types)
+        self.replay_file = open(file_path, 'wb')
+        self.replay_file.write(struct.pack(HEADER_FORMAT, FILE_MAGIC, FILE_VERSION, seed))
+        self.frame_count = 0
+
+    def record_frame(self, time_delta: float, mouse_position: Tuple[int, int],
+                     events: List[pygame.event.Event]):
+        encoded_events = [encoded for encoded in (self.encode_event(event) for event in events)
+                          if encoded is not None]
+        self.replay_file.write(struct.pack(FRAME_FORMAT, time_delta, mouse_position[0],
+                                           mouse_position[1], len(encoded_events)))
+        self.replay_file.write(b''.join(encoded_events))
+        self.frame_count += 1
+
+    def encode_event(self, event: pygame.event.Event) -> Optional[bytes]:
+        if event.type == pygame.QUIT:
+            return bytes([QUIT_CODE])
+        if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+            code = KEYDOWN_CODE if event.type == pygame.KEYDOWN else KEYUP_CODE
+            text = event.unicode.encode('utf-8')[:255] if event.type == pygame.KEYDOWN else b''
+            return (bytes([code]) + struct.pack(KEY_FORMAT, event.key, event.mod, event.scancode) +
+                    bytes([len(text)]) + text)
+        if event.type == pygame.TEXTINPUT:
+            text = event.text.encode('utf-8')[:255]
+            return bytes([TEXTINPUT_CODE, len(text)]) + text
+        if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            code = MOUSEBUTTONDOWN_CODE if event.type == pygame.MOUSEBUTTONDOWN else MOUSEBUTTONUP_CODE
+            return bytes([code]) + struct.pack(MOUSE_BUTTON_FORMAT, event.pos[0], event.pos[1],
+                                               event.button)
+        if event.type == pygame.MOUSEMOTION:
+            buttons = sum(1 << index for index, pressed in enumerate(event.buttons) if pressed)
+            return bytes([MOUSEMOTION_CODE]) + struct.pack(MOUSE_MOTION_FORMAT,
+                                                           event.pos[0], event.pos[1],
+                                                           event.rel[0], event.rel[1], buttons)
+        if event.type == pygame.MOUSEWHEEL:
+            return bytes([MOUSEWHEEL_CODE]) + struct.pack(MOUSE_WHEEL_FORMAT, event.x, event.y)
+        if event.type in self.custom_event_types:
+            return bytes([CUSTOM_CODE]) + struct.pack(CUSTOM_FORMAT, event.type - pygame.USEREVENT,
+                                                      getattr(event, 'index', 0))
+        if event.type >= pygame.USEREVENT:
+            return bytes([POSTED_CODE])
+        return None
+
+    def close(self):
+        self.replay_file.close()
+
+
+class ReplayPlayer:
+    """
+    Reads back a replay written by ReplayRecorder, one frame at a time.
+
+    :param file_path: The replay to play.
+    """
+    def __init__(self, file_path: str):
+        with open(file_path, 'rb') as replay_file:
+            self.data = replay_file.read()
+        header_size = struct.calcsize(HEADER_FORMAT)
+        if len(self.data) < header_size:
+            raise ReplayFormatError('Replay file is too short')
+        magic, version, self.seed = struct.unpack_from(HEADER_FORMAT, self.data, 0)
+        if magic != FILE_MAGIC or version not in READABLE_VERSIONS:
+            raise ReplayFormatError('Not a replay file, or from a different version')
+        self.offset = header_size
+
+    def next_frame(self) -> Optional[Tuple[float, Tuple[int, int],
+                                           List[Optional[pygame.event.Event]]]]:
+        """
+        The time delta, mouse position and input events for the next frame, or None at the end
+        of the replay. Events that weren't recorded because they get posted again during
+        playback are None; swap them for the posted events with merge_posted_events().
+        """
+        if self.offset >= len(self.data):
+            return None
+        time_delta, mouse_x, mouse_y, event_count = self._read(FRAME_FORMAT)
+        return time_delta, (mouse_x, mouse_y), [self.decode_event() for _ in range(event_count)]
+
+    @staticmethod
+    def merge_posted_events(recorded_events: List[Optional[pygame.event.Event]],
+                            posted_events: List[pygame.event.Event]) -> List[pygame.event.Event]:
+        """
+        Put the events posted during playback where the recording had them among the recorded
+        events. Any more posted events than there were placeholders for go on the end.
+        """
+        posted_iterator = iter(posted_events)
+        merged_events = []
+        for event in recorded_events:
+            if event is None:
+                event = next(posted_iterator, None)
+                if event is None:
+                    continue
+            merged_events.append(event)
+        merged_events.extend(posted_iterator)
+        return merged_events
+
+    def _read(self, struct_format: str) -> tuple:
+        values = struct.unpack_from(struct_format, self.data, self.offset)
+        self.offset += struct.calcsize(struct_format)
+        return values
+
+    def _read_text(self) -> str:
+        length = self.data[self.offset]
+        text = self.data[self.offset + 1:self.offset + 1 + length].decode('utf-8', 'replace')
+        self.offset += 1 + length
+        return text
+
+    def decode_event(self) -> Optional[pygame.event.Event]:
+        code = self.data[self.offset]
+        self.offset += 1
+        if code == POSTED_CODE:
+            return None
+        if code == QUIT_CODE:
+            return pygame.event.Event(pygame.QUIT)
+        if code in (KEYDOWN_CODE, KEYUP_CODE):
+            key, mod, scancode = self._read(KEY_FORMAT)
+            event_type = pygame.KEYDOWN if code == KEYDOWN_CODE else pygame.KEYUP
+            return pygame.event.Event(event_type, key=key, mod=mod, scancode=scancode,
+                                      unicode=self._read_text())
+        if code == TEXTINPUT_CODE:
+            return pygame.event.Event(pygame.TEXTINPUT, text=self._read_text())
+        if code in (MOUSEBUTTONDOWN_CODE, MOUSEBUTTONUP_CODE):
+            x, y, button = self._read(MOUSE_BUTTON_FORMAT)
+            event_type = pygame.MOUSEBUTTONDOWN if code == MOUSEBUTTONDOWN_CODE else pygame.MOUSEBUTTONUP
+            return pygame.event.Event(event_type, pos=(x, y), button=button)
+        if code == MOUSEMOTION_CODE:
+            x, y, rel_x, rel_y, buttons = self._read(MOUSE_MOTION_FORMAT)
+            return pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=(rel_x, rel_y),
+                                      buttons=tuple(bool(buttons & (1 << index))
+                                                    for index in range(3)))
+        if code == MOUSEWHEEL_CODE:
+            x, y = self._read(MOUSE_WHEEL_FORMAT)
+            return pygame.event.Event(pygame.MOUSEWHEEL, x=x, y=y, flipped=False)
+        if code == CUSTOM_CODE:
+            type_offset, index = self._read(CUSTOM_FORMAT)
+            return pygame.event.Event(pygame.USEREVENT + type_offset, index=index)
+        raise ReplayFormatError(f'Unknown event code {code} in replay')
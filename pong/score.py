@@ -14,7 +14,9 @@ class Score:
 
     def update_score_text(self):
         self.score_string = str(self.player_1_score) + " - " + str(self.player_2_score)
-        self.score_text_render = self.font.render(self.score_string, True, pygame.Color(200, 200, 200))
+        # headless games don't have a font, they just keep count
+        if self.font is not None:
+            self.score_text_render = self.font.render(self.score_string, True, pygame.Color(200, 200, 200))
 
     def render(self, screen, size):
         screen.blit(self.score_text_render, self.score_text_render.get_rect(centerx=size[0]/2,
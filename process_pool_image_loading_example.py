@@ -0,0 +1,91 @@
+import pygame
+import pygame_gui
+
+from pygame_gui.elements import UIButton
+
+from image_loading.decoded_surface_cache import DecodedSurfaceCache
+from image_loading.process_pool_loader import ProcessPoolResourceLoader
+
+
+# 16 * image buttons, decoded and scaled down to button size across all cores.
+# Compare with auto_image_loading_example.py and user_controlled_image_loading_example.py
+# The scaled pixels are cached in .image_cache/ so later runs skip decoding the JPEGs.
+
+
+def main():
+    pygame.init()
+
+    pygame.display.set_caption('Image Loading Test')
+    window_surface = pygame.display.set_mode((800, 600))
+    background = pygame.Surface((800, 600))
+    background.fill(pygame.Color('#000000'))
+    clock = pygame.time.Clock()
+
+    button_row_width = 200
+    button_row_height = 150
+
+    # the IDs the theme gives each image it loads, for image_loading_test.json
+    # that's the package and resource name.
+    target_sizes = {f'data.images.space/space_{num}.jpg': (button_row_width, button_row_height)
+                    for num in range(1, 17)}
+
+    load_time_1 = clock.tick()
+    loader = ProcessPoolResourceLoader(target_sizes=target_sizes,
+                                       surface_cache=DecodedSurfaceCache('.image_cache',
+                                                                         max_bytes=32 * 1024 * 1024))
+    manager = pygame_gui.UIManager((800, 600),
+                                   pygame_gui.PackageResource('data.themes',
+                                                              'image_loading_test.json'),
+                                   resource_loader=loader)
+
+    loader.start()
+    finished = False
+    last_progress = 0
+    print("Progress: ", end='')
+    while not finished:
+        finished, progress = loader.update()
+        int_progress = int(10 * progress)
+        if last_progress != int_progress:
+            last_progress = int_progress
+            print('■', end='')
+        pygame.time.wait(1)
+    print('',)
+    load_time_2 = clock.tick()
+
+    print('Image loading time taken:', load_time_2 / 1000.0, 'seconds.',
+          f'({loader.surface_cache.hits} images from the cache)')
+
+    spacing = 0
+    num_buttons = 1
+    for j in range(1, 5):
+        for i in range(1, 5):
+            position = (i * spacing + ((i - 1) * button_row_width),
+                        (j * spacing + ((j - 1) * button_row_height)))
+            UIButton(relative_rect=pygame.Rect(position, (button_row_width,
+                                                          button_row_height)),
+                     text=str(num_buttons),
+                     manager=manager,
+                     object_id='#'+str(num_buttons))
+            num_buttons += 1
+
+    is_running = True
+
+    while is_running:
+        time_delta = clock.tick(60)/1000.0
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                is_running = False
+
+            manager.process_events(event)
+
+        manager.update(time_delta)
+
+        window_surface.blit(background, (0, 0))
+        manager.draw_ui(window_surface)
+
+        pygame.display.update()
+
+
+# The guard matters here, worker processes re-import this module on platforms that spawn them
+if __name__ == '__main__':
+    main()
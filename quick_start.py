@@ -3,6 +3,8 @@ import pygame
 from pygame_gui import UIManager, UI_BUTTON_PRESSED
 from pygame_gui.elements import UIButton
 
+from app_runner import DirtyRectAppRunner
+
 
 pygame.init()
 
@@ -17,22 +19,10 @@ background.fill(manager.ui_theme.get_colour('dark_bg'))
 
 hello_button = UIButton((350, 280), 'Hello')
 
-clock = pygame.time.Clock()
-is_running = True
-
-while is_running:
-    time_delta = clock.tick(60)/1000.0
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            is_running = False
-        if event.type == UI_BUTTON_PRESSED:
-            if event.ui_element == hello_button:
-                print('Hello World!')
-        manager.process_events(event)
-
-    manager.update(time_delta)
+def process_event(event):
+    if event.type == UI_BUTTON_PRESSED:
+        if event.ui_element == hello_button:
+            print('Hello World!')
 
-    window_surface.blit(background, (0, 0))
-    manager.draw_ui(window_surface)
 
-    pygame.display.update()
+DirtyRectAppRunner(window_surface, manager, background, event_handler=process_event).run()
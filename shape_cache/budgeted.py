@@ -0,0 +1,166 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from shape_cache.compacting import CompactingSurfaceCache
+
+
+class BudgetedSurfaceCache(CompactingSurfaceCache):
+    """
+    A compacting shape cache with a limit on how many bytes of surfaces it holds.
+
+    Every time a surface is looked up or added it moves to the back of a least recently used
+    queue. When the cached surfaces go over max_bytes, or a new surface won't fit on any page,
+    surfaces that no element is using any more are evicted from the front of the queue. Surfaces
+    still in use are never evicted, so the budget can be overrun if the UI really needs it.
+
+    Evicting surfaces lets the compaction in quiet frames free whole pages. Only surfaces
+    whose use count has dropped to zero through remove_user_from_cache_item() can be evicted
+    though, and pygame_gui elements don't give up their uses when they are killed. So the
+    budget only applies to surfaces that have been released like that; shapes made for
+    elements that have since been killed still count as in use, and the cache can hold well
+    over the budget with nothing it is allowed to evict.
+
+    Counts of cache hits, misses and evictions are kept for tuning the budget.
+
+    :param max_bytes: The most surface data to hold on to, counting 4 bytes per pixel.
+    """
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, **kwargs):
+        super().__init__(**kwargs)
+        self.max_bytes = max_bytes
+        self.recently_used: OrderedDict = OrderedDict()
+        self.cached_bytes = 0
+        self.bytes_being_placed = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _surface_bytes(surface: pygame.Surface) -> int:
+        return surface.get_width() * surface.get_height() * 4
+
+    def _touch(self, string_id: str):
+        self.recently_used[string_id] = None
+        self.recently_used.move_to_end(string_id)
+
+    def find_surface_in_cache(self, lookup_id: str):
+        surface = super().find_surface_in_cache(lookup_id)
+        if surface is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._touch(lookup_id)
+        return surface
+
+    def add_surface_to_cache(self, surface: pygame.Surface, string_id: str):
+        super().add_surface_to_cache(surface, string_id)
+        self._touch(string_id)
+
+    def add_surface_to_long_term_cache(self, cached_item, string_id: str):
+        # remembered so _expand_lt_cache knows how much room to make
+        self.bytes_being_placed = self._surface_bytes(cached_item['surface'])
+        result = super().add_surface_to_long_term_cache(cached_item, string_id)
+        if string_id in self.cache_long_term_lookup:
+            self.cached_bytes += self.bytes_being_placed
+        else:
+            self.recently_used.pop(string_id, None)
+        return result
+
+    def _free_cached_surface(self, string_id: str):
+        cached_item = self.cache_long_term_lookup.get(string_id)
+        super()._free_cached_surface(string_id)
+        if cached_item is not None and string_id not in self.cache_long_term_lookup:
+            surface = cached_item['surface']
+            # clear the space so the next surface there isn't blended over the old one
+            surface.get_parent().fill(pygame.Color('#00000000'),
+                                      pygame.Rect(surface.get_offset(), surface.get_size()))
+            self.cached_bytes -= self._surface_bytes(surface)
+            self.recently_used.pop(string_id, None)
+
+    def update(self):
+        super().update()
+        if self.cached_bytes > self.max_bytes:
+            self.evict_least_recently_used(self.cached_bytes - self.max_bytes)
+
+    def _expand_lt_cache(self):
+        # Out of room on the existing pages. Under budget we add a page if we can, otherwise we
+        # make room by evicting. The caller keeps trying to place the surface until we set
+        # low_on_space.
+        if self.cached_bytes < self.max_bytes:
+            super()._expand_lt_cache()
+            if not self.low_on_space:
+                return
+            self.low_on_space = False
+        if not self.evict_least_recently_used(self.bytes_being_placed):
+            super()._expand_lt_cache()
+
+    def evict_least_recently_used(self, bytes_to_free: int) -> int:
+        """
+        Evict surfaces that nothing is using, least recently used first, until bytes_to_free
+        have been freed or there's nothing left to evict.
+
+        :return: The number of bytes freed.
+        """
+        freed_bytes = 0
+        evicted_from_pages = set()
+        for string_id in list(self.recently_used):
+            if freed_bytes >= bytes_to_free:
+                break
+            cached_item = self.cache_long_term_lookup.get(string_id)
+            if cached_item is None or cached_item['current_uses'] > 0:
+                continue
+            evicted_from_pages.add(id(cached_item['surface'].get_parent()))
+            freed_bytes += self._surface_bytes(cached_item['surface'])
+            # _free_cached_surface() only frees surfaces with exactly zero users
+            cached_item['current_uses'] = 0
+            self._free_cached_surface(string_id)
+            self.evictions += 1
+
+        if evicted_from_pages:
+            for cache_surface in self.cache_surfaces:
+                if id(cache_surface['surface']) in evicted_from_pages:
+                    self._rebuild_free_space(
+                        cache_surface, self.page_entries.get(id(cache_surface['surface']), {}))
+        return freed_bytes
+
+    @staticmethod
+    def _clean_up_lt_cache(cache_surface, free_space_rectangles):
+        # Same job as the standard clean up, dropping free rectangles that sit inside other
+        # ones and keeping the rest in the same order, but comparing every pair at once with
+        # numpy. Rebuilding the free space makes a lot of rectangles, so this gets called with
+        # long lists.
+        edges = np.array([(free_rectangle.left, free_rectangle.top,
+                           free_rectangle.right, free_rectangle.bottom)
+                          for free_rectangle in free_space_rectangles],
+                         dtype=np.int32).reshape(-1, 4)
+        left, top, right, bottom = (edges[:, i] for i in range(4))
+        # inside[i, j] is True when rectangle i is inside rectangle j
+        inside = ((left[:, None] >= left[None, :]) & (top[:, None] >= top[None, :]) &
+                  (right[:, None] <= right[None, :]) & (bottom[:, None] <= bottom[None, :]))
+        # like the standard clean up, a rectangle doesn't count as inside an equal one
+        inside &= ~(edges[:, None, :] == edges[None, :, :]).all(axis=2)
+        keep = ~inside.any(axis=1)
+        cache_surface['free_space_rectangles'] = [
+            free_rectangle for free_rectangle, kept in zip(free_space_rectangles, keep.tolist())
+            if kept]
+
+    def _rebuild_free_space(self, cache_surface, string_ids):
+        # Freed rectangles are just added to the list as they are, so space freed next to other
+        # free space never joins up with it. After an eviction we work the free rectangles out
+        # again from what is left on the page so big surfaces can fit in the gaps.
+        free_space_rectangles = [pygame.Rect((0, 0), self.cache_surface_size)]
+        cleaned_up_count = 1
+        for string_id in string_ids:
+            surface = self.cache_long_term_lookup[string_id]['surface']
+            used_rectangle = pygame.Rect(surface.get_offset(), surface.get_size())
+            for free_rectangle in [free_rectangle for free_rectangle in free_space_rectangles
+                                   if free_rectangle.colliderect(used_rectangle)]:
+                self.split_rect(free_rectangle, used_rectangle, free_space_rectangles)
+            # cleaning up is the slow part, so let the list grow a bit between clean ups
+            if len(free_space_rectangles) > 2 * cleaned_up_count:
+                self._clean_up_lt_cache(cache_surface, free_space_rectangles)
+                free_space_rectangles = cache_surface['free_space_rectangles']
+                cleaned_up_count = len(free_space_rectangles)
+        self._clean_up_lt_cache(cache_surface, free_space_rectangles)
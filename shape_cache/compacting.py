@@ -0,0 +1,197 @@
+from typing import Dict
+
+import pygame
+
+from pygame_gui.core.surface_cache import SurfaceCache
+
+
+class CompactingSurfaceCache(SurfaceCache):
+    """
+    A shape cache that tidies itself up in quiet frames so it doesn't keep hold of more cache
+    pages than it needs.
+
+    When an update has no new surfaces to cache, we look for a chance to empty a page: if the
+    surfaces still in use would fit on one page fewer, the surfaces on the emptiest page are
+    moved onto the others a few at a time. Surfaces nothing is using that were only ever used
+    once are dropped rather than moved; ones used more than once are kept for reuse, the same
+    as the standard cache does, and moved with the rest. Once the page has nothing left on it,
+    it is freed.
+
+    Pages that end up empty are also freed straight away, or wiped back to a single free
+    rectangle if it's the last one, which undoes the fragmentation from lots of small frees.
+
+    The cache keeps track of which surfaces are on which page as they come and go, and only
+    looks for compaction work after something has been added, freed or stopped being used,
+    so an idle UI costs next to nothing each frame.
+
+    Moving a surface only changes the cache's own copy; drawable shapes copy what they get
+    from the cache, so they're unaffected.
+
+    :param max_moves_per_update: Most surfaces to move in one update.
+    :param fill_limit: How full, as a fraction of their area, we are willing to pack the
+                       remaining pages.
+    """
+    def __init__(self, max_moves_per_update: int = 4, fill_limit: float = 0.85):
+        super().__init__()
+        self.max_moves_per_update = max_moves_per_update
+        self.fill_limit = fill_limit
+
+        # insertion ordered, so the same run always moves surfaces in the same order
+        self.page_entries: Dict[int, Dict[str, None]] = {}
+        self.entry_pages: Dict[str, int] = {}
+        # area of the surfaces worth keeping on each page, and what each surface adds to it
+        self.page_live_areas: Dict[int, int] = {}
+        self.entry_live_areas: Dict[str, int] = {}
+        self.has_changed = False
+
+        self.page_being_emptied = None
+        self.pages_freed = 0
+        self.surfaces_moved = 0
+
+    def update(self):
+        had_new_surfaces = any(self.cache_short_term_lookup)
+        super().update()
+        if not had_new_surfaces:
+            self.compact()
+
+    def _find_spot_in_lt_cache(self, cache_surface, new_item, string_id: str):
+        found_rectangle, rectangle_to_split = super()._find_spot_in_lt_cache(
+            cache_surface, new_item, string_id)
+        if found_rectangle is not None:
+            self._forget_page_entry(string_id)
+            page_id = id(cache_surface['surface'])
+            self.page_entries.setdefault(page_id, {})[string_id] = None
+            self.entry_pages[string_id] = page_id
+            self._count_live_area(string_id)
+            self.has_changed = True
+        return found_rectangle, rectangle_to_split
+
+    def find_surface_in_cache(self, lookup_id: str):
+        surface = super().find_surface_in_cache(lookup_id)
+        if lookup_id in self.entry_pages:
+            self._count_live_area(lookup_id)
+        return surface
+
+    def _free_cached_surface(self, string_id: str):
+        super()._free_cached_surface(string_id)
+        if string_id in self.entry_pages and string_id not in self.cache_long_term_lookup:
+            self._forget_page_entry(string_id)
+            self.has_changed = True
+
+    def remove_user_from_cache_item(self, string_id: str):
+        super().remove_user_from_cache_item(string_id)
+        if string_id in self.entry_pages and self._count_live_area(string_id) < 0:
+            # its space now counts as free when deciding whether a page can be emptied
+            self.has_changed = True
+
+    def _forget_page_entry(self, string_id: str):
+        page_id = self.entry_pages.pop(string_id, None)
+        if page_id is not None:
+            self.page_entries.get(page_id, {}).pop(string_id, None)
+            self.page_live_areas[page_id] -= self.entry_live_areas.pop(string_id, 0)
+
+    def _count_live_area(self, string_id: str) -> int:
+        """
+        Bring the live area of a surface's page up to date after its use counts change.
+
+        :return: How much the page's live area changed by.
+        """
+        cached_item = self.cache_long_term_lookup[string_id]
+        live_area = 0
+        if self._is_worth_keeping(cached_item):
+            live_area = cached_item['surface'].get_width() * cached_item['surface'].get_height()
+        change = live_area - self.entry_live_areas.get(string_id, 0)
+        self.entry_live_areas[string_id] = live_area
+        page_id = self.entry_pages[string_id]
+        self.page_live_areas[page_id] = self.page_live_areas.get(page_id, 0) + change
+        return change
+
+    @staticmethod
+    def _is_worth_keeping(cached_item) -> bool:
+        # the standard cache holds on to surfaces used more than once, even when idle
+        return cached_item['current_uses'] > 0 or cached_item['total_uses'] > 1
+
+    def compact(self):
+        """
+        Do a small amount of compaction work. Called from update() on quiet frames.
+        """
+        if self.page_being_emptied is None:
+            if not self.has_changed:
+                return
+            self.has_changed = False
+            self._free_empty_pages()
+            if len(self.cache_surfaces) < 2:
+                return
+            page_area = self.cache_surface_size[0] * self.cache_surface_size[1]
+            live_areas = {id(cache_surface['surface']):
+                          self.page_live_areas.get(id(cache_surface['surface']), 0)
+                          for cache_surface in self.cache_surfaces}
+            if (sum(live_areas.values()) >
+                    (len(self.cache_surfaces) - 1) * page_area * self.fill_limit):
+                return
+            self.page_being_emptied = min(self.cache_surfaces,
+                                          key=lambda page: live_areas[id(page['surface'])])
+
+        page_entries = list(self.page_entries.get(id(self.page_being_emptied['surface']), {}))
+        # big surfaces first, they're the hardest to fit in later
+        page_entries.sort(key=lambda entry_id: (
+            self.cache_long_term_lookup[entry_id]['surface'].get_width() *
+            self.cache_long_term_lookup[entry_id]['surface'].get_height()), reverse=True)
+        for string_id in page_entries[:self.max_moves_per_update]:
+            cached_item = self.cache_long_term_lookup[string_id]
+            if not self._is_worth_keeping(cached_item):
+                # the count can go below zero if a shape is removed more times than it's added,
+                # and _free_cached_surface() only frees surfaces with exactly zero users
+                cached_item['current_uses'] = 0
+                self._free_cached_surface(string_id)
+            elif self._move_to_other_page(string_id):
+                self.surfaces_moved += 1
+            else:
+                # nowhere to put it, leave this page alone until something changes
+                self.page_being_emptied = None
+                self.has_changed = False
+                return
+
+        if len(page_entries) <= self.max_moves_per_update:
+            self._free_empty_pages()
+            self.page_being_emptied = None
+
+    def _move_to_other_page(self, string_id: str) -> bool:
+        cached_item = self.cache_long_term_lookup[string_id]
+        old_surface = cached_item['surface']
+        moving_item = {'surface': old_surface.copy(), 'uses': cached_item['current_uses']}
+        for cache_surface in self.cache_surfaces:
+            if cache_surface is self.page_being_emptied:
+                continue
+            found_rectangle, rectangle_to_split = self._find_spot_in_lt_cache(
+                cache_surface, moving_item, string_id)
+            if found_rectangle is not None:
+                self._divide_lt_cache(cache_surface, found_rectangle, rectangle_to_split)
+                # _find_spot_in_lt_cache made a fresh lookup entry, keep the old use counts
+                self.cache_long_term_lookup[string_id]['current_uses'] = cached_item['current_uses']
+                self.cache_long_term_lookup[string_id]['total_uses'] = cached_item['total_uses']
+                self._count_live_area(string_id)
+                old_rectangle = pygame.Rect(old_surface.get_offset(), old_surface.get_size())
+                self.page_being_emptied['surface'].fill(pygame.Color('#00000000'), old_rectangle)
+                self.page_being_emptied['free_space_rectangles'].append(old_rectangle)
+                return True
+        return False
+
+    def _free_empty_pages(self):
+        for cache_surface in list(self.cache_surfaces):
+            if self.page_entries.get(id(cache_surface['surface'])):
+                continue
+            if len(self.cache_surfaces) > 1:
+                self.cache_surfaces.remove(cache_surface)
+                self.page_entries.pop(id(cache_surface['surface']), None)
+                self.page_live_areas.pop(id(cache_surface['surface']), None)
+                self.pages_freed += 1
+                if cache_surface is self.page_being_emptied:
+                    self.page_being_emptied = None
+                # there's room to grow again now
+                self.low_on_space = False
+            elif cache_surface['free_space_rectangles'] != [pygame.Rect((0, 0),
+                                                                        self.cache_surface_size)]:
+                cache_surface['surface'].fill(pygame.Color('#00000000'))
+                cache_surface['free_space_rectangles'] = [pygame.Rect((0, 0),
+                                                                      self.cache_surface_size)]
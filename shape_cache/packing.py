@@ -0,0 +1,95 @@
+from typing import Tuple
+
+import pygame
+import pygame_gui
+
+from pygame_gui.core.surface_cache import SurfaceCache
+
+
+def install_shape_cache(manager: pygame_gui.UIManager, shape_cache: SurfaceCache):
+    """
+    Swap the theme's shape cache for another one. Drawable shapes hold on to the cache they
+    were made with, so do this straight after creating the UI manager, before any elements.
+    """
+    manager.get_theme().shape_cache = shape_cache
+
+
+class PackingSurfaceCache(SurfaceCache):
+    """
+    A shape cache that picks which free space rectangle to put each new surface in with a
+    scoring function, instead of taking the first one that fits like the standard SurfaceCache.
+
+    Subclasses override placement_score(); the free rectangle with the lowest score is used.
+    """
+
+    @staticmethod
+    def placement_score(free_rectangle: pygame.Rect, surface_size: Tuple[int, int]):
+        return 0
+
+    def _find_spot_in_lt_cache(self, cache_surface, new_item, string_id):
+        surface_size = new_item["surface"].get_size()
+        fitting_rectangles = [free_rectangle
+                              for free_rectangle in cache_surface["free_space_rectangles"]
+                              if (free_rectangle.width >= surface_size[0] and
+                                  free_rectangle.height >= surface_size[1])]
+        if not fitting_rectangles:
+            return None, None
+
+        # min() keeps the first of any equal scores, so ties go to the oldest free rectangle
+        found_rectangle_to_split = min(fitting_rectangles,
+                                       key=lambda free_rectangle: self.placement_score(
+                                           free_rectangle, surface_size))
+        found_rectangle_cache = pygame.Rect(found_rectangle_to_split.topleft, surface_size)
+        current_surface = cache_surface["surface"]
+        current_surface.blit(new_item["surface"], found_rectangle_cache.topleft,
+                             special_flags=pygame.BLEND_PREMULTIPLIED)
+        self.cache_long_term_lookup[string_id] = {
+            "surface": current_surface.subsurface(found_rectangle_cache),
+            "current_uses": new_item["uses"],
+            "total_uses": new_item["uses"],
+        }
+        return found_rectangle_cache, found_rectangle_to_split
+
+
+class BestAreaFitSurfaceCache(PackingSurfaceCache):
+    """
+    Puts each surface in the smallest free rectangle it fits in.
+    """
+    strategy_name = 'best area fit'
+
+    @staticmethod
+    def placement_score(free_rectangle, surface_size):
+        return free_rectangle.width * free_rectangle.height - surface_size[0] * surface_size[1]
+
+
+class BestShortSideFitSurfaceCache(PackingSurfaceCache):
+    """
+    Puts each surface in the free rectangle that leaves the least room along its shorter
+    leftover side, which tends to leave the rest of the space in long, reusable strips.
+    """
+    strategy_name = 'best short side fit'
+
+    @staticmethod
+    def placement_score(free_rectangle, surface_size):
+        leftover_width = free_rectangle.width - surface_size[0]
+        leftover_height = free_rectangle.height - surface_size[1]
+        return min(leftover_width, leftover_height), max(leftover_width, leftover_height)
+
+
+class TopLeftSurfaceCache(PackingSurfaceCache):
+    """
+    Puts each surface as near to the top of the page as possible, then as far left, keeping
+    the used space in a compact band.
+    """
+    strategy_name = 'top left'
+
+    @staticmethod
+    def placement_score(free_rectangle, surface_size):
+        return free_rectangle.top, free_rectangle.left
+
+
+# the standard cache is the first fit baseline
+PACKING_STRATEGIES = {'first fit': SurfaceCache,
+                      BestAreaFitSurfaceCache.strategy_name: BestAreaFitSurfaceCache,
+                      BestShortSideFitSurfaceCache.strategy_name: BestShortSideFitSurfaceCache,
+                      TopLeftSurfaceCache.strategy_name: TopLeftSurfaceCache}
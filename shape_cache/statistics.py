@@ -0,0 +1,58 @@
+from typing import Dict
+
+import pygame
+
+from pygame_gui.core.surface_cache import SurfaceCache
+
+
+def free_area(free_space_rectangles, page_size) -> int:
+    # the free rectangles overlap each other, so count the pixels they cover rather than
+    # adding up their areas
+    free_mask = pygame.Mask(page_size)
+    for free_rectangle in free_space_rectangles:
+        if free_rectangle.width > 0 and free_rectangle.height > 0:
+            free_mask.draw(pygame.Mask(free_rectangle.size, fill=True), free_rectangle.topleft)
+    return free_mask.count()
+
+
+def shape_cache_statistics(shape_cache: SurfaceCache) -> Dict[str, float]:
+    """
+    Measure how well a shape cache is using its pages.
+
+    - packing_density: fraction of the page area holding cached surfaces.
+    - idle_density: fraction of the page area holding cached surfaces nothing is using now.
+    - fragmentation: 1 - (largest free rectangle / total free area). Near zero when the free
+      space is in one piece, near one when it's scattered in small gaps.
+    - lost_area: page area that is neither used nor listed as free, which the cache can't
+      give out again.
+    """
+    page_width, page_height = shape_cache.cache_surface_size
+    page_area = page_width * page_height
+    pages = len(shape_cache.cache_surfaces)
+
+    used_area = sum(entry['surface'].get_width() * entry['surface'].get_height()
+                    for entry in shape_cache.cache_long_term_lookup.values())
+    idle_area = sum(entry['surface'].get_width() * entry['surface'].get_height()
+                    for entry in shape_cache.cache_long_term_lookup.values()
+                    if entry['current_uses'] <= 0)
+    total_free_area = 0
+    largest_free_rectangle = 0
+    free_rectangle_count = 0
+    for cache_surface in shape_cache.cache_surfaces:
+        free_space_rectangles = cache_surface['free_space_rectangles']
+        total_free_area += free_area(free_space_rectangles, shape_cache.cache_surface_size)
+        free_rectangle_count += len(free_space_rectangles)
+        largest_free_rectangle = max([largest_free_rectangle] +
+                                     [free_rectangle.width * free_rectangle.height
+                                      for free_rectangle in free_space_rectangles])
+
+    return {'pages': pages,
+            'entries': len(shape_cache.cache_long_term_lookup),
+            'waiting_entries': len(shape_cache.cache_short_term_lookup),
+            'packing_density': used_area / (page_area * pages),
+            'idle_density': idle_area / (page_area * pages),
+            'fragmentation': (1.0 - largest_free_rectangle / total_free_area
+                              if total_free_area > 0 else 0.0),
+            'free_rectangles': free_rectangle_count,
+            'lost_area': max(0, page_area * pages - used_area - total_free_area),
+            'page_bytes': page_area * pages * 4}
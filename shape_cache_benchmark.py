@@ -0,0 +1,169 @@
+"""
+Replays a long, repeatable run of shape cache additions and removals against different
+packing strategies and reports how well each one packs its pages and how long each operation
+takes.
+
+The workload mimics a UI that keeps creating and destroying themed elements: lots of
+button and label sized shapes, some small icons and wide text entries, and the odd large panel.
+Shapes are often reused by several elements at once, like they are in a real UI.
+"""
+import argparse
+import random
+import time
+
+from typing import Dict, List, Tuple
+
+import pygame
+
+from benchmarking.results import save_results, summarise, use_headless_video_driver
+from shape_cache.budgeted import BudgetedSurfaceCache
+from shape_cache.compacting import CompactingSurfaceCache
+from shape_cache.packing import PACKING_STRATEGIES
+from shape_cache.statistics import shape_cache_statistics
+
+
+CACHE_TYPES = dict(PACKING_STRATEGIES, compacting=CompactingSurfaceCache,
+                   budgeted=BudgetedSurfaceCache)
+
+
+def random_shape_size(random_generator: random.Random) -> Tuple[int, int]:
+    kind = random_generator.random()
+    if kind < 0.6:
+        # buttons and labels
+        return (int(min(320, max(40, random_generator.gauss(120, 50)))),
+                random_generator.randint(24, 48))
+    if kind < 0.8:
+        # check boxes, icons and scroll bar buttons
+        side = random_generator.randint(12, 40)
+        return side, side
+    if kind < 0.95:
+        # text entries and status bars
+        return random_generator.randint(150, 600), random_generator.randint(24, 40)
+    # panels and windows
+    return random_generator.randint(200, 700), random_generator.randint(150, 600)
+
+
+def generate_workload(operation_count: int, seed: int,
+                      live_target: int) -> List[Tuple[str, str, Tuple[int, int]]]:
+    """
+    Make a list of ('add', shape_id, size) and ('remove', shape_id, size) operations. The
+    number of shapes in use drifts around live_target.
+    """
+    random_generator = random.Random(seed)
+    shape_sizes: Dict[str, Tuple[int, int]] = {}
+    live_users: List[str] = []
+    operations = []
+    for _ in range(operation_count):
+        remove_chance = min(0.9, len(live_users) / (2 * live_target))
+        if live_users and random_generator.random() < remove_chance:
+            user_index = random_generator.randrange(len(live_users))
+            live_users[user_index], live_users[-1] = live_users[-1], live_users[user_index]
+            shape_id = live_users.pop()
+            operations.append(('remove', shape_id, shape_sizes[shape_id]))
+        else:
+            if shape_sizes and random_generator.random() < 0.4:
+                shape_id = random_generator.choice(list(shape_sizes))
+            else:
+                shape_id = f'shape_{len(shape_sizes)}'
+                shape_sizes[shape_id] = random_shape_size(random_generator)
+            live_users.append(shape_id)
+            operations.append(('add', shape_id, shape_sizes[shape_id]))
+    return operations
+
+
+def run_workload(cache_class, operations, sample_every: int) -> Dict[str, dict]:
+    shape_cache = cache_class()
+    add_times = []
+    remove_times = []
+    uncached_adds = 0
+    peak_pages = 0
+    density_samples = []
+    fragmentation_samples = []
+    for operation_index, (operation, shape_id, size) in enumerate(operations):
+        if operation == 'add':
+            surface = None
+            if (shape_id not in shape_cache.cache_long_term_lookup and
+                    shape_id not in shape_cache.cache_short_term_lookup):
+                surface = pygame.Surface(size, flags=pygame.SRCALPHA, depth=32)
+                surface.fill(pygame.Color(200, 128, 128, 255))
+            start_time = time.perf_counter()
+            # what a drawable shape does; look for the shape first, make it if it's missing
+            if shape_cache.find_surface_in_cache(shape_id) is None:
+                shape_cache.add_surface_to_cache(surface, shape_id)
+            # a theme update moves the new shape from the short term to the long term cache
+            shape_cache.update()
+            add_times.append(time.perf_counter() - start_time)
+            if (shape_id not in shape_cache.cache_long_term_lookup and
+                    shape_id not in shape_cache.cache_short_term_lookup):
+                uncached_adds += 1
+        else:
+            start_time = time.perf_counter()
+            shape_cache.remove_user_from_cache_item(shape_id)
+            shape_cache.update()
+            remove_times.append(time.perf_counter() - start_time)
+
+        peak_pages = max(peak_pages, len(shape_cache.cache_surfaces))
+        if operation_index % sample_every == sample_every - 1:
+            statistics = shape_cache_statistics(shape_cache)
+            density_samples.append(statistics['packing_density'])
+            fragmentation_samples.append(statistics['fragmentation'])
+
+    final_statistics = shape_cache_statistics(shape_cache)
+    return {'final': final_statistics,
+            'peak_pages': peak_pages,
+            'uncached_adds': uncached_adds,
+            'mean_packing_density': sum(density_samples) / max(1, len(density_samples)),
+            'mean_fragmentation': sum(fragmentation_samples) / max(1, len(fragmentation_samples)),
+            'add_seconds': summarise(add_times) if add_times else {},
+            'remove_seconds': summarise(remove_times) if remove_times else {}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--operations', type=int, default=5000,
+                        help='Number of add and remove operations to replay.')
+    parser.add_argument('--live-shapes', type=int, default=150,
+                        help='Roughly how many shape users to keep alive at once.')
+    parser.add_argument('--seed', type=int, default=1,
+                        help='Seed for generating the workload.')
+    parser.add_argument('--strategies', nargs='+', choices=list(CACHE_TYPES),
+                        default=list(CACHE_TYPES))
+    parser.add_argument('--sample-every', type=int, default=100,
+                        help='Measure packing density and fragmentation every N operations.')
+    parser.add_argument('--results', default=None,
+                        help='Optional JSON file to save the results to.')
+    args = parser.parse_args()
+
+    use_headless_video_driver()
+    pygame.init()
+    pygame.display.set_mode((64, 64))
+
+    operations = generate_workload(args.operations, args.seed, args.live_shapes)
+    print(f'{len(operations)} operations, {sum(1 for op in operations if op[0] == "add")} adds\n')
+    print(f'{"strategy":<22}{"pages":>6}{"peak":>6}{"density":>9}{"mean":>7}{"idle":>7}{"frag":>7}'
+          f'{"free rects":>11}{"lost KB":>9}{"uncached":>9}{"add us p50/p95":>17}'
+          f'{"remove us":>11}')
+
+    results = {}
+    for strategy_name in args.strategies:
+        strategy_results = run_workload(CACHE_TYPES[strategy_name], operations,
+                                        args.sample_every)
+        results[strategy_name] = strategy_results
+        final = strategy_results['final']
+        add_seconds = strategy_results['add_seconds']
+        remove_seconds = strategy_results['remove_seconds']
+        print(f'{strategy_name:<22}{final["pages"]:>6}{strategy_results["peak_pages"]:>6}'
+              f'{final["packing_density"]:>9.1%}{strategy_results["mean_packing_density"]:>7.1%}'
+              f'{final["idle_density"]:>7.1%}'
+              f'{final["fragmentation"]:>7.2f}{final["free_rectangles"]:>11}'
+              f'{final["lost_area"] * 4 // 1024:>9}{strategy_results["uncached_adds"]:>9}'
+              f'{add_seconds.get("median", 0) * 1e6:>10.0f}/{add_seconds.get("p95", 0) * 1e6:<6.0f}'
+              f'{remove_seconds.get("median", 0) * 1e6:>11.1f}')
+
+    if args.results is not None:
+        save_results(args.results, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,20 +4,34 @@ import math
 import pygame
 import pygame_gui
 
+from shape_cache.budgeted import BudgetedSurfaceCache
+from shape_cache.packing import install_shape_cache
+
 GOLDEN_RATIO = (math.sqrt(5) - 1) / 2
 
+# Enter adds a random rectangle to the shape cache, A adds fifty, backspace removes one, left
+# and right flip between cache pages and up and down change the cache's memory budget by a
+# megabyte. B makes twenty buttons of random sizes and kills them again; killed elements don't
+# give up their uses of the cache, so their shapes stay 'in use' and the budget can't evict
+# them. For repeatable numbers on packing strategies see shape_cache_benchmark.py
+
+MEGABYTE = 1024 * 1024
+
 
 def add_random_rectangle_to_cache(added_surfaces_list):
     width = random.randint(20, 200)
     height = random.randint(20, 200)
-    surface = pygame.Surface((width, height))
+    surface = pygame.Surface((width, height), flags=pygame.SRCALPHA)
     color = pygame.Color("#000000")
     color.hsla = 360 * ((width * GOLDEN_RATIO) % 1), 50, 70, 100
     color.a = 128
     surface.fill(color)
 
-    added_surfaces_list.append(str(color.hsla))
-    manager.ui_theme.shape_cache.add_surface_to_cache(surface, str(color.hsla))
+    surface_id = str(color.hsla)
+    added_surfaces_list.append(surface_id)
+    # like a drawable shape, only make a new surface if the cache hasn't got one already
+    if manager.ui_theme.shape_cache.find_surface_in_cache(surface_id) is None:
+        manager.ui_theme.shape_cache.add_surface_to_cache(surface, surface_id)
 
 
 def remove_use_from_cache_surface(surf_id):
@@ -25,11 +39,38 @@ def remove_use_from_cache_surface(surf_id):
     manager.ui_theme.shape_cache.remove_user_from_cache_item(surf_id)
 
 
+def make_and_kill_buttons():
+    for _ in range(20):
+        button_rect = pygame.Rect((random.randint(0, 800), random.randint(0, 800)),
+                                  (random.randint(40, 200), random.randint(30, 60)))
+        pygame_gui.elements.UIButton(button_rect, 'Gone', manager).kill()
+
+
+def draw_cache_counters(surface, font, shape_cache, page_index):
+    lookups = shape_cache.hits + shape_cache.misses
+    hit_rate = shape_cache.hits / lookups if lookups else 0.0
+    in_use_bytes = sum(cached_item['surface'].get_width() * cached_item['surface'].get_height() * 4
+                       for cached_item in shape_cache.cache_long_term_lookup.values()
+                       if cached_item['current_uses'] > 0)
+    lines = [f'Budget: {shape_cache.max_bytes / MEGABYTE:.0f} MB  '
+             f'Cached: {shape_cache.cached_bytes / MEGABYTE:.2f} MB  '
+             f'In use: {in_use_bytes / MEGABYTE:.2f} MB  '
+             f'Pages: {len(shape_cache.cache_surfaces)} (showing {page_index + 1})',
+             f'Hits: {shape_cache.hits}  Misses: {shape_cache.misses}  '
+             f'Hit rate: {hit_rate:.1%}  Evictions: {shape_cache.evictions}']
+    for line_index, line in enumerate(lines):
+        text = font.render(line, True, pygame.Color('#FFFFFF'), pygame.Color('#000000'))
+        surface.blit(text, (8, surface.get_height() - 8 - (len(lines) - line_index) * 22))
+
+
 pygame.init()
 
 pygame.display.set_caption('Quick Start')
 window_surface = pygame.display.set_mode((1024, 1024))
 manager = pygame_gui.UIManager((1024, 1024), 'data/themes/quick_theme.json')
+# swap the cache in before any elements are made, so their shapes use it too
+install_shape_cache(manager, BudgetedSurfaceCache(max_bytes=4 * MEGABYTE))
+counters_font = pygame.font.Font(None, 24)
 
 background = pygame.Surface((1024, 1024))
 background.fill(manager.get_theme().get_colour('dark_bg'))
@@ -50,6 +91,11 @@ while is_running:
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_RETURN:
                 add_random_rectangle_to_cache(added_surfaces)
+            if event.key == pygame.K_a:
+                for _ in range(50):
+                    add_random_rectangle_to_cache(added_surfaces)
+            if event.key == pygame.K_b:
+                make_and_kill_buttons()
             if event.key == pygame.K_BACKSPACE:
                 if len(added_surfaces) > 0:
                     remove_use_from_cache_surface(random.choice(added_surfaces))
@@ -59,8 +105,15 @@ while is_running:
             if event.key == pygame.K_LEFT:
                 if current_surf > 0:
                     current_surf -= 1
+            if event.key == pygame.K_UP:
+                manager.ui_theme.shape_cache.max_bytes += MEGABYTE
+            if event.key == pygame.K_DOWN:
+                if manager.ui_theme.shape_cache.max_bytes > MEGABYTE:
+                    manager.ui_theme.shape_cache.max_bytes -= MEGABYTE
 
     manager.update(time_delta)
+    # the cache frees pages as it compacts, so the one we were looking at may have gone
+    current_surf = min(current_surf, len(manager.ui_theme.shape_cache.cache_surfaces) - 1)
 
     window_surface.blit(background, (0, 0))
     manager.draw_ui(window_surface)
@@ -70,5 +123,6 @@ while is_running:
                         (0, 0))
     for rectangle in cache_surface['free_space_rectangles']:
         pygame.draw.rect(window_surface, pygame.Color('#A00000'), rectangle, 2)
+    draw_cache_counters(window_surface, counters_font, manager.ui_theme.shape_cache, current_surf)
 
     pygame.display.update()
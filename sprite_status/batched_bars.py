@@ -0,0 +1,197 @@
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+import pygame_gui
+
+from pygame_gui.core import ObjectID, UIContainer
+from pygame_gui.elements import UIStatusBar
+
+from sprite_status.stats import StatArrays
+
+
+def percent_for_fill(fill_width: int, capacity_width: int) -> float:
+    """
+    The percent_full that makes a bar draw exactly fill_width filled pixels.
+    """
+    # half a pixel over, so float error can't round the drawn width down a pixel
+    return min(1.0, (fill_width + 0.5) / capacity_width)
+
+
+def quantise_fills(fractions, capacity_widths):
+    """
+    How many pixels of each bar the fractions fill, rounded down the same way the drawable
+    shapes round down the filled width. Works on single values and arrays alike.
+
+    Rectangle shapes draw their fill at screen size, so their capacity_width is the width to
+    pass. Rounded rectangles draw at four times the size and scale down to anti-alias, so
+    quantising them at capacity_width drops changes to their anti-aliased edge.
+
+    :param fractions: How full each bar is, from 0.0 to 1.0.
+    :param capacity_widths: The width each bar's shape draws its fill at, in pixels.
+    """
+    return (np.clip(fractions, 0.0, 1.0) * capacity_widths).astype(np.int32)
+
+
+class ContainerBuckets:
+    """
+    Hands out containers that each hold at most bucket_size elements, making a new one
+    whenever the last is full. All of them cover the same area, so it doesn't matter to an
+    element which one it's in.
+
+    Moving a UI element makes its container look at everything else in it, so with every
+    sprite's bars in the same container each move costs more the more sprites there are.
+    Spread over buckets, a move only looks at the few elements sharing its bucket.
+
+    :param manager: The UI manager to make the containers with.
+    :param relative_rect: The area every bucket covers.
+    :param bucket_size: The most elements to put in one bucket.
+    :param container: The container to put the buckets in, or None for the root container.
+    """
+    def __init__(self, manager: pygame_gui.UIManager, relative_rect: pygame.Rect,
+                 bucket_size: int = 16, container: Optional[UIContainer] = None):
+        self.manager = manager
+        self.relative_rect = pygame.Rect(relative_rect)
+        self.bucket_size = bucket_size
+        self.container = container
+        self.buckets: List[UIContainer] = []
+        self.last_bucket_count = 0
+
+    def next_container(self) -> UIContainer:
+        """
+        The container to put the next element in.
+        """
+        if not self.buckets or self.last_bucket_count >= self.bucket_size:
+            self.buckets.append(UIContainer(self.relative_rect, self.manager,
+                                            container=self.container))
+            self.last_bucket_count = 0
+        self.last_bucket_count += 1
+        return self.buckets[-1]
+
+
+def make_anchored_bars(manager: pygame_gui.UIManager, object_ids: Sequence[ObjectID],
+                       bar_size: Tuple[int, int] = (50, 6),
+                       container: Optional[UIContainer] = None,
+                       percent_methods: Optional[Sequence[Callable[[], float]]] = None
+                       ) -> Tuple[UIContainer, List[UIStatusBar], Tuple[int, int]]:
+    """
+    Make a status bar for each object ID, laid out the way UIStatusBar places bars following a
+    sprite, inside a container just big enough to hold them.
+
+    Moving a UI element costs a look at everything else in its container, so a sprite's bars
+    are better moved together, as one container, than one at a time, and that container is
+    best put in one from ContainerBuckets.
+
+    :return: The container, the bars, and where the container's top left corner goes relative
+             to the sprite's top left corner.
+    """
+    bar_container = UIContainer(pygame.Rect((0, 0), bar_size), manager, container=container)
+    if percent_methods is None:
+        percent_methods = [None] * len(object_ids)
+    bars = [UIStatusBar(pygame.Rect((0, 0), bar_size), manager, container=bar_container,
+                        percent_method=percent_method, object_id=object_id)
+            for object_id, percent_method in zip(object_ids, percent_methods)]
+
+    # the same places UIStatusBar.position puts bars following a sprite
+    bar_rects = [pygame.Rect((bar.follow_sprite_offset[0],
+                              bar.follow_sprite_offset[1] - bar.hover_height),
+                             bar.relative_rect.size) for bar in bars]
+    container_rect = bar_rects[0].unionall(bar_rects[1:])
+    bar_container.set_dimensions(container_rect.size)
+    for bar, bar_rect in zip(bars, bar_rects):
+        bar.set_relative_position((bar_rect.x - container_rect.x, bar_rect.y - container_rect.y))
+    return bar_container, bars, container_rect.topleft
+
+
+class BatchedStatusBars:
+    """
+    Sets the fill of many UIStatusBars from a StatArrays in one pass, instead of each bar
+    calling a percent_method of its own every frame.
+
+    All the percentages are worked out together and quantised to the width of each bar in
+    pixels. A bar is only given a new percent_full, and so only redraws, when the number of
+    filled pixels it shows has changed.
+
+    Bars following a sprite update their position every frame, even when the sprite hasn't
+    moved, and moving a UI element is slow with lots of elements in the same container. So
+    each sprite's bars can instead be made with make_anchored_bars(), in a container from
+    ContainerBuckets, and their container added here, and update() given where the sprites
+    are; a container is only moved when its sprite has moved a whole pixel, and it takes all of
+    the sprite's bars with it in one move.
+
+    Bars added here shouldn't have a percent_method. Bar widths are read when they're added, so
+    re-add a bar if a theme change resizes it.
+
+    :param stats: The stats the bars show.
+    """
+    def __init__(self, stats: StatArrays):
+        self.stats = stats
+        self.bars: List[UIStatusBar] = []
+        self.bar_slots = np.zeros(0, dtype=np.intp)
+        self.bar_stats = np.zeros(0, dtype=np.intp)
+        self.bar_widths = np.zeros(0, dtype=np.int32)
+        self.shown_fills = np.zeros(0, dtype=np.int32)
+        self.last_fractions = np.zeros(0, dtype=np.float32)
+
+        self.bar_containers: List[UIContainer] = []
+        self.container_slots = np.zeros(0, dtype=np.intp)
+        self.container_offsets = np.zeros((0, 2), dtype=np.int32)
+        self.shown_positions = np.zeros((0, 2), dtype=np.int32)
+
+        self.redraws = 0
+        self.redraws_avoided = 0
+
+    def add_bar(self, bar: UIStatusBar, slot: int, stat_name: str):
+        self.bars.append(bar)
+        self.bar_slots = np.append(self.bar_slots, slot)
+        self.bar_stats = np.append(self.bar_stats, self.stats.stat_index(stat_name))
+        self.bar_widths = np.append(self.bar_widths, max(1, bar.capacity_width))
+        # -1 so the first update sets every bar
+        self.shown_fills = np.append(self.shown_fills, -1)
+        self.last_fractions = np.append(self.last_fractions, -1.0)
+
+    def add_bar_container(self, bar_container: UIContainer, slot: int, offset: Tuple[int, int]):
+        """
+        Move a container of bars along with a sprite.
+
+        :param bar_container: The container, as made by make_anchored_bars().
+        :param slot: The sprite's slot.
+        :param offset: Where the container's top left corner goes relative to the sprite's.
+        """
+        self.bar_containers.append(bar_container)
+        self.container_slots = np.append(self.container_slots, slot)
+        self.container_offsets = np.append(self.container_offsets, [offset], axis=0)
+        # -1 so the first update places every container
+        self.shown_positions = np.append(self.shown_positions, [[-1, -1]], axis=0)
+
+    def update(self, sprite_positions: Optional[np.ndarray] = None) -> int:
+        """
+        Call once a frame, after changing the stats and before updating the UI manager.
+
+        :param sprite_positions: The top left corner of every sprite's rect, as a
+                                 (slot, 2) array, for moving the bar containers.
+        :return: How many bars need redrawing.
+        """
+        if sprite_positions is not None and self.bar_containers:
+            positions = sprite_positions[self.container_slots] + self.container_offsets
+            moved_containers = np.flatnonzero(np.any(positions != self.shown_positions, axis=1))
+            self.shown_positions[moved_containers] = positions[moved_containers]
+            for container_index, position in zip(moved_containers.tolist(),
+                                                  positions[moved_containers].tolist()):
+                self.bar_containers[container_index].set_relative_position(position)
+
+        fractions = self.stats.percentages()[self.bar_stats, self.bar_slots]
+        fills = quantise_fills(fractions, self.bar_widths)
+        changed_bars = np.flatnonzero(fills != self.shown_fills)
+        self.shown_fills[changed_bars] = fills[changed_bars]
+
+        for bar_index, fill in zip(changed_bars.tolist(), fills[changed_bars].tolist()):
+            self.bars[bar_index].percent_full = percent_for_fill(
+                fill, int(self.bar_widths[bar_index]))
+
+        # bars a percent_method would have redrawn, but that look the same
+        self.redraws_avoided += int(np.count_nonzero(fractions != self.last_fractions)) - len(
+            changed_bars)
+        self.last_fractions = fractions
+        self.redraws += len(changed_bars)
+        return len(changed_bars)
@@ -0,0 +1,235 @@
+from collections import defaultdict
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+import pygame
+import pygame_gui
+
+from pygame_gui.core import ObjectID, UIContainer
+from pygame_gui.elements import UIStatusBar
+
+from sprite_status.batched_bars import (ContainerBuckets, make_anchored_bars, percent_for_fill,
+                                        quantise_fills)
+from sprite_status.stats import StatArrays
+
+
+class SpatialGrid:
+    """
+    Sorts points into square cells, so we can find everything near an area without looking
+    at everything.
+
+    :param cell_size: Width and height of a cell.
+    """
+    def __init__(self, cell_size: int):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        self.item_cells: Dict[int, Tuple[int, int]] = {}
+
+    def cell_at(self, position) -> Tuple[int, int]:
+        return int(position[0]) // self.cell_size, int(position[1]) // self.cell_size
+
+    def move(self, item: int, cell: Tuple[int, int]):
+        old_cell = self.item_cells.get(item)
+        if old_cell == cell:
+            return
+        if old_cell is not None:
+            self.cells[old_cell].discard(item)
+        self.cells[cell].add(item)
+        self.item_cells[item] = cell
+
+    def remove(self, item: int):
+        old_cell = self.item_cells.pop(item, None)
+        if old_cell is not None:
+            self.cells[old_cell].discard(item)
+
+    def query(self, area: pygame.Rect) -> List[int]:
+        """
+        Everything in the cells the area touches, which may include some things just outside
+        the area.
+        """
+        left, top = self.cell_at(area.topleft)
+        right, bottom = self.cell_at((area.right - 1, area.bottom - 1))
+        found = []
+        for cell_x in range(left, right + 1):
+            for cell_y in range(top, bottom + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell:
+                    found.extend(cell)
+        return found
+
+
+class CulledStatusBars:
+    """
+    Status bars for a world full of sprites, of which only a screen's worth can be seen at a
+    time.
+
+    Sprites are kept in a SpatialGrid by position. Each update, the grid finds the sprites
+    in view and only those get bars; bars are handed back to a pool when their sprite goes out
+    of view and reused for the next one to come into view, hidden in the meantime. So the UI
+    only ever holds a screen's worth of bars, however many sprites there are, and no work is
+    done for bars nobody can see.
+
+    Moving a UI element costs a look at everything else in its container, so each sprite's
+    bars sit together in a small container anchored to the sprite, and those are spread over
+    ContainerBuckets. The containers are placed straight at the sprite's position on screen,
+    so there is no world sized container to drag around when the view scrolls; each set moves
+    once a frame at most, when its place on screen has changed, and sets in the pool are
+    never moved at all.
+
+    Sprites are identified by their slot in the stats arrays, and their positions are given
+    to update() as an array, in world coordinates. As with BatchedStatusBars, bars are only
+    moved when their place on screen has moved a whole pixel, and only redrawn when their
+    filled width has changed.
+
+    :param manager: The UI manager to make the bars with.
+    :param stats: The stats the bars show.
+    :param sprite_size: The size of every sprite.
+    :param screen_size: The size of the screen the viewport is drawn on.
+    :param bar_stats: Which stats to give each sprite a bar for, with the object ID for each.
+    :param bar_size: The size of a bar.
+    :param cell_size: The size of the spatial grid's cells.
+    :param view_margin: How far outside the viewport a sprite can be and still get bars, so
+                        bars sticking out past a sprite just out of view still show.
+    """
+    def __init__(self, manager: pygame_gui.UIManager, stats: StatArrays,
+                 sprite_size: Tuple[int, int], screen_size: Tuple[int, int],
+                 bar_stats: Sequence[Tuple[str, ObjectID]] = (
+                     ('health', ObjectID('#health_bar', '@player_status_bars')),
+                     ('mana', ObjectID('#mana_bar', '@player_status_bars')),
+                     ('stamina', ObjectID('#stamina_bar', '@player_status_bars'))),
+                 bar_size: Tuple[int, int] = (50, 6),
+                 cell_size: int = 128, view_margin: int = 64):
+        self.manager = manager
+        self.stats = stats
+        self.sprite_size = sprite_size
+        self.bar_stats = list(bar_stats)
+        self.bar_stat_indices = np.array([stats.stat_index(stat_name)
+                                          for stat_name, _ in self.bar_stats], dtype=np.intp)
+        self.bar_size = bar_size
+        self.view_margin = view_margin
+        self.grid = SpatialGrid(cell_size)
+        self.sprite_cells = np.zeros((0, 2), dtype=np.int64)
+
+        self.set_buckets = ContainerBuckets(manager, pygame.Rect((0, 0), screen_size))
+
+        # one set of bars for each sprite in view, plus the spare sets waiting in the pool;
+        # every set is laid out the same, so shares one offset from its sprite
+        self.bar_sets: List[UIContainer] = []
+        self.set_bars: List[List[UIStatusBar]] = []
+        self.set_offset = np.zeros(2, dtype=np.int32)
+        self.set_slots = np.zeros(0, dtype=np.intp)
+        self.set_widths = np.zeros((0, len(self.bar_stats)), dtype=np.int32)
+        self.shown_fills = np.zeros((0, len(self.bar_stats)), dtype=np.int32)
+        self.shown_positions = np.zeros((0, 2), dtype=np.int32)
+        self.free_sets: List[int] = []
+        self.slot_sets: Dict[int, int] = {}
+
+        self.visible_slots = np.zeros(0, dtype=np.intp)
+        self.redraws = 0
+
+    def _make_bar_set(self) -> int:
+        set_container, bars, set_offset = make_anchored_bars(
+            self.manager, [object_id for _, object_id in self.bar_stats], self.bar_size,
+            container=self.set_buckets.next_container())
+        self.set_offset = np.array(set_offset, dtype=np.int32)
+
+        self.bar_sets.append(set_container)
+        self.set_bars.append(bars)
+        self.set_slots = np.append(self.set_slots, -1)
+        self.set_widths = np.append(self.set_widths,
+                                    [[max(1, bar.capacity_width) for bar in bars]], axis=0)
+        self.shown_fills = np.append(self.shown_fills, [[-1] * len(bars)], axis=0)
+        self.shown_positions = np.append(self.shown_positions, [[-1, -1]], axis=0)
+        return len(self.bar_sets) - 1
+
+    def _give_bar_set(self, slot: int):
+        set_index = self.free_sets.pop() if self.free_sets else self._make_bar_set()
+        self.set_slots[set_index] = slot
+        self.slot_sets[slot] = set_index
+        # -1 so the next update places and fills the bars for their new sprite
+        self.shown_fills[set_index] = -1
+        self.shown_positions[set_index] = -1
+        self.bar_sets[set_index].show()
+
+    def _take_bar_set(self, slot: int):
+        set_index = self.slot_sets.pop(slot)
+        self.set_slots[set_index] = -1
+        self.free_sets.append(set_index)
+        self.bar_sets[set_index].hide()
+
+    def _update_grid(self, sprite_positions: np.ndarray):
+        cells = sprite_positions.astype(np.int64) // self.grid.cell_size
+        if len(cells) != len(self.sprite_cells):
+            # new sprites; anything past the old end has to go in the grid
+            self.sprite_cells = np.append(
+                self.sprite_cells,
+                np.full((len(cells) - len(self.sprite_cells), 2), np.iinfo(np.int64).min),
+                axis=0)
+        moved_slots = np.flatnonzero(np.any(cells != self.sprite_cells, axis=1))
+        for slot, cell in zip(moved_slots.tolist(), cells[moved_slots].tolist()):
+            self.grid.move(slot, tuple(cell))
+        self.sprite_cells = cells
+
+    def find_visible_slots(self, sprite_positions: np.ndarray,
+                           viewport: pygame.Rect) -> np.ndarray:
+        """
+        The slots of the sprites in or near the viewport.
+        """
+        search_area = viewport.inflate(self.view_margin * 2, self.view_margin * 2)
+        candidate_slots = np.array(self.grid.query(search_area), dtype=np.intp)
+        if len(candidate_slots) == 0:
+            return candidate_slots
+        positions = sprite_positions[candidate_slots]
+        in_area = ((positions[:, 0] + self.sprite_size[0] > search_area.left) &
+                   (positions[:, 0] < search_area.right) &
+                   (positions[:, 1] + self.sprite_size[1] > search_area.top) &
+                   (positions[:, 1] < search_area.bottom))
+        return candidate_slots[in_area]
+
+    def update(self, sprite_positions: np.ndarray, viewport: pygame.Rect) -> int:
+        """
+        Call once a frame, after moving the sprites and changing their stats and before
+        updating the UI manager.
+
+        :param sprite_positions: The top left corner of every sprite in the world, as a
+                                 (slot, 2) array.
+        :param viewport: The part of the world on screen. Its top left corner is drawn at the
+                         top left of the screen.
+        :return: How many bars need redrawing.
+        """
+        self._update_grid(sprite_positions)
+        self.visible_slots = self.find_visible_slots(sprite_positions, viewport)
+
+        visible = set(self.visible_slots.tolist())
+        for slot in [slot for slot in self.slot_sets if slot not in visible]:
+            self._take_bar_set(slot)
+        for slot in visible.difference(self.slot_sets):
+            self._give_bar_set(slot)
+
+        active_sets = np.flatnonzero(self.set_slots >= 0)
+        if len(active_sets) == 0:
+            return 0
+        slots = self.set_slots[active_sets]
+
+        set_positions = (sprite_positions[slots].astype(np.int32) + self.set_offset -
+                         np.array(viewport.topleft, dtype=np.int32))
+        moved_sets = np.flatnonzero(np.any(set_positions != self.shown_positions[active_sets],
+                                           axis=1))
+        self.shown_positions[active_sets[moved_sets]] = set_positions[moved_sets]
+        for set_index, position in zip(active_sets[moved_sets].tolist(),
+                                       set_positions[moved_sets].tolist()):
+            self.bar_sets[set_index].set_relative_position(position)
+
+        fractions = self.stats.percentages()[self.bar_stat_indices[np.newaxis, :],
+                                             slots[:, np.newaxis]]
+        widths = self.set_widths[active_sets]
+        fills = quantise_fills(fractions, widths)
+        changed = fills != self.shown_fills[active_sets]
+        self.shown_fills[active_sets] = fills
+        changed_sets, changed_bars = np.nonzero(changed)
+        for set_position, bar_index in zip(changed_sets.tolist(), changed_bars.tolist()):
+            self.set_bars[active_sets[set_position]][bar_index].percent_full = percent_for_fill(
+                int(fills[set_position, bar_index]), int(widths[set_position, bar_index]))
+
+        self.redraws += len(changed_sets)
+        return len(changed_sets)
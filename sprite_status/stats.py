@@ -0,0 +1,87 @@
+from typing import Sequence
+
+import numpy as np
+import pygame
+
+
+class StatArrays:
+    """
+    The health, mana and stamina of many sprites, each stat kept in one contiguous NumPy array
+    with a slot for every sprite, so game logic and status bars can work on all the sprites at
+    once instead of one at a time.
+
+    :param capacity: How many sprites to make room for to start with. More room is made as
+                     needed.
+    """
+    stat_names = ('health', 'mana', 'stamina')
+
+    def __init__(self, capacity: int = 64):
+        self.count = 0
+        self.current = np.zeros((len(self.stat_names), capacity), dtype=np.float32)
+        self.maximum = np.ones((len(self.stat_names), capacity), dtype=np.float32)
+
+    def stat_index(self, stat_name: str) -> int:
+        return self.stat_names.index(stat_name)
+
+    def add_slot(self, current: Sequence[float], maximum: Sequence[float]) -> int:
+        """
+        Make room for another sprite's stats, in stat_names order.
+
+        :return: The new sprite's slot.
+        """
+        if self.count == self.current.shape[1]:
+            self.current = np.concatenate([self.current, np.zeros_like(self.current)], axis=1)
+            self.maximum = np.concatenate([self.maximum, np.ones_like(self.maximum)], axis=1)
+        slot = self.count
+        self.current[:, slot] = current
+        self.maximum[:, slot] = maximum
+        self.count += 1
+        return slot
+
+    def clamp(self):
+        np.clip(self.current[:, :self.count], 0.0, self.maximum[:, :self.count],
+                out=self.current[:, :self.count])
+
+    def percentages(self) -> np.ndarray:
+        """
+        Every stat of every sprite as a fraction of its maximum, as a (stat, slot) array.
+        """
+        return self.current[:, :self.count] / self.maximum[:, :self.count]
+
+
+class ArrayStatSprite(pygame.sprite.Sprite):
+    """
+    A sprite whose stats live in a StatArrays rather than in attributes of its own. It still has
+    the current_health and health_capacity a UIStatusBar expects from a sprite.
+
+    :param stats: The arrays to keep this sprite's stats in.
+    :param image: The sprite's image.
+    :param position: Where to put the sprite's top left corner.
+    :param current: Starting health, mana and stamina.
+    :param maximum: Maximum health, mana and stamina.
+    """
+    def __init__(self, stats: StatArrays, image: pygame.Surface, position,
+                 current: Sequence[float], maximum: Sequence[float],
+                 *groups: pygame.sprite.AbstractGroup):
+        super().__init__(*groups)
+        self.stats = stats
+        self.slot = stats.add_slot(current, maximum)
+
+        self.image = image
+        self.rect = self.image.get_rect(topleft=position)
+
+    def get_stat(self, stat_name: str) -> float:
+        return float(self.stats.current[self.stats.stat_index(stat_name), self.slot])
+
+    def get_stat_percentage(self, stat_name: str) -> float:
+        stat_index = self.stats.stat_index(stat_name)
+        return float(self.stats.current[stat_index, self.slot] /
+                     self.stats.maximum[stat_index, self.slot])
+
+    @property
+    def current_health(self) -> float:
+        return self.get_stat('health')
+
+    @property
+    def health_capacity(self) -> float:
+        return float(self.stats.maximum[self.stats.stat_index('health'), self.slot])
@@ -1,6 +1,7 @@
 import pygame
 import pygame_gui
 from pygame_gui.core import ObjectID
+from pygame_gui.elements import UIStatusBar
 
 
 class HappySprite(pygame.sprite.Sprite):
@@ -68,6 +69,55 @@ class HappySprite(pygame.sprite.Sprite):
         self.rect.topleft = (int(self.position.x), int(self.position.y))
 
 
+class QuantisedStatusBar(UIStatusBar):
+    """
+    A status bar that only redraws when the filled part of the bar changes width on screen.
+
+    Setting percent_full redraws a normal status bar for any change at all, even one far
+    smaller than a pixel. Here the new value is kept, but the redraw is skipped unless the
+    filled width in whole pixels has changed. Widths are counted in the pixels the bar's shape
+    draws in, which for rounded rectangles is four times finer than the screen, so changes to
+    their anti-aliased edge still redraw. Bars showing status text always redraw, as the text
+    may have changed.
+
+    Takes the same parameters as UIStatusBar.
+    """
+    def __init__(self, *args, **kwargs):
+        self.shown_fill_width = -1
+        self.redraws_avoided = 0
+        super().__init__(*args, **kwargs)
+
+    @UIStatusBar.percent_full.setter
+    def percent_full(self, value):
+        if value > 1:
+            value = value / 100
+        fill_width = self.drawn_fill_width(value)
+        if fill_width == self.shown_fill_width and self.status_text() is None:
+            if value != self._percent_full:
+                self._percent_full = value
+                self.redraws_avoided += 1
+            return
+        self.shown_fill_width = fill_width
+        UIStatusBar.percent_full.fset(self, value)
+
+    def rebuild(self):
+        super().rebuild()
+        # the bar may have changed size
+        self.shown_fill_width = self.drawn_fill_width(self.percent_full)
+
+    def drawn_fill_width(self, value: float) -> int:
+        """
+        How wide the drawable shape draws the filled part of the bar, rounded down the same way.
+
+        :param value: How full the bar is, from 0.0 to 1.0.
+        """
+        # rounded rectangles draw at a bigger size and scale down to anti-alias their edges
+        width = self.capacity_width
+        if self.drawable_shape is not None:
+            width = self.drawable_shape.background_rect.width
+        return int(min(max(value, 0), 1) * width)
+
+
 pygame.init()
 
 
@@ -82,32 +132,35 @@ sprite_list = pygame.sprite.Group()
 happy_sprite = HappySprite(sprite_list)
 
 
-progress_bar = pygame_gui.elements.UIStatusBar(pygame.Rect((100, 100), (200, 30)),
-                                               manager,
-                                               None,
-                                               object_id=ObjectID('#progress_bar', '@UIStatusBar'))
-
-health_bar = pygame_gui.elements.UIStatusBar(pygame.Rect((0, 30), (50, 6)),
-                                             manager,
-                                             sprite=happy_sprite,
-                                             percent_method=happy_sprite.get_health_percentage,
-                                             object_id=ObjectID(
-                                                 '#health_bar', '@player_status_bars'))
-mana_bar = pygame_gui.elements.UIStatusBar(pygame.Rect((0, 40), (50, 6)),
-                                           manager,
-                                           sprite=happy_sprite,
-                                           percent_method=happy_sprite.get_mana_percentage,
-                                           object_id=ObjectID(
-                                                 '#mana_bar', '@player_status_bars'))
-stamina_bar = pygame_gui.elements.UIStatusBar(pygame.Rect((0, 50), (50, 6)),
-                                              manager,
-                                              sprite=happy_sprite,
-                                              percent_method=happy_sprite.get_stamina_percentage,
-                                              object_id=ObjectID(
-                                                  '#stamina_bar', '@player_status_bars'))
+progress_bar = QuantisedStatusBar(pygame.Rect((100, 100), (200, 30)),
+                                  manager,
+                                  None,
+                                  object_id=ObjectID('#progress_bar', '@UIStatusBar'))
+
+health_bar = QuantisedStatusBar(pygame.Rect((0, 30), (50, 6)),
+                                manager,
+                                sprite=happy_sprite,
+                                percent_method=happy_sprite.get_health_percentage,
+                                object_id=ObjectID('#health_bar', '@player_status_bars'))
+mana_bar = QuantisedStatusBar(pygame.Rect((0, 40), (50, 6)),
+                              manager,
+                              sprite=happy_sprite,
+                              percent_method=happy_sprite.get_mana_percentage,
+                              object_id=ObjectID('#mana_bar', '@player_status_bars'))
+stamina_bar = QuantisedStatusBar(pygame.Rect((0, 50), (50, 6)),
+                                 manager,
+                                 sprite=happy_sprite,
+                                 percent_method=happy_sprite.get_stamina_percentage,
+                                 object_id=ObjectID('#stamina_bar', '@player_status_bars'))
+status_bars = [progress_bar, health_bar, mana_bar, stamina_bar]
+
+redraws_avoided_label = pygame_gui.elements.UILabel(pygame.Rect((100, 140), (300, 30)),
+                                                    'Redraws avoided: 0',
+                                                    manager)
 
 progress = 0
 time_acc = 0
+label_timer = 0.0
 clock = pygame.time.Clock()
 is_running = True
 
@@ -148,6 +201,13 @@ while is_running:
         time_acc = 0.0
     progress_bar.percent_full = progress
 
+    label_timer -= time_delta
+    if label_timer <= 0.0:
+        # only now and then, or the label would be redrawing every frame instead
+        label_timer = 0.5
+        redraws_avoided = sum(status_bar.redraws_avoided for status_bar in status_bars)
+        redraws_avoided_label.set_text(f'Redraws avoided: {redraws_avoided}')
+
     window_surface.blit(background, (0, 0))
     sprite_list.draw(window_surface)
     manager.draw_ui(window_surface)
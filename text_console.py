@@ -1,3 +1,6 @@
+import asyncio
+import codecs
+import html
 import time
 
 import pygame
@@ -5,12 +8,170 @@ import pygame_gui
 
 import subprocess
 import threading
-import os
-
-
-class Output:
-    def __init__(self):
-        self.text = ''
+from collections import deque
+from typing import List
+
+
+class SubprocessLineReader:
+    """
+    Runs a subprocess and reads its output on an asyncio event loop in a background thread.
+
+    Output is read in large chunks and split into lines as it arrives, with complete lines
+    handed to the UI through a bounded deque. When the deque is full the reader stops reading,
+    so a very chatty process blocks on its own output rather than growing our memory.
+    A trailing partial line (like the '>>> ' prompt) is handed over once it has stopped
+    changing for a moment.
+    """
+    def __init__(self, command: List[str], max_lines: int = 5000, chunk_size: int = 65536,
+                 partial_line_delay: float = 0.05):
+        self.command = command
+        self.max_lines = max_lines
+        self.chunk_size = chunk_size
+        self.partial_line_delay = partial_line_delay
+
+        self.lines = deque()
+        self.partial_line = ''
+        self.partial_line_time = 0.0
+        self.lock = threading.Lock()
+        self.finished = False
+
+        self.process = None
+        self.loop = asyncio.new_event_loop()
+        self.process_started = threading.Event()
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.process_started.wait()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._read_output())
+        finally:
+            self.finished = True
+            self.process_started.set()
+            self.loop.close()
+
+    async def _read_output(self):
+        self.process = await asyncio.create_subprocess_exec(*self.command,
+                                                            stdin=subprocess.PIPE,
+                                                            stdout=subprocess.PIPE,
+                                                            stderr=subprocess.STDOUT)
+        self.process_started.set()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while True:
+            chunk = await self.process.stdout.read(self.chunk_size)
+            if not chunk:
+                break
+            # Only the new text gets split, earlier text was already split into lines.
+            # The partial line is cleared while we work so the UI can't take it twice.
+            with self.lock:
+                complete_lines = (self.partial_line + decoder.decode(chunk)).split('\n')
+                self.partial_line = ''
+            partial_line = complete_lines.pop()
+            while complete_lines:
+                space = self.max_lines - len(self.lines)
+                if space <= 0:
+                    await asyncio.sleep(0.01)
+                    continue
+                with self.lock:
+                    self.lines.extend(complete_lines[:space])
+                complete_lines = complete_lines[space:]
+            with self.lock:
+                self.partial_line = partial_line
+                self.partial_line_time = time.monotonic()
+
+        with self.lock:
+            last_line = self.partial_line + decoder.decode(b'', final=True)
+            if last_line:
+                self.lines.append(last_line)
+            self.partial_line = ''
+        await self.process.wait()
+
+    def write(self, text: str):
+        if not self.finished:
+            self.loop.call_soon_threadsafe(self._write, text.encode())
+
+    def _write(self, data: bytes):
+        if self.process.stdin is not None and not self.process.stdin.is_closing():
+            self.process.stdin.write(data)
+
+    def take_lines(self, max_count: int) -> List[str]:
+        with self.lock:
+            count = min(max_count, len(self.lines))
+            return [self.lines.popleft() for _ in range(count)]
+
+    def take_partial_line(self) -> str:
+        with self.lock:
+            if (self.lines or not self.partial_line or
+                    time.monotonic() - self.partial_line_time < self.partial_line_delay):
+                return ''
+            # the rest of this line, when it arrives, will be logged on a line of its own
+            partial_line = self.partial_line
+            self.partial_line = ''
+            return partial_line
+
+    def is_finished(self) -> bool:
+        with self.lock:
+            return self.finished and not self.lines
+
+    def kill(self):
+        if not self.finished and self.process is not None:
+            self.loop.call_soon_threadsafe(self.process.kill)
+
+
+class BatchedConsoleLog:
+    """
+    Adds output to a UIConsoleWindow's log a whole frame's worth at a time, so the text box
+    parses and lays out new text once per frame instead of once per line.
+
+    We also keep a ring buffer of the most recent log entries. Once the log holds trim_slack
+    entries more than max_lines, it is rebuilt from the ring buffer, which keeps memory and
+    relayout cost bounded in long-running sessions while only paying for a full relayout
+    every trim_slack lines.
+    """
+    def __init__(self, console_window: pygame_gui.windows.UIConsoleWindow,
+                 max_lines: int = 2000, trim_slack: int = 500):
+        self.console_window = console_window
+        self.max_lines = max_lines
+        self.trim_slack = trim_slack
+        self.entries = deque(maxlen=max_lines)
+        self.entries_in_log = 0
+
+    def add_command(self, command: str):
+        # The console window logs entered commands itself, we just mirror them so they
+        # survive trimming the log.
+        if self.console_window.should_logged_commands_escape_html:
+            command = html.escape(command)
+        self._add_entries([self.console_window.log_prefix + command + '<br>'], log_them=False)
+
+    def add_output_lines(self, lines: List[str], partial_line: str = ''):
+        entries = [f'<b>{html.escape(line)}</b><br>' for line in lines]
+        if partial_line:
+            entries.append(f'<b>{html.escape(partial_line)}</b>')
+        if entries:
+            self._add_entries(entries, log_them=True)
+
+    def _add_entries(self, entries: List[str], log_them: bool):
+        self.entries.extend(entries)
+        self.entries_in_log += len(entries)
+        if self.entries_in_log > self.max_lines + self.trim_slack:
+            self.trim()
+        elif log_them:
+            self.console_window.log.append_html_text(''.join(entries))
+
+    def trim(self):
+        log = self.console_window.log
+        log.set_text(''.join(self.entries))
+        self.entries_in_log = len(self.entries)
+        if log.scroll_bar is not None:
+            # set_text() scrolls back to the top, but a console wants to show the latest output
+            log.scroll_bar.set_scroll_from_start_percentage(1.0)
+
+    def clear(self):
+        self.entries.clear()
+        self.entries_in_log = 0
 
 
 pygame.init()
@@ -25,14 +186,13 @@ background.fill(manager.ui_theme.get_colour('dark_bg'))
 
 console_window = pygame_gui.windows.UIConsoleWindow(rect=pygame.rect.Rect((50, 50), (700, 500)),
                                                     manager=manager)
+console_log = BatchedConsoleLog(console_window)
 
 clock = pygame.time.Clock()
 is_running = True
 
-python_process = None
-
-output_str = None
-data_lock = None
+python_reader = None
+max_output_lines_per_frame = 200
 
 while is_running:
     time_delta = clock.tick(60)/1000.0
@@ -43,57 +203,31 @@ while is_running:
         if (event.type == pygame_gui.UI_CONSOLE_COMMAND_ENTERED and
                 event.ui_element == console_window):
             command = event.command
+            console_log.add_command(command)
 
-            if python_process is not None and output_str is not None:
-                bytes_command = (command + '\n').encode()
-                python_process.stdin.write(bytes_command)
-                python_process.stdin.flush()
+            if python_reader is not None:
+                python_reader.write(command + '\n')
 
             else:
                 if command == 'python':
                     console_window.set_log_prefix(" ")
-                    python_process = subprocess.Popen(['python', '-i'],
-                                                      stdin=subprocess.PIPE,
-                                                      stdout=subprocess.PIPE,
-                                                      stderr=subprocess.STDOUT, shell=False)
-                    output_str = Output()
-                    data_lock = threading.Lock()
-
-                    def write_all(process, output, lock):
-                        while True:
-                            data = process.stdout.read(1).decode("utf-8")
-                            if not data:
-                                break
-                            with lock:
-                                output.text += data
-
-
-                    writer = threading.Thread(target=write_all, args=(python_process,
-                                                                      output_str,
-                                                                      data_lock))
-                    writer.start()
+                    python_reader = SubprocessLineReader(['python', '-i'])
+                    python_reader.start()
 
                 elif command == 'clear':
                     console_window.clear_log()
+                    console_log.clear()
 
         manager.process_events(event)
 
-    if python_process is not None:
-        if "\n" in output_str.text:
-            split_output = output_str.text.split('\n', 1)
-            with data_lock:
-                output_str.text = split_output[1]
-            output_line_to_print = split_output[0].strip()
-            console_window.add_output_line_to_log(output_line_to_print)
-        elif len(output_str.text) > 0:
-            output_line_to_print = output_str.text.strip()
-            with data_lock:
-                output_str.text = ""
-            console_window.add_output_line_to_log(output_line_to_print, remove_line_break=True)
-
-        if python_process.poll() is not None:
+    if python_reader is not None:
+        output_lines = [line.strip() for line in
+                        python_reader.take_lines(max_output_lines_per_frame)]
+        console_log.add_output_lines(output_lines, python_reader.take_partial_line().strip())
+
+        if python_reader.is_finished():
             print('Python finished')
-            python_process = None
+            python_reader = None
 
     manager.update(time_delta)
 
@@ -102,5 +236,5 @@ while is_running:
 
     pygame.display.update()
 
-if python_process is not None:
-    python_process.kill()
\ No newline at end of file
+if python_reader is not None:
+    python_reader.kill()
\ No newline at end of file
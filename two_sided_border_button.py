@@ -1,6 +1,8 @@
 import pygame
 import pygame_gui
 
+from app_runner import DirtyRectAppRunner
+
 
 pygame.init()
 
@@ -16,21 +18,4 @@ hello_button = pygame_gui.elements.UIButton(relative_rect=pygame.Rect((350, 275)
                                             text='Hello',
                                             manager=manager)
 
-clock = pygame.time.Clock()
-is_running = True
-
-while is_running:
-    time_delta = clock.tick(60)/1000.0
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            is_running = False
-
-        manager.process_events(event)
-
-    manager.update(time_delta)
-
-    window_surface.blit(background, (0, 0))
-    manager.draw_ui(window_surface)
-
-    pygame.display.update()
+DirtyRectAppRunner(window_surface, manager, background).run()
@@ -0,0 +1,263 @@
+"""
+Headless, repeatable version of ui_element_creation_speed_test.py.
+
+Runs the 182 button creation pass and the clear-and-recreate pass several times using the
+dummy SDL video driver, then records min/median/p95 timings in a JSON file keyed by
+pygame_gui version. Exits with a non-zero status if the median of either pass regresses past
+the threshold compared to the baseline version.
+
+The first run of a version becomes its baseline, and stays it until --update-baseline is
+passed, so a string of small slow downs can't creep past the threshold. Every run is also
+saved to a separate file of latest results.
+
+With --sweep it instead builds 100, 1k, 5k and 20k buttons in a flat and in a nested
+UIContainer layout, timing creation, manager.update() and draw_ui() for each, and plots the
+timings against element count on log-log axes, where linear scaling is a straight line with
+a slope of one.
+"""
+import argparse
+import re
+import sys
+import time
+
+from benchmarking.results import (use_headless_video_driver, pygame_gui_version, summarise,
+                                  load_results, save_results, find_regressions)
+from benchmarking.plotting import save_line_plot
+
+use_headless_video_driver()
+
+import pygame
+import pygame_gui
+
+
+def version_key(version: str):
+    return tuple(int(part) for part in re.findall(r'\d+', version))
+
+
+def create_button_grid(manager, container, columns=13, rows=14):
+    button_row_width = 50
+    button_row_height = 40
+    spacing = 10
+    for j in range(1, rows + 1):
+        for i in range(1, columns + 1):
+            position = (i * spacing + ((i - 1) * button_row_width),
+                        (j * spacing + ((j - 1) * button_row_height)))
+            pygame_gui.elements.UIButton(relative_rect=pygame.Rect(position,
+                                                                   (button_row_width,
+                                                                    button_row_height)),
+                                         text=str(i)+',' + str(j),
+                                         manager=manager,
+                                         container=container,
+                                         object_id='#'+str(i) + str(j))
+
+
+def time_creation_passes(theme_path):
+    # A fresh manager per run so the theme and shape caches start cold each time,
+    # the same as the first run of ui_element_creation_speed_test.py.
+    manager = pygame_gui.UIManager((800, 600), theme_path)
+    test_container = pygame_gui.core.UIContainer(pygame.Rect(0, 0, 800, 600),
+                                                 manager=manager)
+
+    start_time = time.perf_counter()
+    create_button_grid(manager, test_container)
+    creation_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    test_container.clear()
+    create_button_grid(manager, test_container)
+    recreation_time = time.perf_counter() - start_time
+
+    test_container.kill()
+    return creation_time, recreation_time
+
+
+def create_scaling_buttons(manager, root_container, count, layout):
+    # Buttons tile the screen repeatedly so every one of them is on screen and gets drawn.
+    button_size = (50, 24)
+    columns = 800 // button_size[0]
+    rows = 600 // button_size[1]
+    buttons_per_page = 100
+    pages_per_section = 10
+
+    container = root_container
+    section_container = None
+    for index in range(count):
+        if layout == 'nested' and index % buttons_per_page == 0:
+            page_index = index // buttons_per_page
+            if page_index % pages_per_section == 0:
+                section_container = pygame_gui.core.UIContainer(pygame.Rect(0, 0, 800, 600),
+                                                                manager=manager,
+                                                                container=root_container)
+            container = pygame_gui.core.UIContainer(pygame.Rect(0, 0, 800, 600),
+                                                    manager=manager,
+                                                    container=section_container)
+        cell = index % (columns * rows)
+        position = ((cell % columns) * button_size[0], (cell // columns) * button_size[1])
+        pygame_gui.elements.UIButton(relative_rect=pygame.Rect(position, button_size),
+                                     text=str(index),
+                                     manager=manager,
+                                     container=container)
+
+
+def time_scaling_run(theme_path, window_surface, count, layout, frames):
+    manager = pygame_gui.UIManager((800, 600), theme_path)
+    root_container = pygame_gui.core.UIContainer(pygame.Rect(0, 0, 800, 600),
+                                                 manager=manager)
+
+    start_time = time.perf_counter()
+    create_scaling_buttons(manager, root_container, count, layout)
+    creation_time = time.perf_counter() - start_time
+
+    update_times = []
+    draw_times = []
+    for _ in range(frames):
+        start_time = time.perf_counter()
+        manager.update(1.0 / 60.0)
+        update_times.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        manager.draw_ui(window_surface)
+        draw_times.append(time.perf_counter() - start_time)
+
+    root_container.kill()
+    return creation_time, summarise(update_times)['median'], summarise(draw_times)['median']
+
+
+def run_scaling_sweep(args, window_surface):
+    sweep = {}
+    for layout in args.layouts:
+        sweep[layout] = {}
+        for count in args.counts:
+            for _ in range(args.sweep_warmup_runs):
+                time_scaling_run(args.theme, window_surface, count, layout, args.frames)
+            timings = [time_scaling_run(args.theme, window_surface, count, layout, args.frames)
+                       for _ in range(args.sweep_runs)]
+            sweep[layout][str(count)] = {
+                'creation': summarise([timing[0] for timing in timings]),
+                'update': summarise([timing[1] for timing in timings]),
+                'draw_ui': summarise([timing[2] for timing in timings])}
+            row = sweep[layout][str(count)]
+            print(f"{layout:>6} {count:>6} buttons: "
+                  f"creation {row['creation']['median']:.4f}s "
+                  f"({1e6 * row['creation']['median'] / count:.1f}us each), "
+                  f"update {row['update']['median']:.5f}s, "
+                  f"draw_ui {row['draw_ui']['median']:.5f}s")
+
+    results = load_results(args.sweep_results)
+    results[pygame_gui_version()] = sweep
+    save_results(args.sweep_results, results)
+
+    for measurement in ('creation', 'update', 'draw_ui'):
+        series = {layout: [(int(count), row[measurement]['median'])
+                           for count, row in sweep[layout].items()]
+                  for layout in sweep}
+        save_line_plot(f'{args.plot_prefix}_{measurement}.png', series,
+                       f'UIButton {measurement} time vs element count '
+                       f'(pygame_gui {pygame_gui_version()})',
+                       'Button count', 'Seconds', log_y=True)
+
+
+def pick_baseline(results, current_version, baseline_version=None):
+    if baseline_version is not None:
+        return results.get(baseline_version)
+    if current_version in results:
+        return results[current_version]
+    older_versions = [version for version in results
+                      if version_key(version) < version_key(current_version)]
+    if older_versions:
+        return results[max(older_versions, key=version_key)]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark UIButton creation speed.')
+    parser.add_argument('--runs', type=int, default=20,
+                        help='Number of times to repeat each pass.')
+    parser.add_argument('--warmup-runs', type=int, default=2,
+                        help='Untimed runs made before measuring.')
+    parser.add_argument('--theme', default='data/themes/quick_theme.json')
+    parser.add_argument('--results', default='benchmark_results/ui_element_creation.json',
+                        help='JSON file holding the results for each pygame_gui version.')
+    parser.add_argument('--latest-results',
+                        default='benchmark_results/ui_element_creation_latest.json',
+                        help='JSON file holding the most recent run for each pygame_gui '
+                             'version, which never becomes a baseline by itself.')
+    parser.add_argument('--baseline', default=None,
+                        help='pygame_gui version to compare against. Defaults to the baseline '
+                             'of this version, or the newest older version.')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Replace the baseline of this version with this run if it passes.')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='Allowed fractional slow down of the median before failing.')
+    parser.add_argument('--sweep', action='store_true',
+                        help='Run the element count scaling sweep instead.')
+    parser.add_argument('--counts', type=int, nargs='+', default=[100, 1000, 5000, 20000])
+    parser.add_argument('--layouts', nargs='+', choices=['flat', 'nested'],
+                        default=['flat', 'nested'])
+    parser.add_argument('--sweep-runs', type=int, default=3,
+                        help='Number of times to repeat each sweep step.')
+    parser.add_argument('--sweep-warmup-runs', type=int, default=1,
+                        help='Untimed runs made before measuring each sweep step.')
+    parser.add_argument('--frames', type=int, default=10,
+                        help='Frames of update() and draw_ui() to time per sweep step.')
+    parser.add_argument('--sweep-results', default='benchmark_results/ui_element_scaling.json')
+    parser.add_argument('--plot-prefix', default='benchmark_results/ui_element_scaling')
+    args = parser.parse_args()
+
+    results = load_results(args.results)
+    if not args.sweep and args.baseline is not None and args.baseline not in results:
+        known_versions = ', '.join(sorted(results, key=version_key)) or 'none'
+        parser.error(f'no results for pygame_gui {args.baseline} in {args.results}, '
+                     f'known versions: {known_versions}')
+
+    pygame.init()
+    window_surface = pygame.display.set_mode((800, 600))
+
+    if args.sweep:
+        run_scaling_sweep(args, window_surface)
+        pygame.quit()
+        return 0
+
+    for _ in range(args.warmup_runs):
+        time_creation_passes(args.theme)
+
+    creation_times = []
+    recreation_times = []
+    for _ in range(args.runs):
+        creation_time, recreation_time = time_creation_passes(args.theme)
+        creation_times.append(creation_time)
+        recreation_times.append(recreation_time)
+
+    current_version = pygame_gui_version()
+    current = {'button_creation': summarise(creation_times),
+               'clear_and_recreation': summarise(recreation_times)}
+
+    print(f'pygame_gui {current_version} (182 x rounded rectangles, {args.runs} runs)')
+    for measurement, summary in current.items():
+        print(f"{measurement}: min {summary['min']:.4f}s, median {summary['median']:.4f}s, "
+              f"p95 {summary['p95']:.4f}s")
+
+    latest_results = load_results(args.latest_results)
+    latest_results[current_version] = current
+    save_results(args.latest_results, latest_results)
+
+    regressions = find_regressions(current,
+                                   pick_baseline(results, current_version, args.baseline),
+                                   args.threshold)
+    if regressions:
+        print('Performance regression past the threshold of '
+              f'{100.0 * args.threshold:.0f}%:')
+        for regression in regressions:
+            print(' -', regression)
+        pygame.quit()
+        return 1
+
+    if current_version not in results or args.update_baseline:
+        results[current_version] = current
+        save_results(args.results, results)
+    pygame.quit()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,7 @@
+import argparse
+import random
+import time
+
 import pygame
 import pygame_gui
 
@@ -6,12 +10,23 @@ from pygame_gui.elements.ui_window import UIWindow
 from pygame_gui.elements.ui_image import UIImage
 
 from pong.pong import PongGame
+from pong.replay import ReplayPlayer, ReplayRecorder
 
 PONG_WINDOW_SELECTED = pygame.event.custom_type()
 
 
 class PongWindow(UIWindow):
-    def __init__(self, position, ui_manager):
+    """
+    A window playing a game of pong.
+
+    The game is stepped at a fixed rate, however fast or slow the app's frames are, and drawn
+    part way between the last two steps so the motion still looks smooth. Drawing the game is
+    skipped for frames where it can't have changed, or when another window covers it up.
+    """
+    simulation_step = 1.0 / 120.0
+    max_steps_per_frame = 8
+
+    def __init__(self, position, ui_manager, game_index=0, seed=None):
         super().__init__(pygame.Rect(position, (320, 240)), ui_manager,
                          window_display_title='Super Awesome Pong!',
                          object_id='#pong_window')
@@ -24,9 +39,13 @@ class PongWindow(UIWindow):
                                             container=self,
                                             parent_element=self)
 
-        self.pong_game = PongGame(game_surface_size)
+        self.game_index = game_index
+        self.pong_game = PongGame(game_surface_size, seed=seed)
 
         self.is_active = False
+        self.time_accumulator = 0.0
+        self.needs_redraw = True
+        self.last_interpolation = None
 
     def process_event(self, event):
         handled = super().process_event(event)
@@ -35,7 +54,8 @@ class PongWindow(UIWindow):
                 event.ui_element == self.title_bar):
             handled = True
             event_data = {'ui_element': self,
-                          'ui_object_id': self.most_specific_combined_id}
+                          'ui_object_id': self.most_specific_combined_id,
+                          'index': self.game_index}
             window_selected_event = pygame.event.Event(PONG_WINDOW_SELECTED,
                                                        event_data)
             pygame.event.post(window_selected_event)
@@ -45,44 +65,134 @@ class PongWindow(UIWindow):
 
     def update(self, time_delta):
         if self.alive() and self.is_active:
-            self.pong_game.update(time_delta)
+            # after a long stall, drop the time we can't catch up on rather than spiralling
+            self.time_accumulator = min(self.time_accumulator + time_delta,
+                                        self.simulation_step * self.max_steps_per_frame)
+            while self.time_accumulator >= self.simulation_step:
+                self.pong_game.update(self.simulation_step)
+                self.time_accumulator -= self.simulation_step
+                self.needs_redraw = True
 
         super().update(time_delta)
 
-        self.pong_game.draw(self.game_surface_element.image)
+        if not self.alive():
+            return
+        interpolation = self.time_accumulator / self.simulation_step
+        if interpolation != self.last_interpolation:
+            self.needs_redraw = True
+        if self.needs_redraw and not self.is_game_hidden():
+            self.pong_game.draw(self.game_surface_element.image, interpolation)
+            self.needs_redraw = False
+            self.last_interpolation = interpolation
+
+    def is_game_hidden(self) -> bool:
+        if not self.visible:
+            return True
+        game_rect = self.game_surface_element.rect
+        window_stack = self.ui_manager.get_window_stack().get_full_stack()
+        if self not in window_stack:
+            return False
+        for window in window_stack[window_stack.index(self) + 1:]:
+            if window.visible and window.get_container().get_rect().contains(game_rect):
+                return True
+        return False
+
+
+class ReplayUIManager(UIManager):
+    """
+    A UI manager that can be given the mouse position to use, rather than reading it from the
+    real mouse, so playing back a replay doesn't move the user's cursor.
+    """
+    def __init__(self, *args, **kwargs):
+        self.replay_mouse_position = None
+        super().__init__(*args, **kwargs)
+
+    def _update_mouse_position(self):
+        if self.replay_mouse_position is None:
+            super()._update_mouse_position()
+        else:
+            self.mouse_position = self.calculate_scaled_mouse_position(
+                self.replay_mouse_position)
 
 
 class MiniGamesApp:
-    def __init__(self):
+    """
+    Two windows of pong.
+
+    Sessions can be recorded to a replay file and played back later. A replay holds the seed
+    for the games' random numbers plus every frame's time delta and input, so playback goes
+    through exactly the same frames, just as fast as possible rather than at 60 FPS. That
+    makes it a repeatable workload for profiling.
+
+    :param seed: Seed for the games' random numbers, picked at random if not given.
+    :param record_path: Optional file to record the session to.
+    :param replay_path: Optional replay file to play back instead of taking input.
+    """
+    def __init__(self, seed=None, record_path=None, replay_path=None):
         pygame.init()
 
         self.root_window_surface = pygame.display.set_mode((1024, 600))
 
         self.background_surface = pygame.Surface((1024, 600)).convert()
         self.background_surface.fill(pygame.Color('#505050'))
-        self.ui_manager = UIManager((1024, 600), 'data/themes/theme_3.json')
+        self.ui_manager = ReplayUIManager((1024, 600), 'data/themes/theme_3.json')
         self.clock = pygame.time.Clock()
         self.is_running = True
 
-        self.pong_window_1 = PongWindow((25, 25), self.ui_manager)
-        self.pong_window_2 = PongWindow((50, 50), self.ui_manager)
+        self.replay_player = None
+        self.replay_recorder = None
+        if replay_path is not None:
+            self.replay_player = ReplayPlayer(replay_path)
+            seed = self.replay_player.seed
+        elif seed is None:
+            seed = random.randrange(2 ** 31)
+        if record_path is not None:
+            self.replay_recorder = ReplayRecorder(record_path, seed,
+                                                  custom_event_types=[PONG_WINDOW_SELECTED])
+
+        # each game gets its own seed, drawn from the session's seed
+        session_random = random.Random(seed)
+        self.pong_window_1 = PongWindow((25, 25), self.ui_manager, game_index=0,
+                                        seed=session_random.randrange(2 ** 31))
+        self.pong_window_2 = PongWindow((50, 50), self.ui_manager, game_index=1,
+                                        seed=session_random.randrange(2 ** 31))
+        self.pong_windows = [self.pong_window_1, self.pong_window_2]
 
     def run(self):
+        start_time = time.perf_counter()
+        frame_count = 0
         while self.is_running:
-            time_delta = self.clock.tick(60)/1000.0
-
-            for event in pygame.event.get():
+            if self.replay_player is not None:
+                frame = self.replay_player.next_frame()
+                if frame is None:
+                    break
+                self.clock.tick()
+                time_delta, mouse_position, recorded_events = frame
+                # the UI manager reads the mouse position itself each update
+                self.ui_manager.replay_mouse_position = mouse_position
+                # real input is ignored, but keep the UI's own events, in the same order among
+                # the recorded events as when recording, and let the window close
+                live_events = pygame.event.get()
+                posted_events = [event for event in live_events
+                                 if event.type >= pygame.USEREVENT and
+                                 event.type != PONG_WINDOW_SELECTED]
+                events = self.replay_player.merge_posted_events(recorded_events, posted_events)
+                events += [event for event in live_events if event.type == pygame.QUIT]
+            else:
+                time_delta = self.clock.tick(60)/1000.0
+                events = pygame.event.get()
+                if self.replay_recorder is not None:
+                    self.replay_recorder.record_frame(time_delta, pygame.mouse.get_pos(), events)
+
+            for event in events:
                 if event.type == pygame.QUIT:
                     self.is_running = False
 
                 self.ui_manager.process_events(event)
 
                 if event.type == PONG_WINDOW_SELECTED:
-                    event.ui_element.is_active = True
-                    if event.ui_element == self.pong_window_1:
-                        self.pong_window_2.is_active = False
-                    elif event.ui_element == self.pong_window_2:
-                        self.pong_window_1.is_active = False
+                    for pong_window in self.pong_windows:
+                        pong_window.is_active = pong_window.game_index == event.index
 
             self.ui_manager.update(time_delta)
 
@@ -90,8 +200,34 @@ class MiniGamesApp:
             self.ui_manager.draw_ui(self.root_window_surface)
 
             pygame.display.update()
+            frame_count += 1
+
+        if self.replay_recorder is not None:
+            self.replay_recorder.close()
+        if self.replay_player is not None:
+            elapsed_time = time.perf_counter() - start_time
+            print(f'Replayed {frame_count} frames in {elapsed_time:.2f}s '
+                  f'({elapsed_time / max(frame_count, 1) * 1000:.3f}ms per frame)')
+            for pong_window in self.pong_windows:
+                ball = pong_window.pong_game.ball
+                print(f'Game {pong_window.game_index + 1}: '
+                      f'score {pong_window.pong_game.score.score_string}, '
+                      f'ball at ({ball.position[0]:.2f}, {ball.position[1]:.2f})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Windowed pong mini games.')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed for the games, random by default.')
+    parser.add_argument('--record', default=None, metavar='FILE',
+                        help='Record the session to a replay file.')
+    parser.add_argument('--replay', default=None, metavar='FILE',
+                        help='Play back a recorded session as fast as possible.')
+    args = parser.parse_args()
+
+    app = MiniGamesApp(seed=args.seed, record_path=args.record, replay_path=args.replay)
+    app.run()
 
 
 if __name__ == '__main__':
-    app = MiniGamesApp()
-    app.run()
+    main()